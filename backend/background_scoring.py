@@ -0,0 +1,174 @@
+"""
+background_scoring.py
+
+Deferred quality and toxicity scoring of stored summaries.
+
+With deferred scoring, a summary is returned and stored as soon as it is
+generated, with its metadata marked `"scoring": {"status": "pending"}`. The
+judge evaluation and Detoxify scoring then run in a small pool of asyncio
+workers that merge the results into the stored metadata and mark it "done"
+(or "failed"). Clients poll or long-poll the row until it is finished; whole
+sets of summaries can be queued for rescoring in bulk.
+"""
+
+import asyncio
+import logging
+import os
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+PENDING = "pending"
+DONE = "done"
+FAILED = "failed"
+
+# Concurrent scoring jobs (each runs one judge call and two Detoxify passes)
+SCORING_WORKERS = int(os.getenv("SCORING_WORKERS", "4"))
+
+# Score entries clients iterate over, kept as empty dicts until scoring fills them in
+SCORE_PLACEHOLDERS = ("quality_scores", "detox_report", "detox_summary", "percentage_reduction")
+
+
+def pending_metadata(metadata: Dict[str, Any]) -> Dict[str, Any]:
+    """Return *metadata* marked as waiting for background scoring, with empty score entries."""
+    placeholders = {key: {} for key in SCORE_PLACEHOLDERS}
+    return dict(metadata, **placeholders, scoring={"status": PENDING, "queued_at": time.time()})
+
+
+class BackgroundScorer:
+    """Asyncio worker pool that scores stored summaries and updates their rows."""
+
+    def __init__(self, db, score: Callable[[str, str], Awaitable[Dict[str, Any]]],
+                 workers: int = SCORING_WORKERS):
+        """
+        Args:
+            db (Database): Store holding the summaries.
+            score (Callable): `await score(plain_text, summary)` returning the
+                metadata entries to merge (quality scores and toxicity).
+            workers (int): Number of concurrent scoring jobs.
+        """
+        self.db = db
+        self.score = score
+        self.workers = workers
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._waiters: Dict[int, asyncio.Event] = {}
+        self._queued = set()
+        self.completed = 0
+        self.failed = 0
+
+    def _ensure_workers(self) -> None:
+        """Start the worker tasks on the running loop (first use, or after a loop change)."""
+        loop = asyncio.get_running_loop()
+        if self._queue is not None and self._tasks and self._tasks[0].get_loop() is loop:
+            return
+        self._queue = asyncio.Queue()
+        self._queued.clear()
+        self._tasks = [loop.create_task(self._worker()) for _ in range(self.workers)]
+
+    def enqueue(self, summary_id: int) -> bool:
+        """
+        Queue *summary_id* for scoring (must be called on the event loop).
+
+        Returns:
+            bool: False if it is already queued.
+        """
+        self._ensure_workers()
+        if summary_id in self._queued:
+            return False
+        self._queued.add(summary_id)
+        self._waiters.setdefault(summary_id, asyncio.Event())
+        self._queue.put_nowait(summary_id)
+        return True
+
+    async def _worker(self) -> None:
+        while True:
+            summary_id = await self._queue.get()
+            try:
+                await self._score_one(summary_id)
+            except Exception as e:
+                logger.error(f"Background scoring of summary {summary_id} crashed: {e}")
+            finally:
+                self._queued.discard(summary_id)
+                waiter = self._waiters.pop(summary_id, None)
+                if waiter is not None:
+                    waiter.set()
+                self._queue.task_done()
+
+    async def _score_one(self, summary_id: int) -> None:
+        record = await asyncio.to_thread(self.db.get_summary, summary_id)
+        if record is None:
+            return  # Deleted while queued
+        started = time.perf_counter()
+        try:
+            results = await self.score(record["plain_text"], record["summary"])
+            status = {"status": DONE}
+            self.completed += 1
+        except Exception as e:
+            logger.error(f"Background scoring of summary {summary_id} failed: {e}")
+            results = {}
+            status = {"status": FAILED, "detail": f"Error: {e}"}
+            self.failed += 1
+
+        # Re-read so metadata written meanwhile (e.g. a rename) is kept
+        record = await asyncio.to_thread(self.db.get_summary, summary_id)
+        if record is None:
+            return
+        status.update(finished_at=time.time(), seconds=time.perf_counter() - started)
+        metadata = dict(record["metadata"], **results, scoring=status)
+        await asyncio.to_thread(self.db.update_summary_metadata, summary_id, metadata)
+        logger.info(f"Background scoring of summary {summary_id}: {status['status']} in {status['seconds']:.1f}s")
+
+    async def wait(self, summary_id: int, timeout: float) -> Optional[Dict[str, Any]]:
+        """
+        Return the stored summary, waiting up to *timeout* seconds while its scoring is queued or running.
+
+        Returns:
+            dict | None: The summary record, or None if it does not exist.
+        """
+        waiter = self._waiters.get(summary_id)
+        if waiter is not None and timeout > 0:
+            try:
+                await asyncio.wait_for(waiter.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+        return await asyncio.to_thread(self.db.get_summary, summary_id)
+
+    async def rescore(self, summary_ids: List[int]) -> List[int]:
+        """
+        Mark existing summaries pending and queue them for scoring again.
+
+        Previous scores stay in the metadata until the new ones replace them.
+
+        Returns:
+            list[int]: The IDs that exist and were queued.
+        """
+        queued = []
+        for summary_id in summary_ids:
+            record = await asyncio.to_thread(self.db.get_summary, summary_id)
+            if record is None:
+                continue
+            metadata = dict(record["metadata"], scoring={"status": PENDING, "queued_at": time.time()})
+            await asyncio.to_thread(self.db.update_summary_metadata, summary_id, metadata)
+            self.enqueue(summary_id)
+            queued.append(summary_id)
+        return queued
+
+    async def resume_pending(self) -> int:
+        """Re-queue summaries left pending by a previous process (e.g. after a restart)."""
+        queued = 0
+        for summary_id in await asyncio.to_thread(self.db.list_summary_ids, scoring_status=PENDING):
+            queued += self.enqueue(summary_id)
+        if queued:
+            logger.info(f"Re-queued {queued} summaries with pending scores")
+        return queued
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": self.workers,
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "in_progress": len(self._queued) - (self._queue.qsize() if self._queue is not None else 0),
+            "completed": self.completed,
+            "failed": self.failed,
+        }
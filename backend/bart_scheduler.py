@@ -0,0 +1,201 @@
+"""
+bart_scheduler.py
+
+Cross-request dynamic micro-batching for local BART generation.
+
+Concurrent "Bart" requests used to run one `model.generate` each and fight
+over the same CPU cores. Instead, every generation input (a whole short
+document, a chunk of a long one, or a final consolidation pass) is submitted
+to a single scheduler thread. It waits a few milliseconds for more inputs,
+groups them by model, generation parameters and input-length bucket, packs
+each group into batches bounded by a maximum batch size and a padded-token
+budget, runs one batched `generate` per batch and resolves each caller's
+future with its own summary.
+
+Queue-wait and batch-size histograms are exposed through `stats()`.
+"""
+
+import logging
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Tuple
+
+from metrics import Histogram
+
+logger = logging.getLogger(__name__)
+
+# Micro-batching settings (BART_MICRO_BATCHING=0 restores one generate call per request)
+BART_MICRO_BATCHING = os.getenv("BART_MICRO_BATCHING", "1") == "1"
+BART_BATCH_WINDOW_MS = float(os.getenv("BART_BATCH_WINDOW_MS", "10"))         # Time to wait for more inputs
+BART_MAX_BATCH_SIZE = int(os.getenv("BART_MAX_BATCH_SIZE", "8"))               # Inputs per generate call
+BART_MAX_BATCH_TOKENS = int(os.getenv("BART_MAX_BATCH_TOKENS", "8192"))        # Padded input tokens per call
+BART_LENGTH_BUCKET_TOKENS = int(os.getenv("BART_LENGTH_BUCKET_TOKENS", "64"))  # Width of the input-length buckets
+
+# Threads that run the per-request BART logic (tokenizing, chunking) while the
+# generation itself happens on the scheduler thread; they mostly wait on futures
+BART_REQUEST_THREADS = int(os.getenv("BART_REQUEST_THREADS", "32"))
+
+
+def length_bucket(num_tokens: int, width: int = BART_LENGTH_BUCKET_TOKENS) -> int:
+    """Round *num_tokens* down to its bucket (inputs in one bucket may share a batch)."""
+    return max(width, num_tokens // width * width)
+
+
+class _Pending:
+    """One submitted input waiting for its batch."""
+    __slots__ = ("input_ids", "attention_mask", "future", "enqueued")
+
+    def __init__(self, input_ids, attention_mask):
+        self.input_ids = input_ids
+        self.attention_mask = attention_mask
+        self.future = Future()
+        self.enqueued = time.perf_counter()
+
+
+class BartBatchScheduler:
+    """Collects generation inputs from all requests and runs them in batches on one thread."""
+
+    def __init__(self, run_batch: Callable[..., List[Any]], window_ms: float = BART_BATCH_WINDOW_MS,
+                 max_batch_size: int = BART_MAX_BATCH_SIZE, max_batch_tokens: int = BART_MAX_BATCH_TOKENS,
+                 bucket_tokens: int = BART_LENGTH_BUCKET_TOKENS):
+        """
+        Args:
+            run_batch (Callable): `run_batch(model, tokenizer, ids, masks, device,
+                batch_size=..., **generate_kwargs)` returning one result per input
+                (e.g. `generate_bart_chunk_summaries`).
+            window_ms (float): How long the first input of a batch waits for company.
+            max_batch_size (int): Maximum inputs per `generate` call.
+            max_batch_tokens (int): Maximum padded input tokens (longest × count) per call.
+            bucket_tokens (int): Inputs are only batched with others of the same length bucket.
+        """
+        self.run_batch = run_batch
+        self.window_seconds = window_ms / 1000.0
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_batch_tokens = max_batch_tokens
+        self.bucket_tokens = bucket_tokens
+        self._pending: Dict[Tuple, List[_Pending]] = {}
+        self._groups: Dict[Tuple, Tuple[Any, Any, Any, Dict[str, Any]]] = {}
+        self._condition = threading.Condition()
+        self._thread = None
+        self.batch_sizes = Histogram([1, 2, 4, 8, 16, 32])
+        self.queue_wait_ms = Histogram([1, 5, 10, 25, 50, 100, 250, 1000, 5000])
+        self.batches = 0
+        self.inputs = 0
+
+    def submit(self, model, tokenizer, device, input_ids, attention_mask, **generate_kwargs) -> Future:
+        """
+        Queue one input for batched generation.
+
+        Args:
+            model, tokenizer, device: The warm BART model, its tokenizer and device.
+            input_ids (torch.Tensor): 1-D input token ids.
+            attention_mask (torch.Tensor): 1-D attention mask matching *input_ids*.
+            **generate_kwargs: Generation parameters; only inputs with identical
+                parameters are batched together.
+
+        Returns:
+            concurrent.futures.Future: Resolves to this input's result.
+        """
+        pending = _Pending(input_ids, attention_mask)
+        key = (id(model), tuple(sorted(generate_kwargs.items())),
+               length_bucket(len(input_ids), self.bucket_tokens))
+        with self._condition:
+            self._groups[key] = (model, tokenizer, device, generate_kwargs)
+            self._pending.setdefault(key, []).append(pending)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="bart-batcher", daemon=True)
+                self._thread.start()
+            self._condition.notify()
+        return pending.future
+
+    def _full(self, items: List[_Pending]) -> bool:
+        longest = max(len(item.input_ids) for item in items)
+        return len(items) >= self.max_batch_size or longest * len(items) >= self.max_batch_tokens
+
+    def _next_batch(self):
+        """Wait for inputs and the batching window, then take one batch. Called under the condition."""
+        while not self._pending:
+            self._condition.wait()
+
+        # Wait until the oldest input has spent its window or some group is already full
+        while True:
+            oldest = min(items[0].enqueued for items in self._pending.values())
+            remaining = oldest + self.window_seconds - time.perf_counter()
+            if remaining <= 0 or any(self._full(items) for items in self._pending.values()):
+                break
+            self._condition.wait(remaining)
+
+        # Serve the group holding the oldest input; take inputs FIFO within the budgets
+        key = min(self._pending, key=lambda k: self._pending[k][0].enqueued)
+        items = self._pending[key]
+        batch, longest = [], 0
+        for item in items:
+            candidate_longest = max(longest, len(item.input_ids))
+            if batch and (len(batch) >= self.max_batch_size
+                          or candidate_longest * (len(batch) + 1) > self.max_batch_tokens):
+                break
+            batch.append(item)
+            longest = candidate_longest
+        rest = items[len(batch):]
+        if rest:
+            self._pending[key] = rest
+            return self._groups[key], batch
+        # Drop the group with its last input so evicted models are not kept alive
+        del self._pending[key]
+        return self._groups.pop(key), batch
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                group, batch = self._next_batch()
+            self._dispatch(group, batch)
+            del group, batch  # Hold no model reference while waiting for the next batch
+
+    def _dispatch(self, group: Tuple[Any, Any, Any, Dict[str, Any]], batch: List[_Pending]) -> None:
+        """Run one batch and resolve its futures."""
+        model, tokenizer, device, generate_kwargs = group
+        dispatched = time.perf_counter()
+        batch = [item for item in batch if item.future.set_running_or_notify_cancel()]
+        if not batch:
+            return
+        for item in batch:
+            self.queue_wait_ms.record((dispatched - item.enqueued) * 1000)
+        self.batch_sizes.record(len(batch))
+        self.batches += 1
+        self.inputs += len(batch)
+
+        try:
+            results = self.run_batch(model, tokenizer,
+                                     [item.input_ids for item in batch],
+                                     [item.attention_mask for item in batch],
+                                     device, batch_size=len(batch), **generate_kwargs)
+        except Exception as e:
+            logger.error(f"Batched BART generation of {len(batch)} inputs failed: {e}")
+            for item in batch:
+                item.future.set_exception(e)
+            return
+        for item, result in zip(batch, results):
+            item.future.set_result(result)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return batch count, mean batch size, queue depth and the two histograms."""
+        with self._condition:
+            queued = sum(len(items) for items in self._pending.values())
+        return {
+            "enabled": BART_MICRO_BATCHING,
+            "window_ms": self.window_seconds * 1000,
+            "max_batch_size": self.max_batch_size,
+            "max_batch_tokens": self.max_batch_tokens,
+            "batches": self.batches,
+            "inputs": self.inputs,
+            "mean_batch_size": self.inputs / self.batches if self.batches else None,
+            "queued": queued,
+            "batch_size_histogram": self.batch_sizes.snapshot(),
+            "queue_wait_ms_histogram": self.queue_wait_ms.snapshot(),
+        }
+
+
+# Executor for BART requests when micro-batching is on (see BART_REQUEST_THREADS)
+bart_request_executor = ThreadPoolExecutor(max_workers=BART_REQUEST_THREADS, thread_name_prefix="bart-request")
@@ -0,0 +1,67 @@
+"""
+Benchmark: sequential vs. batched BART chunk summarization.
+
+Each report in `dataset/` is tokenized and truncated to one model input, and the
+resulting chunks are summarized with `generate_bart_chunk_summaries` for every
+requested batch size (batch size 1 reproduces the old per-chunk loop).
+Reports chunks/second per batch size.
+
+Run from the backend directory:
+    python -m benchmarks.bart_chunk_batching --limit 32 --batch-sizes 1 2 4 8
+"""
+
+import argparse
+import glob
+import os
+import time
+
+from model_registry import DEFAULT_BART_MODEL, get_bart
+from summarization_module import generate_bart_chunk_summaries
+
+DATASET_DIR = os.path.join(os.path.dirname(__file__), "..", "..", "dataset")
+
+
+def load_chunks(tokenizer, limit, max_input_tokens):
+    """Tokenize up to *limit* dataset reports into (ids, mask) chunks."""
+    paths = sorted(glob.glob(os.path.join(DATASET_DIR, "*.txt")))[:limit]
+    chunks, attention_chunks = [], []
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            inputs = tokenizer(f.read(), return_tensors="pt", truncation=True,
+                               max_length=max_input_tokens, return_attention_mask=True)
+        chunks.append(inputs["input_ids"][0])
+        attention_chunks.append(inputs["attention_mask"][0])
+    return chunks, attention_chunks
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--model", default=DEFAULT_BART_MODEL)
+    parser.add_argument("--limit", type=int, default=16, help="number of dataset reports")
+    parser.add_argument("--max-input-tokens", type=int, default=1024)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 2, 4, 8])
+    args = parser.parse_args()
+
+    tokenizer, model, device = get_bart(args.model)
+    chunks, attention_chunks = load_chunks(tokenizer, args.limit, args.max_input_tokens)
+    print(f"{len(chunks)} chunks on {device}, "
+          f"avg {sum(len(c) for c in chunks) / len(chunks):.0f} tokens")
+
+    baseline = None
+    for batch_size in args.batch_sizes:
+        started = time.perf_counter()
+        generate_bart_chunk_summaries(
+            model, tokenizer, chunks, attention_chunks, device,
+            batch_size=batch_size, max_length=200, min_length=50, num_beams=3,
+            no_repeat_ngram_size=3, repetition_penalty=1.2, early_stopping=True,
+            do_sample=False,
+        )
+        elapsed = time.perf_counter() - started
+        rate = len(chunks) / elapsed
+        baseline = baseline or rate
+        print(f"batch_size={batch_size:<3d} {elapsed:8.2f}s  {rate:6.2f} chunks/s  "
+              f"x{rate / baseline:.2f} vs first")
+
+
+if __name__ == "__main__":
+    main()
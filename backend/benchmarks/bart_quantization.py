@@ -0,0 +1,96 @@
+"""
+Report: fp32 vs. dynamic int8 BART on CPU (quality and latency).
+
+Every selected report in `dataset/` is summarized with `summarize_with_bart`
+twice — once with the fp32 model and once with the int8-quantized one (built
+and cached on disk on first use). For each document the latency of both runs
+and the ROUGE-1/2/L F1 of the int8 summary against the fp32 summary are
+printed; the last lines give the means, the speed-up and the resident model
+sizes. Use `--csv` to keep the per-document rows.
+
+Run from the backend directory:
+    python -m benchmarks.bart_quantization --limit 20 --csv quantization_report.csv
+"""
+
+import argparse
+import csv
+import glob
+import os
+import statistics
+import time
+
+import torch
+from rouge_score import rouge_scorer
+
+from model_registry import DEFAULT_BART_MODEL, estimate_resident_bytes, get_bart
+from summarization_module import summarize_with_bart
+
+DATASET_DIR = os.path.join(os.path.dirname(__file__), "..", "..", "dataset")
+
+
+def timed_summary(text, model_name, quantized):
+    """Return (summary, seconds) of one `summarize_with_bart` call."""
+    started = time.perf_counter()
+    summary = summarize_with_bart(text, model_name=model_name, quantized=quantized)
+    return summary, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--model", default=DEFAULT_BART_MODEL)
+    parser.add_argument("--limit", type=int, default=20, help="number of dataset reports")
+    parser.add_argument("--threads", type=int, default=None, help="torch intra-op threads")
+    parser.add_argument("--csv", help="write per-document rows to this CSV file")
+    args = parser.parse_args()
+
+    if args.threads:
+        torch.set_num_threads(args.threads)
+
+    # Load (and, for int8, quantize + cache) both models up front so load time is not measured
+    _, fp32_model, device = get_bart(args.model, quantized=False)
+    _, int8_model, _ = get_bart(args.model, quantized=True)
+    if device.type != "cpu":
+        print(f"Warning: running on {device}; quantization only applies on CPU, both runs use fp32")
+
+    scorer = rouge_scorer.RougeScorer(["rouge1", "rouge2", "rougeL"], use_stemmer=True)
+    paths = sorted(glob.glob(os.path.join(DATASET_DIR, "*.txt")))[:args.limit]
+    rows = []
+    print(f"{'document':<24s} {'fp32 s':>8s} {'int8 s':>8s} {'R-1':>6s} {'R-2':>6s} {'R-L':>6s}")
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            text = f.read()
+        fp32_summary, fp32_seconds = timed_summary(text, args.model, quantized=False)
+        int8_summary, int8_seconds = timed_summary(text, args.model, quantized=True)
+        scores = scorer.score(fp32_summary, int8_summary)
+        row = {
+            "document": os.path.basename(path),
+            "fp32_seconds": fp32_seconds,
+            "int8_seconds": int8_seconds,
+            "rouge1": scores["rouge1"].fmeasure,
+            "rouge2": scores["rouge2"].fmeasure,
+            "rougeL": scores["rougeL"].fmeasure,
+        }
+        rows.append(row)
+        print(f"{row['document']:<24s} {fp32_seconds:8.2f} {int8_seconds:8.2f} "
+              f"{row['rouge1']:6.3f} {row['rouge2']:6.3f} {row['rougeL']:6.3f}")
+
+    def mean(key):
+        return statistics.mean(row[key] for row in rows)
+
+    print(f"\nmean latency: fp32 {mean('fp32_seconds'):.2f}s, int8 {mean('int8_seconds'):.2f}s "
+          f"(x{mean('fp32_seconds') / mean('int8_seconds'):.2f} speed-up)")
+    print(f"mean ROUGE of int8 vs fp32: R-1 {mean('rouge1'):.3f}, R-2 {mean('rouge2'):.3f}, "
+          f"R-L {mean('rougeL'):.3f}")
+    print(f"resident size: fp32 {estimate_resident_bytes(fp32_model) / 1024 ** 2:.0f} MB, "
+          f"int8 {estimate_resident_bytes(int8_model) / 1024 ** 2:.0f} MB")
+
+    if args.csv:
+        with open(args.csv, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+            writer.writeheader()
+            writer.writerows(rows)
+        print(f"per-document rows written to {args.csv}")
+
+
+if __name__ == "__main__":
+    main()
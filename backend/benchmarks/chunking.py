@@ -0,0 +1,86 @@
+"""
+Microbenchmark: token chunking of the largest `dataset/` reports.
+
+Compares the former in-function chunker of `summarize_with_bart` (one
+`tokenizer.decode` call per candidate token with the slow tokenizer) against
+`TokenChunker` in both boundary modes. The largest reports are concatenated
+into one long document so that several chunk boundaries have to be chosen.
+
+Run from the backend directory:
+    python -m benchmarks.chunking --largest 10 --repeat 20
+"""
+
+import argparse
+import glob
+import os
+import time
+
+from transformers import BartTokenizer, BartTokenizerFast
+
+from chunking import TokenChunker
+from model_registry import DEFAULT_BART_MODEL
+
+DATASET_DIR = os.path.join(os.path.dirname(__file__), "..", "..", "dataset")
+
+
+def legacy_chunk(tokenizer, text, max_input_tokens=1024, chunk_overlap=150):
+    """The chunking loop previously inlined in `summarize_with_bart`."""
+    input_ids = tokenizer(text, truncation=False, add_special_tokens=True)["input_ids"]
+    num_chunks = (len(input_ids) + max_input_tokens - 1) // max_input_tokens
+    optimal_chunk_size = len(input_ids) // num_chunks if num_chunks > 1 else max_input_tokens
+    chunks = []
+    start = 0
+    while start < len(input_ids):
+        end = min(start + optimal_chunk_size, len(input_ids))
+        if end < len(input_ids) and start > 0:
+            search_start = max(end - 50, start + optimal_chunk_size // 2)
+            period_positions = [i for i in range(search_start, end)
+                                if tokenizer.decode([input_ids[i]]).strip() in '.!?']
+            if period_positions:
+                end = period_positions[-1] + 1
+        chunks.append(input_ids[start:end])
+        if end == len(input_ids):
+            break
+        start = end - chunk_overlap
+    return chunks
+
+
+def timed(fn, repeat):
+    """Return (result, mean milliseconds) of *fn* over *repeat* runs."""
+    started = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    return result, (time.perf_counter() - started) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--model", default=DEFAULT_BART_MODEL)
+    parser.add_argument("--largest", type=int, default=10, help="number of largest reports to join")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    paths = sorted(glob.glob(os.path.join(DATASET_DIR, "*.txt")), key=os.path.getsize)[-args.largest:]
+    texts = []
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            texts.append(f.read())
+    document = "\n\n".join(texts)
+
+    slow_tokenizer = BartTokenizer.from_pretrained(args.model)
+    fast_tokenizer = BartTokenizerFast.from_pretrained(args.model)
+    token_chunker = TokenChunker(fast_tokenizer, boundary_mode="tokens")
+    sentence_chunker = TokenChunker(fast_tokenizer, boundary_mode="sentences")
+
+    print(f"{len(paths)} reports, {len(document)} characters")
+    for name, fn in [
+        ("legacy (slow tokenizer, decode per token)", lambda: legacy_chunk(slow_tokenizer, document)),
+        ("TokenChunker boundary_mode=tokens", lambda: token_chunker.chunk(document)),
+        ("TokenChunker boundary_mode=sentences", lambda: sentence_chunker.chunk(document)),
+    ]:
+        chunks, ms = timed(fn, args.repeat)
+        print(f"{name:<45s} {ms:9.2f} ms  {len(chunks)} chunks")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Benchmark: extractive pre-compression vs. full documents (tokens, latency, judge scores).
+
+Every selected report in `dataset/` is compressed with `extractive.compress` at
+each requested keep ratio (1 = the full document) and summarized by one model.
+The summary is then scored by the Mistral judge against the *full* report, so
+lost content shows up as lower coverage/consistency. For each ratio the
+script prints the mean input tokens and their reduction, the mean compression
+and end-to-end latency (with the change against the full document), and the
+mean judge scores. Use `--csv` to keep the per-document rows.
+
+Calls go straight to the model backend (no summary cache); point the provider
+base URLs at `mock_provider` for a dry run.
+
+Run from the backend directory:
+    python -m benchmarks.extractive_compression --model "GPT 4.1" --limit 10 --ratios 1 0.7 0.5 0.3
+"""
+
+import argparse
+import asyncio
+import csv
+import glob
+import os
+import statistics
+import time
+
+from evaluation_module import aevaluate_with_mistral_small
+from extractive import compress
+from summarization_module import SUMMARIZATION_BACKENDS
+
+DATASET_DIR = os.path.join(os.path.dirname(__file__), "..", "..", "dataset")
+FACETS = ["Consistency", "Coverage", "Coherence", "Fluency", "Overall"]
+
+
+def judge_score(scores, facet):
+    """Return the judge's integer score for *facet*, or None if missing."""
+    try:
+        return float(scores[facet]["score"])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+async def run_document(path, model, ratios):
+    """Summarize and judge one report at every ratio; return one row per ratio."""
+    with open(path, encoding="utf-8") as f:
+        text = f.read()
+    backend = SUMMARIZATION_BACKENDS[model]
+    rows = []
+    for ratio in ratios:
+        started = time.perf_counter()
+        result = compress(text, ratio=ratio)
+        compress_seconds = time.perf_counter() - started
+        summary = await backend.asummarize(result.text)
+        total_seconds = time.perf_counter() - started
+        scores = await aevaluate_with_mistral_small(text, summary)
+        row = {
+            "document": os.path.basename(path),
+            "ratio": ratio,
+            "input_tokens": result.input_tokens,
+            "sent_tokens": result.output_tokens,
+            "compress_ms": compress_seconds * 1000,
+            "total_seconds": total_seconds,
+        }
+        row.update({facet.lower(): judge_score(scores, facet) for facet in FACETS})
+        rows.append(row)
+        print(f"{row['document']:<24s} {ratio:5.2f} {row['sent_tokens']:7d} {row['compress_ms']:8.1f} "
+              f"{total_seconds:8.2f} {row['overall'] if row['overall'] is not None else '-':>7}")
+    return rows
+
+
+def mean(values):
+    values = [value for value in values if value is not None]
+    return statistics.mean(values) if values else float("nan")
+
+
+async def run(args):
+    paths = sorted(glob.glob(os.path.join(DATASET_DIR, "*.txt")))[:args.limit]
+    print(f"{'document':<24s} {'ratio':>5s} {'tokens':>7s} {'comp ms':>8s} {'total s':>8s} {'overall':>7s}")
+    rows = []
+    for path in paths:
+        rows.extend(await run_document(path, args.model, args.ratios))
+
+    baseline = [row for row in rows if row["ratio"] == args.ratios[0]]
+    base_tokens = mean(row["sent_tokens"] for row in baseline)
+    base_seconds = mean(row["total_seconds"] for row in baseline)
+    print(f"\n{args.model}, {len(paths)} reports (changes relative to ratio {args.ratios[0]:g})")
+    print(f"{'ratio':>5s} {'tokens':>8s} {'reduction':>9s} {'comp ms':>8s} {'total s':>8s} {'change':>7s} "
+          + " ".join(f"{facet[:5]:>5s}" for facet in FACETS))
+    for ratio in args.ratios:
+        selected = [row for row in rows if row["ratio"] == ratio]
+        tokens = mean(row["sent_tokens"] for row in selected)
+        seconds = mean(row["total_seconds"] for row in selected)
+        print(f"{ratio:5.2f} {tokens:8.0f} {1 - tokens / base_tokens:9.1%} "
+              f"{mean(row['compress_ms'] for row in selected):8.1f} {seconds:8.2f} {seconds / base_seconds - 1:+7.1%} "
+              + " ".join(f"{mean(row[facet.lower()] for row in selected):5.2f}" for facet in FACETS))
+
+    if args.csv:
+        with open(args.csv, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+            writer.writeheader()
+            writer.writerows(rows)
+        print(f"per-document rows written to {args.csv}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--model", default="Mistral small 3", choices=list(SUMMARIZATION_BACKENDS))
+    parser.add_argument("--limit", type=int, default=10, help="number of dataset reports")
+    parser.add_argument("--ratios", type=float, nargs="+", default=[1.0, 0.7, 0.5, 0.3],
+                        help="keep ratios; the first one is the baseline")
+    parser.add_argument("--csv", help="write per-document rows to this CSV file")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Benchmark: Detoxify throughput per batch size, with and without length sorting.
+
+The selected reports in `dataset/` (plus a short summary-sized prefix of
+each, so lengths vary like in a /summarize request) are scored with
+`toxicity.score_batch` for every requested batch size (batch size 1 is the
+old one-forward-pass-per-text behaviour). Reports texts/second for
+length-sorted batches and for batches in input order. The cache is not
+involved.
+
+Run from the backend directory:
+    python -m benchmarks.toxicity_batching --limit 32 --batch-sizes 1 2 4 8 16 32
+"""
+
+import argparse
+import glob
+import os
+import time
+
+from model_registry import get_detoxify
+from toxicity import DETOXIFY_VARIANT, score_batch
+
+DATASET_DIR = os.path.join(os.path.dirname(__file__), "..", "..", "dataset")
+
+
+def load_texts(limit, summary_chars):
+    """Up to *limit* dataset reports, each followed by its first *summary_chars* characters."""
+    texts = []
+    for path in sorted(glob.glob(os.path.join(DATASET_DIR, "*.txt")))[:limit]:
+        with open(path, encoding="utf-8") as f:
+            report = f.read()
+        texts.extend([report, report[:summary_chars]])
+    return texts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--limit", type=int, default=32, help="number of dataset reports")
+    parser.add_argument("--summary-chars", type=int, default=1200, help="length of the summary-sized texts")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32])
+    parser.add_argument("--repeats", type=int, default=1, help="runs per setting (best is reported)")
+    args = parser.parse_args()
+
+    texts = load_texts(args.limit, args.summary_chars)
+    model = get_detoxify(DETOXIFY_VARIANT)
+    print(f"{len(texts)} texts on {model.device}, avg {sum(map(len, texts)) / len(texts):.0f} characters")
+    score_batch(texts[:2], batch_size=2)  # Warm-up
+
+    baseline = None
+    print(f"{'batch':>5s} {'sorted t/s':>11s} {'unsorted t/s':>13s} {'speedup':>8s}")
+    for batch_size in args.batch_sizes:
+        rates = {}
+        for sort_by_length in (True, False):
+            best = float("inf")
+            for _ in range(args.repeats):
+                started = time.perf_counter()
+                score_batch(texts, batch_size=batch_size, sort_by_length=sort_by_length)
+                best = min(best, time.perf_counter() - started)
+            rates[sort_by_length] = len(texts) / best
+        baseline = baseline or rates[True]
+        print(f"{batch_size:5d} {rates[True]:11.2f} {rates[False]:13.2f} x{rates[True] / baseline:7.2f}")
+
+
+if __name__ == "__main__":
+    main()
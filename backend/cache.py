@@ -0,0 +1,196 @@
+"""
+cache.py
+
+Two-tier (memory + SQLite) key/value cache for expensive, deterministic results
+such as LLM summaries.
+
+The first tier is an in-process LRU of recently used entries; the second tier
+is a SQLite table stored next to the summaries in `summaries.db`, so cached
+results survive restarts and are shared by all workers on the node. Entries
+expire after a TTL, and the persistent tier is trimmed least-recently-used
+first once it grows beyond its size budget. Hit/miss counters, the number
+of upstream bytes saved and any caller-reported savings (compute seconds,
+tokens, spend) are exposed through `stats()`.
+"""
+
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from db import DATABASE_PATH
+
+logger = logging.getLogger(__name__)
+
+
+def content_hash(text: str) -> str:
+    """
+    Hash *text* after normalizing whitespace.
+
+    Re-extractions of the same document that only differ in line breaks or
+    spacing therefore map to the same key.
+    """
+    normalized = " ".join(text.split())
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+def make_key(**parts: Any) -> str:
+    """Build a stable cache key from keyword parts (order-independent)."""
+    return hashlib.sha256(json.dumps(parts, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+class TieredCache:
+    """In-memory LRU in front of a persistent SQLite table, with TTL and size eviction."""
+
+    def __init__(self, table: str, max_memory_entries: int = 256,
+                 ttl_seconds: float = 7 * 24 * 3600, max_disk_bytes: int = 256 * 1024 * 1024,
+                 db_path: str = DATABASE_PATH):
+        """
+        Args:
+            table (str): SQLite table backing the persistent tier.
+            max_memory_entries (int): Entries kept in the in-memory LRU.
+            ttl_seconds (float): Lifetime of an entry; 0 disables expiry.
+            max_disk_bytes (int): Budget for stored values in the SQLite tier.
+            db_path (str): SQLite database file.
+        """
+        self.table = table
+        self.max_memory_entries = max_memory_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_disk_bytes = max_disk_bytes
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()  # key -> (value, created_at, size)
+        self._lock = threading.Lock()
+        self._counters = {"memory_hits": 0, "disk_hits": 0, "misses": 0,
+                          "writes": 0, "evictions": 0, "bytes_saved": 0}
+        self._saved: Dict[str, float] = {}
+
+        self.conn = sqlite3.connect(db_path, check_same_thread=False, timeout=10)
+        self.conn.execute(f"""
+        CREATE TABLE IF NOT EXISTS {table} (
+            key TEXT PRIMARY KEY,
+            value TEXT NOT NULL,
+            size_bytes INTEGER NOT NULL,
+            created_at REAL NOT NULL,
+            last_access REAL NOT NULL
+        );
+        """)
+        self.conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_last_access ON {table} (last_access)")
+        self.conn.commit()
+
+    def _expired(self, created_at: float, now: float) -> bool:
+        return bool(self.ttl_seconds) and now - created_at > self.ttl_seconds
+
+    def get(self, key: str, saved_bytes: int = 0) -> Optional[Any]:
+        """
+        Look *key* up in memory, then on disk.
+
+        Args:
+            key (str): Cache key (see `make_key`).
+            saved_bytes (int): Upstream payload size avoided if this is a hit,
+                added to the "bytes_saved" counter.
+
+        Returns:
+            The cached value, or None on a miss or an expired entry.
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None and not self._expired(entry[1], now):
+                self._memory.move_to_end(key)
+                self._counters["memory_hits"] += 1
+                self._counters["bytes_saved"] += saved_bytes
+                return entry[0]
+            self._memory.pop(key, None)
+
+            row = self.conn.execute(
+                f"SELECT value, created_at, size_bytes FROM {self.table} WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or self._expired(row[1], now):
+                if row is not None:
+                    self.conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+                    self.conn.commit()
+                    self._counters["evictions"] += 1
+                self._counters["misses"] += 1
+                return None
+
+            self.conn.execute(f"UPDATE {self.table} SET last_access = ? WHERE key = ?", (now, key))
+            self.conn.commit()
+            value = json.loads(row[0])
+            self._remember(key, value, row[1], row[2])
+            self._counters["disk_hits"] += 1
+            self._counters["bytes_saved"] += saved_bytes
+            return value
+
+    def put(self, key: str, value: Any) -> None:
+        """Store *value* (JSON-serializable) under *key* in both tiers."""
+        payload = json.dumps(value)
+        size = len(payload.encode("utf-8"))
+        now = time.time()
+        with self._lock:
+            self._remember(key, value, now, size)
+            self.conn.execute(
+                f"INSERT OR REPLACE INTO {self.table} (key, value, size_bytes, created_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, payload, size, now, now),
+            )
+            self.conn.commit()
+            self._counters["writes"] += 1
+            self._trim_disk(now)
+
+    def record_saving(self, **amounts: float) -> None:
+        """Add what a hit avoided (e.g. `compute_seconds=0.4, usd=0.001`) to the "saved" totals."""
+        with self._lock:
+            for name, amount in amounts.items():
+                self._saved[name] = self._saved.get(name, 0.0) + amount
+
+    def _remember(self, key: str, value: Any, created_at: float, size: int) -> None:
+        """Insert into the memory tier, evicting its least-recently-used entries."""
+        self._memory[key] = (value, created_at, size)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def _trim_disk(self, now: float) -> None:
+        """Drop expired rows, then least-recently-used rows beyond the size budget."""
+        if self.ttl_seconds:
+            cur = self.conn.execute(f"DELETE FROM {self.table} WHERE created_at < ?",
+                                    (now - self.ttl_seconds,))
+            self._counters["evictions"] += cur.rowcount
+
+        total = self.conn.execute(f"SELECT COALESCE(SUM(size_bytes), 0) FROM {self.table}").fetchone()[0]
+        if total > self.max_disk_bytes:
+            excess = total - self.max_disk_bytes
+            freed = 0
+            victims = []
+            for key, size in self.conn.execute(
+                    f"SELECT key, size_bytes FROM {self.table} ORDER BY last_access ASC"):
+                victims.append((key,))
+                freed += size
+                if freed >= excess:
+                    break
+            self.conn.executemany(f"DELETE FROM {self.table} WHERE key = ?", victims)
+            for (key,) in victims:
+                self._memory.pop(key, None)
+            self._counters["evictions"] += len(victims)
+        self.conn.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters, hit ratio, bytes and other savings, and tier sizes."""
+        with self._lock:
+            counters = dict(self._counters)
+            saved = dict(self._saved)
+            memory_entries = len(self._memory)
+            disk_entries, disk_bytes = self.conn.execute(
+                f"SELECT COUNT(*), COALESCE(SUM(size_bytes), 0) FROM {self.table}"
+            ).fetchone()
+        lookups = counters["memory_hits"] + counters["disk_hits"] + counters["misses"]
+        hits = counters["memory_hits"] + counters["disk_hits"]
+        return dict(counters,
+                    hit_ratio=hits / lookups if lookups else None,
+                    saved=saved,
+                    memory_entries=memory_entries,
+                    disk_entries=disk_entries,
+                    disk_bytes=disk_bytes)
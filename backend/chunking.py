@@ -0,0 +1,209 @@
+"""
+chunking.py
+
+Token-aware chunking of long documents for local seq2seq models.
+
+Splits a document into overlapping token windows that fit a model's input
+limit and, where possible, end on a sentence boundary. Boundaries come either
+from a precomputed set of sentence-ending punctuation token ids (computed once
+per tokenizer) or from sentence spans found once on the raw text and mapped to
+tokens through the fast tokenizer's offset mapping. Every chunk carries both its
+token slice and the character span it covers in the original text.
+"""
+
+import bisect
+import re
+import threading
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, List, Tuple
+
+# Characters that end a sentence when they form a whole token
+SENTENCE_END_CHARS = ".!?"
+
+# Sentence terminator (plus closing quotes/brackets) followed by whitespace or end of text
+SENTENCE_END_PATTERN = re.compile(r"[.!?]+[\"')\]]*(?=\s|$)")
+
+# Cache of boundary token ids per (tokenizer, characters) pair
+_boundary_id_cache: Dict[Tuple[str, int, str], FrozenSet[int]] = {}
+_boundary_id_lock = threading.Lock()
+
+
+@dataclass
+class TokenChunk:
+    """A contiguous slice of a tokenized document."""
+    input_ids: List[int]   # Token ids of the chunk (special tokens included where present)
+    token_start: int       # Index of the first token in the full encoding
+    token_end: int         # Index one past the last token in the full encoding
+    char_start: int        # Offset of the first character covered in the source text
+    char_end: int          # Offset one past the last character covered in the source text
+
+
+@dataclass
+class TokenEncoding:
+    """Token ids of a whole document together with their character offsets."""
+    input_ids: List[int]
+    offsets: List[Tuple[int, int]]
+
+
+def sentence_boundary_token_ids(tokenizer, chars: str = SENTENCE_END_CHARS) -> FrozenSet[int]:
+    """
+    Return the ids of every vocabulary token that decodes to sentence-ending punctuation.
+
+    The vocabulary is decoded once per tokenizer (in a single batched call) and
+    the result is cached, so boundary checks during chunking are set lookups
+    instead of one `decode` call per token.
+
+    Args:
+        tokenizer: A HuggingFace tokenizer.
+        chars (str): Characters that count as sentence terminators.
+
+    Returns:
+        frozenset[int]: Token ids whose stripped text is made only of *chars*.
+    """
+    key = (getattr(tokenizer, "name_or_path", ""), len(tokenizer), chars)
+    with _boundary_id_lock:
+        if key in _boundary_id_cache:
+            return _boundary_id_cache[key]
+
+    token_ids = list(range(len(tokenizer)))
+    decoded = tokenizer.batch_decode([[i] for i in token_ids])
+    boundary_ids = frozenset(
+        i for i, piece in zip(token_ids, decoded)
+        if piece.strip() and all(c in chars for c in piece.strip())
+    )
+
+    with _boundary_id_lock:
+        _boundary_id_cache[key] = boundary_ids
+    return boundary_ids
+
+
+def sentence_end_offsets(text: str) -> List[int]:
+    """
+    Find sentence ends on the raw text in a single regex pass.
+
+    Returns:
+        list[int]: Character offsets one past each sentence terminator, ascending.
+    """
+    return [match.end() for match in SENTENCE_END_PATTERN.finditer(text)]
+
+
+class TokenChunker:
+    """
+    Split documents into overlapping, sentence-aligned token chunks.
+
+    Chunk sizes are balanced across the document (the token count is divided
+    evenly between the minimum number of chunks), each non-final chunk is
+    shortened to the last sentence boundary found within `boundary_window`
+    tokens of its nominal end, and consecutive chunks overlap by `overlap`
+    tokens to keep context across the cut.
+    """
+
+    def __init__(self, tokenizer, max_tokens: int = 1024, overlap: int = 150,
+                 boundary_window: int = 50, boundary_mode: str = "tokens"):
+        """
+        Args:
+            tokenizer: A *fast* HuggingFace tokenizer (offset mapping is required).
+            max_tokens (int): Maximum number of tokens per chunk.
+            overlap (int): Tokens shared by consecutive chunks.
+            boundary_window (int): How far back from a chunk's nominal end a
+                sentence boundary is searched for.
+            boundary_mode (str): "tokens" to use punctuation token ids,
+                "sentences" to use sentence spans found on the raw text.
+
+        Raises:
+            ValueError: If the tokenizer is not a fast tokenizer, the overlap does
+                not fit in a chunk, or the boundary mode is unknown.
+        """
+        if not getattr(tokenizer, "is_fast", False):
+            raise ValueError("TokenChunker requires a fast tokenizer (offset mapping support).")
+        if not 0 <= overlap < max_tokens:
+            raise ValueError(f"overlap ({overlap}) must be in [0, max_tokens={max_tokens}).")
+        if boundary_mode not in ("tokens", "sentences"):
+            raise ValueError(f"Unknown boundary mode '{boundary_mode}'.")
+
+        self.tokenizer = tokenizer
+        self.max_tokens = max_tokens
+        self.overlap = overlap
+        self.boundary_window = boundary_window
+        self.boundary_mode = boundary_mode
+        self.boundary_ids = (sentence_boundary_token_ids(tokenizer)
+                             if boundary_mode == "tokens" else frozenset())
+
+    def encode(self, text: str) -> TokenEncoding:
+        """Tokenize *text* once, keeping special tokens and character offsets."""
+        encoded = self.tokenizer(text, truncation=False, add_special_tokens=True,
+                                 return_offsets_mapping=True)
+        return TokenEncoding(encoded["input_ids"], [tuple(o) for o in encoded["offset_mapping"]])
+
+    def boundary_positions(self, text: str, encoding: TokenEncoding) -> List[int]:
+        """
+        Return the token indices that end a sentence, in ascending order.
+
+        In "tokens" mode a token is a boundary if its id is a punctuation id;
+        in "sentences" mode if its character span ends exactly where a
+        sentence found on the raw text ends.
+        """
+        if self.boundary_mode == "tokens":
+            return [i for i, token_id in enumerate(encoding.input_ids) if token_id in self.boundary_ids]
+
+        sentence_ends = set(sentence_end_offsets(text))
+        return [i for i, (start, end) in enumerate(encoding.offsets)
+                if end > start and end in sentence_ends]
+
+    def chunk(self, text: str) -> List[TokenChunk]:
+        """
+        Split *text* into chunks of at most `max_tokens` tokens.
+
+        Returns:
+            list[TokenChunk]: A single chunk when the whole text fits, otherwise
+                              overlapping chunks covering the full encoding.
+        """
+        encoding = self.encode(text)
+        return self.chunk_encoding(encoding, self.boundary_positions(text, encoding))
+
+    def chunk_encoding(self, encoding: TokenEncoding, boundaries: List[int]) -> List[TokenChunk]:
+        """
+        Split an existing encoding using precomputed boundary token indices.
+
+        Args:
+            encoding (TokenEncoding): Output of `encode`.
+            boundaries (list[int]): Ascending sentence-boundary token indices.
+
+        Returns:
+            list[TokenChunk]: The chunks in document order.
+        """
+        total = len(encoding.input_ids)
+        if total <= self.max_tokens:
+            return [self._make_chunk(encoding, 0, total)]
+
+        # Distribute tokens evenly across the minimum number of chunks
+        num_chunks = (total + self.max_tokens - 1) // self.max_tokens
+        chunk_size = total // num_chunks
+
+        chunks = []
+        start = 0
+        while start < total:
+            end = min(start + chunk_size, total)
+
+            # Snap non-final chunks back to the last sentence boundary near their end
+            if end < total:
+                search_start = max(end - self.boundary_window, start + chunk_size // 2)
+                position = bisect.bisect_left(boundaries, end) - 1
+                if position >= 0 and boundaries[position] >= search_start:
+                    end = boundaries[position] + 1  # Include the punctuation token
+
+            chunks.append(self._make_chunk(encoding, start, end))
+            if end == total:
+                break
+            # Overlap with the previous chunk, but always make progress
+            start = max(end - self.overlap, start + 1)
+
+        return chunks
+
+    @staticmethod
+    def _make_chunk(encoding: TokenEncoding, start: int, end: int) -> TokenChunk:
+        """Build a chunk for tokens [start, end), deriving its character span from the offsets."""
+        spans = [(s, e) for s, e in encoding.offsets[start:end] if e > s]  # Skip special tokens
+        char_start = spans[0][0] if spans else 0
+        char_end = spans[-1][1] if spans else 0
+        return TokenChunk(encoding.input_ids[start:end], start, end, char_start, char_end)
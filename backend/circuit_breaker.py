@@ -0,0 +1,204 @@
+"""
+circuit_breaker.py
+
+Circuit breakers for the summarization backends and the evaluation judge.
+
+Each backend has a breaker that watches a sliding time window of its calls.
+When the error rate or the share of slow calls crosses its threshold the
+breaker opens: calls fail fast with a "temporarily unavailable" result instead
+of waiting for a provider timeout. After a cool-down it lets a few trial calls
+through (half-open); if they succeed the breaker closes again, otherwise it
+re-opens. Breaker states are exposed for the health endpoint so the frontend
+can grey out unavailable models.
+
+Thresholds are configurable through `CIRCUIT_*` environment variables.
+"""
+
+import logging
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Dict
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# Breaker settings shared by all backends
+CIRCUIT_WINDOW_SECONDS = float(os.getenv("CIRCUIT_WINDOW_SECONDS", "120"))
+CIRCUIT_MIN_CALLS = int(os.getenv("CIRCUIT_MIN_CALLS", "5"))                   # Calls in the window before tripping
+CIRCUIT_ERROR_RATE = float(os.getenv("CIRCUIT_ERROR_RATE", "0.5"))             # Trip when this share of calls failed
+CIRCUIT_SLOW_CALL_SECONDS = float(os.getenv("CIRCUIT_SLOW_CALL_SECONDS", "60"))
+CIRCUIT_SLOW_RATE = float(os.getenv("CIRCUIT_SLOW_RATE", "0.8"))               # ... or this share was slow
+# Slow-call threshold of local (in-process) models, whose latency grows with the
+# document on CPU nodes; "inf" exempts them from the slow-call rule
+CIRCUIT_LOCAL_SLOW_CALL_SECONDS = float(os.getenv("CIRCUIT_LOCAL_SLOW_CALL_SECONDS", "inf"))
+CIRCUIT_OPEN_SECONDS = float(os.getenv("CIRCUIT_OPEN_SECONDS", "30"))          # Cool-down before trial calls
+CIRCUIT_HALF_OPEN_CALLS = int(os.getenv("CIRCUIT_HALF_OPEN_CALLS", "2"))       # Successful trials needed to close
+
+
+class ModelUnavailableError(Exception):
+    """Raised (on streaming paths) when a backend's circuit breaker is open."""
+
+
+def unavailable_message(name: str) -> str:
+    """The fail-fast result returned while *name*'s breaker is open."""
+    return (f"Error: Model temporarily unavailable ({name}). "
+            "Please try again shortly or choose another model.")
+
+
+class CircuitBreaker:
+    """Closed / open / half-open breaker over a sliding window of call outcomes."""
+
+    def __init__(self, name: str, window_seconds: float = CIRCUIT_WINDOW_SECONDS,
+                 min_calls: int = CIRCUIT_MIN_CALLS, error_rate: float = CIRCUIT_ERROR_RATE,
+                 slow_call_seconds: float = CIRCUIT_SLOW_CALL_SECONDS, slow_rate: float = CIRCUIT_SLOW_RATE,
+                 open_seconds: float = CIRCUIT_OPEN_SECONDS, half_open_calls: int = CIRCUIT_HALF_OPEN_CALLS):
+        self.name = name
+        self.window_seconds = window_seconds
+        self.min_calls = min_calls
+        self.error_rate = error_rate
+        self.slow_call_seconds = slow_call_seconds
+        self.slow_rate = slow_rate
+        self.open_seconds = open_seconds
+        self.half_open_calls = half_open_calls
+
+        self._lock = threading.Lock()
+        self._window = deque()  # (timestamp, ok, slow)
+        self.state = CLOSED
+        self.opened_at = 0.0
+        self.trials_in_flight = 0
+        self.trial_successes = 0
+        self.trips = 0
+        self.rejected = 0
+
+    def _prune(self, now: float) -> None:
+        while self._window and now - self._window[0][0] > self.window_seconds:
+            self._window.popleft()
+
+    def _rates(self):
+        calls = len(self._window)
+        if not calls:
+            return 0, 0.0, 0.0
+        errors = sum(1 for _, ok, _ in self._window if not ok)
+        slow = sum(1 for _, _, is_slow in self._window if is_slow)
+        return calls, errors / calls, slow / calls
+
+    def _open(self, now: float, reason: str) -> None:
+        self.state = OPEN
+        self.opened_at = now
+        self.trips += 1
+        self.trials_in_flight = 0
+        self.trial_successes = 0
+        logger.warning(f"Circuit '{self.name}' opened ({reason})")
+
+    def allow(self) -> bool:
+        """
+        Reserve a call slot.
+
+        Returns:
+            bool: False if the call must fail fast. Every True must be followed
+                  by `record` or `cancel`.
+        """
+        now = time.monotonic()
+        with self._lock:
+            if self.state == OPEN and now - self.opened_at >= self.open_seconds:
+                self.state = HALF_OPEN
+                logger.info(f"Circuit '{self.name}' half-open, probing with trial calls")
+            if self.state == CLOSED:
+                return True
+            if self.state == HALF_OPEN and self.trials_in_flight < self.half_open_calls:
+                self.trials_in_flight += 1
+                return True
+            self.rejected += 1
+            return False
+
+    def record(self, ok: bool, latency_seconds: float) -> None:
+        """Report the outcome of a call admitted by `allow`."""
+        now = time.monotonic()
+        slow = latency_seconds >= self.slow_call_seconds
+        with self._lock:
+            if self.state == HALF_OPEN:
+                self.trials_in_flight = max(0, self.trials_in_flight - 1)
+                if not ok or slow:
+                    self._open(now, "trial call failed" if not ok else "trial call too slow")
+                    return
+                self.trial_successes += 1
+                if self.trial_successes >= self.half_open_calls:
+                    self.state = CLOSED
+                    self._window.clear()
+                    logger.info(f"Circuit '{self.name}' closed again")
+                return
+            if self.state == OPEN:
+                return  # Late result of a call started before the breaker opened
+
+            self._window.append((now, ok, slow))
+            self._prune(now)
+            calls, error_rate, slow_rate = self._rates()
+            if calls >= self.min_calls:
+                if error_rate >= self.error_rate:
+                    self._open(now, f"error rate {error_rate:.0%} over {calls} calls")
+                elif slow_rate >= self.slow_rate:
+                    self._open(now, f"{slow_rate:.0%} of {calls} calls slower than {self.slow_call_seconds:g}s")
+
+    def cancel(self) -> None:
+        """Release a slot whose call was cancelled before it produced an outcome."""
+        with self._lock:
+            if self.state == HALF_OPEN:
+                self.trials_in_flight = max(0, self.trials_in_flight - 1)
+
+    def snapshot(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        with self._lock:
+            self._prune(now)
+            calls, error_rate, slow_rate = self._rates()
+            state = self.state
+            if state == OPEN and now - self.opened_at >= self.open_seconds:
+                state = HALF_OPEN  # Next call will be a trial
+            return {
+                "state": state,
+                "available": state != OPEN,
+                "calls_in_window": calls,
+                "error_rate": error_rate if calls else None,
+                "slow_rate": slow_rate if calls else None,
+                "retry_in_seconds": max(0.0, self.opened_at + self.open_seconds - now) if state == OPEN else 0.0,
+                "trips": self.trips,
+                "rejected": self.rejected,
+            }
+
+
+class CircuitBreakers:
+    """Lazily created breaker per backend name."""
+
+    def __init__(self):
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+
+    def get(self, name: str) -> CircuitBreaker:
+        with self._lock:
+            if name not in self._breakers:
+                self._breakers[name] = CircuitBreaker(name)
+            return self._breakers[name]
+
+    def configure(self, name: str, **settings) -> CircuitBreaker:
+        """Override `CircuitBreaker` settings (e.g. `slow_call_seconds`) of *name*'s breaker."""
+        breaker = self.get(name)
+        with breaker._lock:
+            for setting, value in settings.items():
+                if not hasattr(breaker, setting):
+                    raise ValueError(f"Unknown circuit breaker setting '{setting}'.")
+                setattr(breaker, setting, value)
+        return breaker
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return the state of every breaker."""
+        with self._lock:
+            breakers = list(self._breakers.values())
+        return {breaker.name: breaker.snapshot() for breaker in breakers}
+
+
+# Shared breakers for all summarization backends and the evaluation judge
+circuit_breakers = CircuitBreakers()
@@ -1,6 +1,7 @@
 import os
 import sqlite3
 import json
+import threading
 
 # Database file path - stored in the same directory as this module
 DATABASE_PATH = os.path.join(os.path.dirname(__file__), "summaries.db")
@@ -18,6 +19,7 @@ class Database:
         """
         self.conn = sqlite3.connect(DATABASE_PATH, check_same_thread=False)
         self.conn.row_factory = sqlite3.Row  # Enable dict-like access to rows
+        self.lock = threading.RLock()  # Request handlers and background scoring write concurrently
         self.create_table()
 
     def create_table(self):
@@ -50,6 +52,9 @@ class Database:
             summary (str): Generated summary text
             metadata (dict): Additional metadata including filename
             
+        Returns:
+            int: The ID of the new summary record
+            
         Note: Automatically enforces a limit of 10000 summaries per user by removing oldest entries.
         """
         # Insert new summary record
@@ -59,42 +64,105 @@ class Database:
         """
         metadata_json = json.dumps(metadata)
         filename = metadata.get("filename", "Unknown Filename")  # Fallback for missing filename
-        self.conn.execute(query, (user_id, filename, plain_text, summary, metadata_json))
-        self.conn.commit()
+        with self.lock:
+            cursor = self.conn.execute(query, (user_id, filename, plain_text, summary, metadata_json))
+            self.conn.commit()
+            summary_id = cursor.lastrowid
+            
+            # Enforce summary limit: retain only the last 120 summaries for this user
+            count_query = "SELECT COUNT(*) as count FROM summaries WHERE user_id = ?"
+            count_result = self.conn.execute(count_query, (user_id,)).fetchone()
+            summary_count = count_result["count"]
+            
+            # Remove oldest summaries if limit exceeded
+            if summary_count > 10000:
+                num_to_remove = summary_count - 10000
+                delete_query = """
+                DELETE FROM summaries 
+                WHERE id IN (
+                    SELECT id FROM summaries
+                    WHERE user_id = ?
+                    ORDER BY created_at ASC
+                    LIMIT ?
+                )
+                """
+                self.conn.execute(delete_query, (user_id, num_to_remove))
+                self.conn.commit()
+        return summary_id
+
+    def get_summary(self, summary_id: int):
+        """
+        Retrieve one summary record by its ID.
         
-        # Enforce summary limit: retain only the last 120 summaries for this user
-        count_query = "SELECT COUNT(*) as count FROM summaries WHERE user_id = ?"
-        count_result = self.conn.execute(count_query, (user_id,)).fetchone()
-        summary_count = count_result["count"]
+        Args:
+            summary_id (int): Unique identifier of the summary
+            
+        Returns:
+            dict | None: The summary record with its metadata decoded, or None if it does not exist
+        """
+        with self.lock:
+            row = self.conn.execute("SELECT * FROM summaries WHERE id = ?", (summary_id,)).fetchone()
+        if row is None:
+            return None
+        record = dict(row)
+        record["metadata"] = json.loads(record["metadata"]) if record["metadata"] else {}
+        return record
+
+    def update_summary_metadata(self, summary_id: int, metadata):
+        """
+        Replace the metadata of an existing summary (e.g. when deferred scoring finishes).
         
-        # Remove oldest summaries if limit exceeded
-        if summary_count > 10000:
-            num_to_remove = summary_count - 10000
-            delete_query = """
-            DELETE FROM summaries 
-            WHERE id IN (
-                SELECT id FROM summaries
-                WHERE user_id = ?
-                ORDER BY created_at ASC
-                LIMIT ?
-            )
-            """
-            self.conn.execute(delete_query, (user_id, num_to_remove))
+        Args:
+            summary_id (int): Unique identifier of the summary
+            metadata (dict): The complete new metadata
+            
+        Returns:
+            bool: False if the summary no longer exists
+        """
+        with self.lock:
+            cursor = self.conn.execute("UPDATE summaries SET metadata = ? WHERE id = ?",
+                                       (json.dumps(metadata), summary_id))
             self.conn.commit()
+        return cursor.rowcount > 0
 
     def get_summaries_for_user(self, user_id):
         """
         Retrieve all summaries for a specific user, ordered by most recent first.
-        
+
         Args:
             user_id (str): Unique identifier for the user
-            
+
         Returns:
             list[dict]: List of summary records as dictionaries
         """
-        query = "SELECT * FROM summaries WHERE user_id = ? ORDER BY created_at DESC"
-        cursor = self.conn.execute(query, (user_id,))
-        return [dict(row) for row in cursor.fetchall()]
+        query = "SELECT * FROM summaries WHERE user_id = ? ORDER BY created_at DESC, id DESC"
+        with self.lock:
+            rows = self.conn.execute(query, (user_id,)).fetchall()
+        return [dict(row) for row in rows]
+
+    def list_summary_ids(self, user_id=None, scoring_status=None):
+        """
+        List summary IDs, oldest first, optionally filtered by user and scoring status.
+        
+        Args:
+            user_id (str): Restrict to this user's summaries (all users if None)
+            scoring_status (str): Restrict to summaries whose metadata "scoring" status
+                                  matches (e.g. "pending"); no restriction if None
+            
+        Returns:
+            list[int]: Matching summary IDs
+        """
+        query = "SELECT id FROM summaries WHERE 1 = 1"
+        params = []
+        if user_id is not None:
+            query += " AND user_id = ?"
+            params.append(user_id)
+        if scoring_status is not None:
+            query += " AND json_extract(metadata, '$.scoring.status') = ?"
+            params.append(scoring_status)
+        with self.lock:
+            rows = self.conn.execute(query + " ORDER BY id", params).fetchall()
+        return [row["id"] for row in rows]
 
     def delete_summary(self, summary_id: int):
         """
@@ -104,5 +172,6 @@ class Database:
             summary_id (int): Unique identifier of the summary to delete
         """
         query = "DELETE FROM summaries WHERE id = ?"
-        self.conn.execute(query, (summary_id,))
-        self.conn.commit()
+        with self.lock:
+            self.conn.execute(query, (summary_id,))
+            self.conn.commit()
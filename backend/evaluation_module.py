@@ -3,37 +3,90 @@ evaluation_module.py
 
 Provides functionality to evaluate a model-generated summary against the original source text
 using Mistral’s `mistral-small` LLM. Scores four facets—consistency, coverage, coherence, and fluency—
-and computes an overall score. The evaluation is driven by a system+user prompt and retries until valid JSON is returned.
+and computes an overall score. The evaluation is driven by a system+user prompt in JSON mode; replies
+that are not quite valid JSON are salvaged by a tolerant parser, and invalid replies or provider errors
+are retried with exponential backoff and jitter within an attempt budget and a deadline. When neither
+yields scores, a clearly marked "unavailable" result is returned instead of blocking the summary.
+Successful evaluations are cached by source hash, summary hash and judge prompt version, so reruns
+of the same (source, summary) pair do not call the judge again.
+
+`aevaluate_summary` puts the local metrics of `lexical_metrics` (ROUGE, compression, entity and
+number retention) in front of the judge as a cheap first tier; with JUDGE_MODE=gated the judge
+only runs for summaries whose lexical score falls below a threshold, plus a sampled share of the rest.
 """
 
+import asyncio
+import logging
 import os
 import json
+import random
 import re
-from typing import Dict
+import time
+from typing import Any, Dict, Optional
+
+from cache import TieredCache, content_hash, make_key
+from metrics import Histogram, estimate_tokens
+from provider_clients import get_mistral_client
+from rate_limiter import rate_limits
+from circuit_breaker import circuit_breakers
+from extractive import compress_for_model
+from lexical_metrics import lexical_scores
+
+logger = logging.getLogger(__name__)
+
+# Circuit breaker guarding the judge model
+JUDGE_BREAKER = "judge:mistral-small"
+
+# Retry budget of one evaluation: total deadline (including rate-limit queueing),
+# maximum judge calls, and the exponential backoff between them (full jitter)
+EVAL_DEADLINE_SECONDS = float(os.getenv("EVAL_DEADLINE_SECONDS", "60"))
+EVAL_MAX_ATTEMPTS = int(os.getenv("EVAL_MAX_ATTEMPTS", "4"))
+EVAL_BACKOFF_BASE_SECONDS = float(os.getenv("EVAL_BACKOFF_BASE_SECONDS", "0.5"))
+EVAL_BACKOFF_MAX_SECONDS = float(os.getenv("EVAL_BACKOFF_MAX_SECONDS", "8"))
+
+# Ask the judge for a JSON object through Mistral's JSON mode
+EVAL_JSON_MODE = os.getenv("EVAL_JSON_MODE", "1") == "1"
 
-from mistralai import Mistral
+FACETS = ("Consistency", "Coverage", "Coherence", "Fluency")
+
+# "always" sends every summary to the judge; "gated" only those whose lexical
+# "overall" score is below JUDGE_GATE_THRESHOLD, plus a JUDGE_SAMPLE_RATE share of the rest
+JUDGE_MODE = os.getenv("JUDGE_MODE", "always")
+JUDGE_GATE_THRESHOLD = float(os.getenv("JUDGE_GATE_THRESHOLD", "0.6"))
+JUDGE_SAMPLE_RATE = float(os.getenv("JUDGE_SAMPLE_RATE", "0.1"))
+
+# Keep ratio of the judge's copy of the source (see `extractive`; 1 = full source)
+JUDGE_EXTRACTIVE_RATIO = float(os.getenv("EXTRACTIVE_RATIO_JUDGE", "1"))
 
 # Maximum tokens allowed in the LLM’s evaluation response
 MAX_EVAL_TOKENS = 256
 
+# Version of the judge prompt; bump whenever `_judge_messages` changes so cached
+# evaluations are no longer served
+JUDGE_PROMPT_VERSION = "1"
 
-def evaluate_with_mistral_small(source_text: str, summary_text: str) -> Dict[str, int]:
-    """
-    Judge *summary_text* against *source_text* using Mistral’s `mistral-small` model.
-    Returns a mapping of facet names to score objects, each with:
-      - "score": integer 1–10
-      - "justification": ≤30-word rationale
-    Also includes an "Overall" entry as the rounded average of the four facet scores.
+# Judge list prices (USD per million tokens), used to report the spend saved by the cache
+JUDGE_USD_PER_MILLION_INPUT = float(os.getenv("JUDGE_USD_PER_MILLION_INPUT", "0.10"))
+JUDGE_USD_PER_MILLION_OUTPUT = float(os.getenv("JUDGE_USD_PER_MILLION_OUTPUT", "0.30"))
 
-    The function will retry the LLM call indefinitely until valid JSON is received.
-    Raises:
-        RuntimeError: if the Mistral client fails to initialize (missing/invalid API key).
+# Persistent cache of successful evaluations (in-memory LRU + SQLite table in summaries.db)
+JUDGE_CACHE_ENABLED = os.getenv("JUDGE_CACHE_ENABLED", "1") != "0"
+judge_cache = TieredCache(
+    "judge_cache",
+    max_memory_entries=int(os.getenv("JUDGE_CACHE_MEMORY_ENTRIES", "512")),
+    ttl_seconds=float(os.getenv("JUDGE_CACHE_TTL_SECONDS", str(30 * 24 * 3600))),
+    max_disk_bytes=int(float(os.getenv("JUDGE_CACHE_MAX_MB", "64")) * 1024 * 1024),
+)
+
+
+def _judge_messages(source_text: str, summary_text: str):
     """
-    # Initialize the Mistral client from environment variable
-    client = Mistral(api_key=os.getenv("MISTRAL_API_KEY"))
-    if not client:
-        raise RuntimeError("Mistral client init failed – check your API key.")
+    Build the system+user chat messages sent to the judge model.
 
+    The source is pre-compressed when EXTRACTIVE_RATIO_JUDGE is below 1
+    (off by default: consistency is best judged against the full source).
+    """
+    source_text = compress_for_model(source_text, "judge", ratio=JUDGE_EXTRACTIVE_RATIO)
     # System prompt defines the role, scoring rubric, and output format (compact JSON)
     system_prompt = (
         "You are “NATO-Judge-v1”, an impartial military-intelligence reviewer. "
@@ -62,35 +115,349 @@ def evaluate_with_mistral_small(source_text: str, summary_text: str) -> Dict[str
         "<SUMMARY>\n" f"{summary_text}\n" "</SUMMARY>"
     )
 
-    attempts = 0
-    while True:
-        attempts += 1
-
-        # Send the request to Mistral’s chat-completion endpoint
-        resp = client.chat.complete(
-            model="mistral-small-latest",
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt},
-            ],
-            temperature=0.0,
-            max_tokens=MAX_EVAL_TOKENS,
-            stream=False,
-        )
-
-        # Extract and trim the raw text response
-        raw = resp.choices[0].message.content.strip()
-        # Remove potential Markdown code fences around the JSON
-        raw_clean = re.sub(r'^```(?:json)?\s*', '', raw)
-        raw_clean = re.sub(r'\s*```$', '', raw_clean).strip()
-
-        # Attempt to parse the cleaned string as JSON; retry on failure
+    return [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": user_prompt},
+    ]
+
+
+def _parse_judge_output(raw: str) -> Optional[Dict[str, Any]]:
+    """
+    Parse the judge's reply into a score mapping, salvaging near-valid output.
+
+    Tries, in order: the reply as JSON (without Markdown fences), the outermost
+    {...} block with trailing commas removed, and finally a per-facet regex
+    scan for "score"/"justification" pairs. A missing "Overall" is computed as
+    the rounded average of the facet scores.
+
+    Returns:
+        dict | None: The parsed scores, or None if fewer than all four facet
+                     scores could be recovered.
+    """
+    # Remove potential Markdown code fences around the JSON
+    raw_clean = re.sub(r'^```(?:json)?\s*', '', (raw or "").strip())
+    raw_clean = re.sub(r'\s*```$', '', raw_clean).strip()
+
+    candidates = [raw_clean]
+    start, end = raw_clean.find("{"), raw_clean.rfind("}")
+    if 0 <= start < end:
+        candidates.append(re.sub(r",\s*([}\]])", r"\1", raw_clean[start:end + 1]))
+
+    scores = None
+    for candidate in candidates:
         try:
-            scores = json.loads(raw_clean)
-            break
+            parsed = json.loads(candidate)
         except json.JSONDecodeError:
-            # Informational retry; loop will re-attempt until valid JSON
-            print(f"Attempt {attempts}: invalid JSON, retrying...")
+            continue
+        if isinstance(parsed, dict):
+            scores = parsed
+            break
+
+    if scores is None:
+        # Truncated or malformed JSON: recover each facet that is still readable
+        scores = {}
+        for facet in FACETS + ("Overall",):
+            match = re.search(
+                rf'"?{facet}"?\s*:\s*\{{\s*"score"\s*:\s*"?(\d+(?:\.\d+)?)"?'
+                rf'(?:\s*,\s*"justification"\s*:\s*"((?:[^"\\]|\\.)*)")?',
+                raw_clean, re.IGNORECASE)
+            if match:
+                try:
+                    justification = json.loads(f'"{match.group(2) or ""}"')
+                except json.JSONDecodeError:
+                    justification = match.group(2)
+                scores[facet] = {"score": round(float(match.group(1))), "justification": justification}
+
+    if not all(isinstance(scores.get(facet), dict) and "score" in scores[facet] for facet in FACETS):
+        return None
+    if not isinstance(scores.get("Overall"), dict) or "score" not in scores["Overall"]:
+        average = sum(float(scores[facet]["score"]) for facet in FACETS) / len(FACETS)
+        scores["Overall"] = {"score": round(average), "justification": "Average of the four facet scores."}
+    return scores
+
+
+class EvaluationStats:
+    """Attempt-count distribution and outcomes of judge evaluations."""
+
+    def __init__(self):
+        self.attempts = Histogram([1, 2, 3, 4, 6, 8])
+        self.outcomes = {"skipped": 0, "cached": 0, "scored": 0, "salvaged": 0, "unavailable": 0}
+
+    def record(self, attempts: int, outcome: str) -> None:
+        if attempts:  # Skipped evaluations and cache hits make no judge call
+            self.attempts.record(attempts)
+        self.outcomes[outcome] = self.outcomes.get(outcome, 0) + 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "deadline_seconds": EVAL_DEADLINE_SECONDS,
+            "max_attempts": EVAL_MAX_ATTEMPTS,
+            "judge_mode": JUDGE_MODE,
+            "outcomes": dict(self.outcomes),
+            "attempts_histogram": self.attempts.snapshot(),
+        }
+
+
+# Shared by the sync and async evaluation paths
+evaluation_stats = EvaluationStats()
+
+
+def _judge_request(messages) -> Dict[str, Any]:
+    """Keyword arguments of the judge's chat-completion call."""
+    request = {
+        "model": "mistral-small-latest",
+        "messages": messages,
+        "temperature": 0.0,
+        "max_tokens": MAX_EVAL_TOKENS,
+        "stream": False,
+    }
+    if EVAL_JSON_MODE:
+        request["response_format"] = {"type": "json_object"}
+    return request
+
+
+def _backoff_seconds(attempt: int) -> float:
+    """Full-jitter exponential backoff before retry number *attempt* (1-based)."""
+    return random.uniform(0, min(EVAL_BACKOFF_MAX_SECONDS, EVAL_BACKOFF_BASE_SECONDS * 2 ** (attempt - 1)))
+
+
+def _is_strict_json(raw: str) -> bool:
+    try:
+        json.loads(re.sub(r'\s*```$', '', re.sub(r'^```(?:json)?\s*', '', (raw or "").strip())))
+        return True
+    except json.JSONDecodeError:
+        return False
+
+
+def judge_cache_key(source_text: str, summary_text: str) -> str:
+    """Cache key of one evaluation: source and summary hashes plus everything that shapes the judge's reply."""
+    return make_key(
+        source=content_hash(source_text),
+        summary=content_hash(summary_text),
+        prompt_version=JUDGE_PROMPT_VERSION,
+        model="mistral-small-latest",
+        max_tokens=MAX_EVAL_TOKENS,
+        json_mode=EVAL_JSON_MODE,
+        source_ratio=JUDGE_EXTRACTIVE_RATIO,
+    )
+
+
+def _cached_evaluation(key: str) -> Optional[Dict[str, Any]]:
+    """Return cached scores for *key* (recording the judge time, tokens and spend saved), or None."""
+    if not JUDGE_CACHE_ENABLED:
+        return None
+    entry = judge_cache.get(key)
+    if entry is None:
+        return None
+    judge_cache.record_saving(
+        judge_seconds=entry["seconds"],
+        judge_tokens=entry["input_tokens"] + entry["output_tokens"],
+        usd=(entry["input_tokens"] * JUDGE_USD_PER_MILLION_INPUT
+             + entry["output_tokens"] * JUDGE_USD_PER_MILLION_OUTPUT) / 1e6,
+    )
+    evaluation_stats.record(0, "cached")
+    return entry["scores"]
+
+
+def _scored(raw: str, scores: Dict[str, Any], attempts: int, key: str, seconds: float,
+            input_tokens: int) -> Dict[str, Any]:
+    """Record (and cache) a successful evaluation and return its scores."""
+    salvaged = not _is_strict_json(raw)
+    if salvaged:
+        logger.info(f"Judge reply salvaged by the tolerant parser (attempt {attempts})")
+    evaluation_stats.record(attempts, "salvaged" if salvaged else "scored")
+    scores = {k: v for k, v in scores.items()}
+    if JUDGE_CACHE_ENABLED:
+        judge_cache.put(key, {"scores": scores, "seconds": seconds,
+                              "input_tokens": attempts * input_tokens,
+                              "output_tokens": attempts * estimate_tokens(raw)})
+    return scores
+
+
+def _unavailable(detail: str, attempts: int) -> Dict[str, Any]:
+    """Record a failed evaluation and return the marked "unavailable" result."""
+    evaluation_stats.record(attempts, "unavailable")
+    logger.warning(f"Evaluation unavailable after {attempts} attempt(s): {detail}")
+    return {"status": "unavailable", "detail": f"Evaluation unavailable: {detail}", "attempts": attempts}
+
+
+def evaluate_with_mistral_small(source_text: str, summary_text: str, deadline_seconds: float = None,
+                                max_attempts: int = None) -> Dict[str, Any]:
+    """
+    Judge *summary_text* against *source_text* using Mistral’s `mistral-small` model.
+    Returns a mapping of facet names to score objects, each with:
+      - "score": integer 1–10
+      - "justification": ≤30-word rationale
+    Also includes an "Overall" entry as the rounded average of the four facet scores.
+
+    Invalid replies and provider errors are retried with exponential backoff and
+    jitter until *max_attempts* calls were made or *deadline_seconds* passed;
+    then {"status": "unavailable", "detail": ..., "attempts": n} is returned.
+    Earlier successful evaluations of the same pair are served from `judge_cache`.
+
+    Args:
+        source_text (str): The original document.
+        summary_text (str): The summary to judge.
+        deadline_seconds (float): Total time budget (default EVAL_DEADLINE_SECONDS).
+        max_attempts (int): Maximum judge calls (default EVAL_MAX_ATTEMPTS).
+
+    Raises:
+        RuntimeError: if the Mistral client fails to initialize (missing/invalid API key).
+    """
+    # Reuse the Mistral client shared with the summarization module
+    client = get_mistral_client()
+    if not client:
+        raise RuntimeError("Mistral client init failed – check your API key.")
 
-    # Return the parsed score mapping; unchanged structure from LLM output
-    return {k: v for k, v in scores.items()}
\ No newline at end of file
+    key = judge_cache_key(source_text, summary_text)
+    cached = _cached_evaluation(key)
+    if cached is not None:
+        return cached
+
+    started = time.perf_counter()
+    deadline = time.monotonic() + (deadline_seconds or EVAL_DEADLINE_SECONDS)
+    max_attempts = max_attempts or EVAL_MAX_ATTEMPTS
+    messages = _judge_messages(source_text, summary_text)
+    request = _judge_request(messages)
+    input_tokens = estimate_tokens(messages[0]["content"] + messages[1]["content"])
+
+    detail = "no attempt made"
+    for attempt in range(1, max_attempts + 1):
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return _unavailable("deadline exceeded", attempt - 1)
+        try:
+            resp = client.chat.complete(**request, timeout_ms=int(remaining * 1000))
+            raw = resp.choices[0].message.content
+            scores = _parse_judge_output(raw)
+            if scores is not None:
+                return _scored(raw, scores, attempt, key, time.perf_counter() - started, input_tokens)
+            detail = "judge returned no usable scores"
+        except Exception as e:
+            detail = f"judge call failed ({e})"
+        logger.info(f"Evaluation attempt {attempt}/{max_attempts}: {detail}")
+
+        delay = _backoff_seconds(attempt)
+        if attempt < max_attempts and time.monotonic() + delay < deadline:
+            time.sleep(delay)
+        elif attempt < max_attempts:
+            return _unavailable(f"deadline exceeded ({detail})", attempt)
+    return _unavailable(detail, max_attempts)
+
+
+async def aevaluate_with_mistral_small(source_text: str, summary_text: str, deadline_seconds: float = None,
+                                       max_attempts: int = None) -> Dict[str, Any]:
+    """
+    Asyncio variant of `evaluate_with_mistral_small` (same prompt, parsing, retries and deadline).
+
+    Uses the async side of the shared Mistral client so the judge call does not
+    block the event loop, and queues behind the Mistral rate limiter it shares
+    with summarization (queueing counts against the deadline). While the
+    judge's circuit breaker is open an "unavailable" result is returned
+    immediately instead of scores.
+    """
+    key = judge_cache_key(source_text, summary_text)
+    cached = await asyncio.to_thread(_cached_evaluation, key)
+    if cached is not None:
+        return cached
+
+    breaker = circuit_breakers.get(JUDGE_BREAKER)
+    client = get_mistral_client()
+    messages = _judge_messages(source_text, summary_text)
+    request = _judge_request(messages)
+    input_tokens = estimate_tokens(messages[0]["content"] + messages[1]["content"])
+    request_tokens = input_tokens + MAX_EVAL_TOKENS
+
+    started = time.perf_counter()
+    deadline = time.monotonic() + (deadline_seconds or EVAL_DEADLINE_SECONDS)
+    max_attempts = max_attempts or EVAL_MAX_ATTEMPTS
+
+    async def call():
+        started = time.perf_counter()
+        try:
+            async with rate_limits.limit("mistral", request_tokens):
+                started = time.perf_counter()
+                resp = await client.chat.complete_async(**request)
+        except asyncio.CancelledError:
+            breaker.cancel()  # Deadline hit (possibly while queued): no verdict on the judge
+            raise
+        except Exception:
+            breaker.record(False, time.perf_counter() - started)
+            raise
+        breaker.record(True, time.perf_counter() - started)
+        return resp.choices[0].message.content
+
+    detail = "no attempt made"
+    for attempt in range(1, max_attempts + 1):
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return _unavailable("deadline exceeded", attempt - 1)
+        if not breaker.allow():
+            return _unavailable("judge temporarily unavailable", attempt - 1)
+        try:
+            raw = await asyncio.wait_for(call(), remaining)
+            scores = _parse_judge_output(raw)
+            if scores is not None:
+                return await asyncio.to_thread(_scored, raw, scores, attempt, key,
+                                               time.perf_counter() - started, input_tokens)
+            detail = "judge returned no usable scores"
+        except asyncio.TimeoutError:
+            return _unavailable("deadline exceeded", attempt)
+        except Exception as e:
+            detail = f"judge call failed ({e})"
+        logger.info(f"Evaluation attempt {attempt}/{max_attempts}: {detail}")
+
+        delay = _backoff_seconds(attempt)
+        if attempt < max_attempts and time.monotonic() + delay < deadline:
+            await asyncio.sleep(delay)
+        elif attempt < max_attempts:
+            return _unavailable(f"deadline exceeded ({detail})", attempt)
+    return _unavailable(detail, max_attempts)
+
+
+def judge_reason(lexical: Dict[str, Any]) -> Optional[str]:
+    """Why the judge should score a summary with these lexical scores under JUDGE_MODE, or None to skip it."""
+    if JUDGE_MODE != "gated":
+        return "always"
+    if lexical["overall"] < JUDGE_GATE_THRESHOLD:
+        return "below_threshold"
+    if random.random() < JUDGE_SAMPLE_RATE:
+        return "sampled"
+    return None
+
+
+async def aevaluate_summary(source_text: str, summary_text: str,
+                            lexical: Dict[str, Any] = None) -> Dict[str, Any]:
+    """
+    Tiered evaluation: local lexical metrics first, then the judge when `judge_reason` asks for it.
+
+    Args:
+        source_text (str): The original document.
+        summary_text (str): The summary to evaluate.
+        lexical (dict): Already computed `lexical_scores` (e.g. streamed to the client first).
+
+    Returns:
+        dict: "lexical_scores" (with the "judge" decision added), "quality_scores"
+            (the judge's facet -> {"score", "justification"} mapping, empty when
+            the judge was skipped or unavailable) and "evaluation_status"
+            ({"status": "scored"}, or "skipped"/"unavailable" with a "detail").
+    """
+    if lexical is None:
+        lexical = await asyncio.to_thread(lexical_scores, source_text, summary_text)
+    reason = judge_reason(lexical)
+    lexical = dict(lexical, judge=reason or "skipped")
+    if reason is None:
+        evaluation_stats.record(0, "skipped")
+        quality_scores = {}
+        status = {
+            "status": "skipped",
+            "detail": (f"Judge skipped: lexical score {lexical['overall']:.2f} is at or above "
+                       f"the {JUDGE_GATE_THRESHOLD:g} threshold"),
+        }
+    else:
+        result = await aevaluate_with_mistral_small(source_text, summary_text)
+        if result.get("status") == "unavailable":
+            quality_scores, status = {}, result
+        else:
+            quality_scores, status = result, {"status": "scored"}
+    return {"lexical_scores": lexical, "quality_scores": quality_scores, "evaluation_status": status}
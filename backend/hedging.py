@@ -0,0 +1,171 @@
+"""
+hedging.py
+
+Hedged requests for slow-tailed summarization backends.
+
+A model with a `HedgePolicy` is first called normally. If it has not produced
+a usable summary once its observed pNN latency has passed (or it failed
+early), a duplicate request is started — against the same backend or a
+configured fallback model. The first good answer wins and the other request is
+cancelled. Per-model counters (hedge rate, hedge win rate, estimated latency
+saved) are kept so the percentile can be tuned against the extra provider cost.
+
+Hedging is off unless SUMMARY_HEDGING_ENABLED=1 is set (see summarization_module).
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from metrics import RollingStats
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class HedgePolicy:
+    """When and where to send the duplicate request for one model."""
+    percentile: float = 95.0               # Hedge once the primary is slower than this latency percentile
+    min_samples: int = 20                  # Samples needed before the percentile is trusted
+    initial_delay_seconds: float = 30.0    # Hedge delay used until enough samples were observed
+    min_delay_seconds: float = 2.0         # Never hedge earlier than this
+    max_delay_seconds: float = 90.0        # Never wait longer than this before hedging
+    fallback_model: Optional[str] = None   # Model for the duplicate request (None = same backend)
+
+
+class HedgeStats:
+    """Latency samples and hedge outcome counters for one model."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latency = RollingStats()       # Latency of good primary answers
+        self.tail_latency = RollingStats()  # ... of those slower than the hedge delay at the time
+        self.latency_saved = RollingStats()
+        self.calls = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+        self.primary_wins_after_hedge = 0
+        self.failures = 0
+
+    def hedge_delay(self, policy: HedgePolicy) -> float:
+        """Seconds to wait for the primary before sending the duplicate request."""
+        if self.latency.count < policy.min_samples:
+            delay = policy.initial_delay_seconds
+        else:
+            delay = self.latency.percentile(policy.percentile)
+        return min(policy.max_delay_seconds, max(policy.min_delay_seconds, delay))
+
+    def count(self, name: str) -> None:
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            calls, hedged, hedge_wins = self.calls, self.hedged, self.hedge_wins
+            primary_wins, failures = self.primary_wins_after_hedge, self.failures
+        return {
+            "calls": calls,
+            "hedged": hedged,
+            "hedge_rate": hedged / calls if calls else None,
+            "hedge_wins": hedge_wins,
+            "primary_wins_after_hedge": primary_wins,
+            "hedge_win_rate": hedge_wins / hedged if hedged else None,
+            "failures": failures,
+            "primary_latency_seconds": self.latency.summary(),
+            "estimated_latency_saved_seconds": self.latency_saved.summary(),
+        }
+
+
+class Hedger:
+    """Runs hedged calls and keeps per-model statistics."""
+
+    def __init__(self):
+        self._stats: Dict[str, HedgeStats] = {}
+        self._lock = threading.Lock()
+
+    def stats_for(self, model_name: str) -> HedgeStats:
+        with self._lock:
+            return self._stats.setdefault(model_name, HedgeStats())
+
+    async def call(
+        self,
+        model_name: str,
+        policy: HedgePolicy,
+        primary: Callable[[], Awaitable[str]],
+        hedge: Callable[[], Awaitable[str]],
+        is_good: Callable[[Any], bool],
+    ) -> Tuple[str, bool]:
+        """
+        Run *primary*, hedging with *hedge* when it is slow or fails.
+
+        Args:
+            model_name (str): Model the statistics are recorded under.
+            policy (HedgePolicy): Hedge settings of the model.
+            primary (Callable): Starts the primary request.
+            hedge (Callable): Starts the duplicate request.
+            is_good (Callable): Whether a result may win (e.g. not an error message).
+
+        Returns:
+            tuple: (result, hedge_won). If neither request produced a good
+                   result, the last result is returned (or its exception raised).
+        """
+        stats = self.stats_for(model_name)
+        stats.count("calls")
+        delay = stats.hedge_delay(policy)
+        started = time.perf_counter()
+        primary_task = asyncio.ensure_future(primary())
+        tasks = {primary_task: "primary"}
+
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if done and not primary_task.exception() and is_good(primary_task.result()):
+                stats.latency.record(time.perf_counter() - started)
+                return primary_task.result(), False
+
+            # Primary is slow (or already failed): send the duplicate request
+            stats.count("hedged")
+            if done:
+                tasks.pop(primary_task)
+            logger.info(f"Hedging {model_name} after {time.perf_counter() - started:.1f}s "
+                        f"({'to ' + policy.fallback_model if policy.fallback_model else 'same backend'})")
+            tasks[asyncio.ensure_future(hedge())] = "hedge"
+            last = primary_task
+
+            while tasks:
+                done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    role = tasks.pop(task)
+                    last = task
+                    if task.exception() or not is_good(task.result()):
+                        continue
+                    elapsed = time.perf_counter() - started
+                    if role == "primary":
+                        stats.count("primary_wins_after_hedge")
+                        stats.latency.record(elapsed)
+                        stats.tail_latency.record(elapsed)
+                    else:
+                        stats.count("hedge_wins")
+                        # The cancelled primary's latency is unknown; estimate it from the observed tail
+                        expected = stats.tail_latency.summary()["mean"]
+                        if expected is not None:
+                            stats.latency_saved.record(max(0.0, expected - elapsed))
+                    return task.result(), role == "hedge"
+
+            stats.count("failures")
+            return last.result(), False
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return per-model hedge statistics."""
+        with self._lock:
+            items = list(self._stats.items())
+        return {name: stats.snapshot() for name, stats in items}
+
+
+# Shared hedger used by the summarization dispatch
+hedger = Hedger()
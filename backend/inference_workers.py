@@ -0,0 +1,400 @@
+"""
+inference_workers.py
+
+Optional pool of inference worker processes for the local models (Detoxify
+and BART).
+
+Forward passes hold the GIL, so running them in the uvicorn process slows
+down every other request it serves. With INFERENCE_WORKERS > 0 the web
+process only routes jobs: each worker is a separate (spawned) process that
+loads its models once through its own `model_registry` and serves jobs
+over a `multiprocessing` pipe. Document texts travel through one
+shared-memory block per job (small payloads are pickled inline); only the
+block name and text lengths cross the pipe, and only the small results
+come back through it.
+
+Jobs waiting in the shared queue are coalesced per kind into one batched
+job: toxicity texts of several requests go through one `analyze_batch`
+call, and BART requests run concurrently inside the worker so its
+`bart_scheduler` batches their `generate` calls. A dispatcher thread per
+worker sends the jobs, watches the process, restarts it if it dies or
+misses the job deadline (re-warming its models) and retries the jobs it
+was running once.
+INFERENCE_WORKERS=0 (the default) keeps inference in-process.
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from multiprocessing import resource_tracker, shared_memory
+from typing import Any, Dict, List, Optional, Sequence
+
+from metrics import Histogram
+
+logger = logging.getLogger(__name__)
+
+# Inference worker processes (0 = run local models in the web process)
+INFERENCE_WORKERS = int(os.getenv("INFERENCE_WORKERS", "0"))
+
+# Queued jobs of one kind coalesced into a single worker job
+INFERENCE_WORKER_MAX_BATCH = int(os.getenv("INFERENCE_WORKER_MAX_BATCH", "8"))
+
+# Payloads at least this large are passed through shared memory instead of the pipe
+INFERENCE_SHM_MIN_BYTES = int(os.getenv("INFERENCE_SHM_MIN_BYTES", str(64 * 1024)))
+
+# Attempts per job when its worker crashes or hangs (the first try included)
+INFERENCE_JOB_ATTEMPTS = 2
+
+# Seconds a worker may take to answer one (batched) job before it is considered hung and restarted
+INFERENCE_JOB_TIMEOUT_SECONDS = float(os.getenv("INFERENCE_JOB_TIMEOUT_SECONDS", "600"))
+
+# Same for a warm-up job, which may have to download its checkpoint first
+INFERENCE_WARMUP_TIMEOUT_SECONDS = float(os.getenv("INFERENCE_WARMUP_TIMEOUT_SECONDS", "1800"))
+
+# Longest pause between restarts of a worker that keeps crashing
+INFERENCE_RESTART_BACKOFF_MAX_SECONDS = 30.0
+
+TOXICITY = "toxicity"
+BART = "bart"
+WARMUP = "warmup"
+STOP = "stop"
+
+
+class InferenceWorkerError(RuntimeError):
+    """A job failed inside an inference worker, or its worker died or hung twice."""
+
+
+# --------------------------------------------------------------------------------
+# Payload transport (shared memory for large texts)
+# --------------------------------------------------------------------------------
+def pack_texts(texts: Sequence[str]) -> tuple:
+    """
+    Describe *texts* for the worker.
+
+    Returns:
+        tuple: ("inline", texts) for small payloads, or ("shm", block name,
+            byte lengths) after copying the UTF-8 bytes into a new shared
+            memory block (released with `release_texts`).
+    """
+    encoded = [text.encode("utf-8") for text in texts]
+    total = sum(len(data) for data in encoded)
+    if total < INFERENCE_SHM_MIN_BYTES:
+        return ("inline", list(texts))
+    block = shared_memory.SharedMemory(create=True, size=total)
+    offset = 0
+    for data in encoded:
+        block.buf[offset:offset + len(data)] = data
+        offset += len(data)
+    name = block.name
+    block.close()
+    return ("shm", name, [len(data) for data in encoded])
+
+
+def unpack_texts(packed: tuple) -> List[str]:
+    """Inverse of `pack_texts` (in the worker); the block stays owned by the web process."""
+    if packed[0] == "inline":
+        return packed[1]
+    _, name, lengths = packed
+    block = shared_memory.SharedMemory(name=name)
+    try:
+        # Attaching registers the block with this process' tracker too; the web
+        # process owns and unlinks it
+        resource_tracker.unregister(block._name, "shared_memory")
+        texts, offset = [], 0
+        for length in lengths:
+            texts.append(bytes(block.buf[offset:offset + length]).decode("utf-8"))
+            offset += length
+        return texts
+    finally:
+        block.close()
+
+
+def release_texts(packed: tuple) -> None:
+    """Free the shared memory block of a finished job."""
+    if packed[0] == "shm":
+        try:
+            block = shared_memory.SharedMemory(name=packed[1])
+        except FileNotFoundError:
+            return
+        block.close()
+        block.unlink()
+
+
+# --------------------------------------------------------------------------------
+# Worker process
+# --------------------------------------------------------------------------------
+def _handle(kind: str, packed: tuple, params: List[Any], bart_executor: ThreadPoolExecutor) -> Any:
+    if kind == TOXICITY:
+        from toxicity import analyze_batch
+        return analyze_batch(unpack_texts(packed))
+    if kind == BART:
+        from summarization_module import summarize_with_bart
+        # Concurrent requests share `generate` calls through the worker's bart_scheduler
+        futures = [bart_executor.submit(summarize_with_bart, text, **kwargs)
+                   for text, kwargs in zip(unpack_texts(packed), params)]
+        return [future.result() for future in futures]
+    if kind == WARMUP:
+        from startup import WARMUP_LOADERS
+        started = time.perf_counter()
+        WARMUP_LOADERS[params[0]]()
+        return time.perf_counter() - started
+    raise ValueError(f"unknown job kind {kind!r}")
+
+
+def worker_main(conn) -> None:
+    """Entry point of a worker process: serve jobs from *conn* until told to stop."""
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - worker %(process)d - %(name)s - %(message)s")
+    bart_executor = ThreadPoolExecutor(max_workers=INFERENCE_WORKER_MAX_BATCH, thread_name_prefix="worker-bart")
+    while True:
+        try:
+            message = conn.recv()
+        except (EOFError, OSError):
+            return  # Web process is gone
+        job_id, kind, packed, params = message
+        if kind == STOP:
+            return
+        try:
+            conn.send((job_id, True, _handle(kind, packed, params, bart_executor)))
+        except Exception as e:
+            conn.send((job_id, False, f"{type(e).__name__}: {e}"))
+
+
+# --------------------------------------------------------------------------------
+# Pool (web process)
+# --------------------------------------------------------------------------------
+class _Job:
+    __slots__ = ("kind", "texts", "params", "future", "attempts")
+
+    def __init__(self, kind: str, texts: List[str], params: List[Any]):
+        self.kind = kind
+        self.texts = texts
+        self.params = params
+        self.future: Future = Future()
+        self.attempts = 0
+
+
+class InferencePool:
+    """Routes Detoxify and BART jobs to a pool of worker processes, restarting crashed or hung workers."""
+
+    def __init__(self, workers: int = INFERENCE_WORKERS, max_batch: int = INFERENCE_WORKER_MAX_BATCH):
+        """
+        Args:
+            workers (int): Worker processes (0 disables the pool).
+            max_batch (int): Queued jobs of one kind combined into one worker job.
+        """
+        self.workers = workers
+        self.max_batch = max(1, max_batch)
+        self._context = multiprocessing.get_context("spawn")  # No forked torch/CUDA or thread state
+        self._queue: deque = deque()
+        self._condition = threading.Condition()
+        self._control: List[deque] = []  # Per-worker warm-up jobs, served before shared jobs
+        self._processes: List[Optional[multiprocessing.process.BaseProcess]] = []
+        self._warmed: List[str] = []
+        self._threads: List[threading.Thread] = []
+        self._closed = False
+        self.restarts = 0
+        self.jobs = {TOXICITY: 0, BART: 0}
+        self.failures = 0
+        self.batch_sizes = Histogram([1, 2, 4, 8, 16, 32])
+
+    @property
+    def enabled(self) -> bool:
+        """Whether jobs go to worker processes (started and not closed)."""
+        return bool(self._threads) and not self._closed
+
+    def start(self) -> None:
+        """Spawn the workers and their dispatcher threads (no-op without workers)."""
+        if self.workers <= 0 or self._threads:
+            return
+        for index in range(self.workers):
+            self._control.append(deque())
+            self._processes.append(None)
+            thread = threading.Thread(target=self._dispatch, args=(index,), name=f"inference-dispatch-{index}",
+                                      daemon=True)
+            self._threads.append(thread)
+            thread.start()
+        logger.info(f"Started {self.workers} inference worker processes")
+
+    def _spawn(self, index: int):
+        parent, child = self._context.Pipe()
+        process = self._context.Process(target=worker_main, args=(child,), name=f"inference-worker-{index}",
+                                        daemon=True)
+        process.start()
+        child.close()
+        self._processes[index] = process
+        return process, parent
+
+    def _take(self, index: int) -> Optional[List[_Job]]:
+        """Block until a warm-up job for this worker or a batch of same-kind jobs is available."""
+        with self._condition:
+            while not self._closed and not self._control[index] and not self._queue:
+                self._condition.wait()
+            if self._closed:
+                return None
+            if self._control[index]:
+                return [self._control[index].popleft()]
+            batch = [self._queue.popleft()]
+            for job in list(self._queue):
+                if len(batch) >= self.max_batch:
+                    break
+                if job.kind == batch[0].kind:
+                    self._queue.remove(job)
+                    batch.append(job)
+            return batch
+
+    def _dispatch(self, index: int) -> None:
+        """Dispatcher thread of one worker: send jobs, collect results, restart the worker when it dies or hangs."""
+        process, conn = self._spawn(index)
+        crashes = job_id = 0
+        while True:
+            batch = self._take(index)
+            if batch is None:
+                break
+            texts = [text for job in batch for text in job.texts]
+            params = [param for job in batch for param in job.params]
+            packed = pack_texts(texts)
+            job_id += 1
+            timeout = INFERENCE_WARMUP_TIMEOUT_SECONDS if batch[0].kind == WARMUP else INFERENCE_JOB_TIMEOUT_SECONDS
+            deadline = time.monotonic() + timeout
+            try:
+                conn.send((job_id, batch[0].kind, packed, params))
+                while not conn.poll(min(1.0, max(0.0, deadline - time.monotonic()))):
+                    if not process.is_alive():
+                        raise EOFError(f"exit code {process.exitcode}")
+                    if time.monotonic() >= deadline:
+                        raise TimeoutError(f"no reply within {timeout:g}s")
+                _, ok, result = conn.recv()
+                crashes = 0
+            except (EOFError, OSError, BrokenPipeError, TimeoutError) as e:
+                release_texts(packed)
+                crashes += 1
+                self.restarts += 1
+                logger.error(f"Inference worker {index} died or hung ({e}); restarting")
+                self._retry(batch)
+                self._stop(process)
+                conn.close()
+                time.sleep(min(INFERENCE_RESTART_BACKOFF_MAX_SECONDS, 0.5 * 2 ** (crashes - 1)))
+                process, conn = self._spawn(index)
+                with self._condition:
+                    # Re-load the models the previous process had warmed before new jobs
+                    self._control[index].extendleft(_Job(WARMUP, [], [name]) for name in reversed(self._warmed))
+                continue
+            release_texts(packed)
+            self._resolve(batch, ok, result)
+
+        try:
+            conn.send((0, STOP, None, None))
+        except (OSError, BrokenPipeError):
+            pass
+        process.join(timeout=5)
+        self._stop(process)
+
+    @staticmethod
+    def _stop(process) -> None:
+        """Terminate *process* if it is still running (a hung worker), killing it if it ignores SIGTERM."""
+        if process.is_alive():
+            process.terminate()
+            process.join(timeout=5)
+        if process.is_alive():
+            process.kill()
+        process.join(timeout=1)
+
+    def _retry(self, batch: List[_Job]) -> None:
+        """Re-queue the jobs of a crashed or hung worker once; fail them the second time."""
+        with self._condition:
+            for job in reversed(batch):
+                job.attempts += 1
+                if job.kind == WARMUP:
+                    # Re-sent to the new process with the other warmed models
+                    job.future.set_exception(InferenceWorkerError("inference worker crashed or hung during warm-up"))
+                elif job.attempts < INFERENCE_JOB_ATTEMPTS:
+                    self._queue.appendleft(job)
+                else:
+                    self.failures += 1
+                    job.future.set_exception(InferenceWorkerError("inference worker crashed or hung twice running this job"))
+            self._condition.notify_all()
+
+    def _resolve(self, batch: List[_Job], ok: bool, result: Any) -> None:
+        """Scatter a worker reply back to the jobs of its batch."""
+        if batch[0].kind == WARMUP:
+            if batch[0].future.done():
+                return  # Re-warm after a restart, nobody is waiting
+            if ok:
+                batch[0].future.set_result(result)
+            else:
+                batch[0].future.set_exception(InferenceWorkerError(result))
+            return
+        self.jobs[batch[0].kind] += len(batch)
+        self.batch_sizes.record(len(batch))
+        if not ok:
+            self.failures += len(batch)
+            for job in batch:
+                job.future.set_exception(InferenceWorkerError(result))
+            return
+        offset = 0
+        for job in batch:
+            job.future.set_result(result[offset:offset + len(job.texts)])
+            offset += len(job.texts)
+
+    def _submit(self, kind: str, texts: List[str], params: List[Any]) -> Future:
+        job = _Job(kind, texts, params)
+        with self._condition:
+            self._queue.append(job)
+            self._condition.notify()
+        return job.future
+
+    async def analyze_toxicity(self, texts: Sequence[str]) -> List[Dict[str, Any]]:
+        """`toxicity.analyze_batch` of *texts*, run in a worker."""
+        return await asyncio.wrap_future(self._submit(TOXICITY, list(texts), [None] * len(texts)))
+
+    async def summarize_bart(self, text: str, **kwargs) -> str:
+        """`summarization_module.summarize_with_bart(text, **kwargs)`, run in a worker."""
+        return (await asyncio.wrap_future(self._submit(BART, [text], [kwargs])))[0]
+
+    async def warm(self, name: str) -> float:
+        """
+        Load the WARMUP_LOADERS entry *name* in every worker (and after each restart).
+
+        Returns:
+            float: The slowest worker's load time in seconds.
+        """
+        jobs = [_Job(WARMUP, [], [name]) for _ in range(self.workers)]
+        with self._condition:
+            if name not in self._warmed:
+                self._warmed.append(name)
+            for control, job in zip(self._control, jobs):
+                control.append(job)
+            self._condition.notify_all()
+        return max(await asyncio.gather(*(asyncio.wrap_future(job.future) for job in jobs)))
+
+    def close(self) -> None:
+        """Stop the dispatchers and their worker processes; queued jobs fail."""
+        with self._condition:
+            self._closed = True
+            while self._queue:
+                self._queue.popleft().future.set_exception(InferenceWorkerError("inference pool closed"))
+            self._condition.notify_all()
+        for thread in self._threads:
+            thread.join(timeout=10)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": self.workers,
+            "enabled": self.enabled,
+            "alive": sum(1 for process in self._processes if process is not None and process.is_alive()),
+            "pids": [process.pid if process is not None else None for process in self._processes],
+            "queued": len(self._queue),
+            "jobs": dict(self.jobs),
+            "failures": self.failures,
+            "restarts": self.restarts,
+            "batch_sizes": self.batch_sizes.snapshot(),
+        }
+
+
+# Process-wide pool, started by main.py when INFERENCE_WORKERS > 0
+inference_pool = InferencePool()
@@ -0,0 +1,158 @@
+"""
+lexical_metrics.py
+
+Fast, local quality metrics of a summary against its source: ROUGE-1/2/L,
+compression ratio, and retention of named entities and numbers.
+
+They are the cheap first evaluation tier in front of the LLM judge. Words
+are tokenized like `rouge_score` (lower-cased alphanumeric runs, no
+stemming) and mapped to integer IDs, so n-gram overlaps are counted with
+NumPy set operations on packed n-gram codes and the longest common
+subsequence uses the bit-parallel algorithm over Python integers. A typical
+report is scored in a few milliseconds (tens of milliseconds at the
+document token limit).
+
+Entities are approximated by capitalized word sequences and acronyms, and
+numbers by digit runs. "supported" is the share of the summary's entities
+(or numbers) found in the source, a hallucination signal; "retained" is the
+share of the source's that made it into the summary.
+"""
+
+import re
+import time
+from typing import Any, Dict, List, Optional, Set
+
+import numpy as np
+
+from extractive import STOPWORDS
+
+WORD_PATTERN = re.compile(r"[a-z0-9]+")
+ENTITY_PATTERN = re.compile(r"\b[A-Z][A-Za-z0-9'&.-]*(?:\s+[A-Z][A-Za-z0-9'&.-]*)*")
+NUMBER_PATTERN = re.compile(r"\d+(?:[.,:/]\d+)*")
+
+
+def tokenize(text: str) -> List[str]:
+    """Lower-cased alphanumeric tokens (the `rouge_score` tokenizer without stemming)."""
+    return WORD_PATTERN.findall(text.lower())
+
+
+def _ngram_codes(ids: np.ndarray, n: int, base: int) -> np.ndarray:
+    """Encode every n-gram of *ids* as one int64 (base-*base* digits)."""
+    if len(ids) < n:
+        return np.empty(0, dtype=np.int64)
+    codes = np.zeros(len(ids) - n + 1, dtype=np.int64)
+    for offset in range(n):
+        codes = codes * base + ids[offset:len(ids) - n + 1 + offset]
+    return codes
+
+
+def _overlap(reference: np.ndarray, candidate: np.ndarray) -> int:
+    """Clipped n-gram matches: sum over shared n-grams of the smaller count."""
+    reference_values, reference_counts = np.unique(reference, return_counts=True)
+    candidate_values, candidate_counts = np.unique(candidate, return_counts=True)
+    _, reference_index, candidate_index = np.intersect1d(
+        reference_values, candidate_values, assume_unique=True, return_indices=True
+    )
+    return int(np.minimum(reference_counts[reference_index], candidate_counts[candidate_index]).sum())
+
+
+def _lcs_length(reference: np.ndarray, candidate: np.ndarray) -> int:
+    """
+    Length of the longest common subsequence of two ID sequences.
+
+    Bit-parallel (Allison-Dix): one bit per reference position, one big-integer
+    update per candidate token, so the cost is O(len(candidate) * len(reference) / 64).
+    """
+    length = len(reference)
+    if not length or not len(candidate):
+        return 0
+    masks = {
+        int(token): int.from_bytes(np.packbits(reference == token, bitorder="little").tobytes(), "little")
+        for token in np.unique(candidate)
+    }
+    full = (1 << length) - 1
+    row = full
+    for token in candidate.tolist():
+        matches = row & masks[token]
+        row = ((row + matches) | (row - matches)) & full
+    return length - bin(row).count("1")
+
+
+def _prf(matches: int, reference_total: int, candidate_total: int) -> Dict[str, float]:
+    precision = matches / candidate_total if candidate_total else 0.0
+    recall = matches / reference_total if reference_total else 0.0
+    f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+    return {"precision": precision, "recall": recall, "f1": f1}
+
+
+def _entities(text: str) -> Set[str]:
+    """Normalized capitalized word sequences, without leading stopwords ("The", "In", ...)."""
+    entities = set()
+    for match in ENTITY_PATTERN.finditer(text):
+        words = match.group().rstrip(".-").split()
+        while words and words[0].lower() in STOPWORDS:
+            words = words[1:]
+        if words:
+            entities.add(" ".join(words).lower())
+    return entities
+
+
+def _numbers(text: str) -> Set[str]:
+    return {number.replace(",", "") for number in NUMBER_PATTERN.findall(text)}
+
+
+def _retention(source_items: Set[str], summary_items: Set[str], source_text: str) -> Dict[str, Any]:
+    """Counts plus supported/retained shares (None when there is nothing to measure)."""
+    supported = [item for item in summary_items if item in source_items or item in source_text]
+    return {
+        "source": len(source_items),
+        "summary": len(summary_items),
+        "supported": len(supported) / len(summary_items) if summary_items else None,
+        "retained": len(source_items & summary_items) / len(source_items) if source_items else None,
+    }
+
+
+def lexical_scores(source_text: str, summary_text: str) -> Dict[str, Any]:
+    """
+    Score *summary_text* against *source_text* with local metrics.
+
+    The source is the ROUGE reference, so recall is naturally low for a
+    summary of a long report; precision shows how much of the summary is
+    grounded in the source wording.
+
+    Returns:
+        dict: "rouge1", "rouge2" and "rougeL" (precision/recall/f1),
+            "compression_ratio" (summary words / source words), word counts,
+            "entities" and "numbers" retention, "overall" (mean of ROUGE-1 and
+            ROUGE-2 precision and the entity and number support, a 0-1
+            faithfulness proxy used to gate the judge) and "milliseconds".
+    """
+    started = time.perf_counter()
+    source_tokens = tokenize(source_text)
+    summary_tokens = tokenize(summary_text)
+    vocabulary: Dict[str, int] = {}
+    ids = np.fromiter((vocabulary.setdefault(token, len(vocabulary)) for token in source_tokens + summary_tokens),
+                      dtype=np.int64, count=len(source_tokens) + len(summary_tokens))
+    source_ids, summary_ids = ids[:len(source_tokens)], ids[len(source_tokens):]
+    base = max(1, len(vocabulary))
+
+    scores: Dict[str, Any] = {}
+    for n in (1, 2):
+        reference = _ngram_codes(source_ids, n, base)
+        candidate = _ngram_codes(summary_ids, n, base)
+        scores[f"rouge{n}"] = _prf(_overlap(reference, candidate), len(reference), len(candidate))
+    scores["rougeL"] = _prf(_lcs_length(source_ids, summary_ids), len(source_ids), len(summary_ids))
+    scores["source_words"] = len(source_tokens)
+    scores["summary_words"] = len(summary_tokens)
+    scores["compression_ratio"] = len(summary_tokens) / len(source_tokens) if source_tokens else None
+
+    normalized_source = " ".join(source_text.lower().split())
+    scores["entities"] = _retention(_entities(source_text), _entities(summary_text), normalized_source)
+    scores["numbers"] = _retention(_numbers(source_text), _numbers(summary_text), normalized_source)
+
+    signals: List[Optional[float]] = [scores["rouge1"]["precision"], scores["rouge2"]["precision"],
+                                      scores["entities"]["supported"], scores["numbers"]["supported"]]
+    signals = [signal for signal in signals if signal is not None]
+    scores["overall"] = sum(signals) / len(signals) if summary_tokens else 0.0
+    scores["milliseconds"] = (time.perf_counter() - started) * 1000
+    return scores
@@ -0,0 +1,202 @@
+"""
+long_document.py
+
+Map-reduce summarization for documents longer than a single model call can
+handle well (multi-page intelligence reports).
+
+The extracted text is split into section-aware chunks (headings and paragraph
+breaks are preferred cut points). All chunks are summarized concurrently
+through `asummarize_text` — and therefore through the summary cache, hedging,
+the provider rate limiter and the circuit breaker — and the partial summaries
+are then merged hierarchically, several per call, until a single summary is
+left. Every model call is capped at MAX_SUMMARY_TOKENS, so the final summary
+is as well. Wall time grows with the depth of the reduction tree, not with
+the number of chunks.
+"""
+
+import asyncio
+import logging
+import os
+import re
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from metrics import estimate_tokens
+from summarization_module import (
+    MAX_SUMMARY_TOKENS,
+    SUMMARIZATION_BACKENDS,
+    UNSUPPORTED_MODEL_MESSAGE,
+    asummarize_text,
+)
+
+logger = logging.getLogger(__name__)
+
+# Target size (estimated tokens) of one map chunk or one reduce group
+LONG_DOCUMENT_CHUNK_TOKENS = int(os.getenv("LONG_DOCUMENT_CHUNK_TOKENS", "3000"))
+
+# A line that looks like a section heading: numbered ("2.", "2.1", "IV."), "SECTION ..."/"ANNEX ...",
+# markdown ("# ..."), or a short all-caps line
+HEADING_PATTERN = re.compile(
+    r"^\s*(?:#{1,6}\s+\S.*|(?:\d+(?:\.\d+)*|[IVXLC]+)[.)]\s+\S.{0,80}|"
+    r"(?:SECTION|ANNEX|APPENDIX|PART|CHAPTER)\b.{0,80}|[A-Z0-9][A-Z0-9 ,:/&()'-]{2,80})\s*$"
+)
+SENTENCE_SPLIT_PATTERN = re.compile(r"(?<=[.!?])\s+")
+
+# Reported when a map or reduce call returns no summary at all
+EMPTY_SUMMARY_MESSAGE = "Error: empty summary"
+
+
+@dataclass
+class LongDocumentResult:
+    """Final summary plus per-stage timings of one map-reduce run."""
+    summary: str
+    report: Dict[str, Any] = field(default_factory=dict)
+
+
+def _split_oversized(paragraph: str, max_tokens: int) -> List[str]:
+    """Split a paragraph longer than *max_tokens* at sentence boundaries."""
+    pieces, current = [], []
+    for sentence in SENTENCE_SPLIT_PATTERN.split(paragraph):
+        if current and estimate_tokens(" ".join(current + [sentence])) > max_tokens:
+            pieces.append(" ".join(current))
+            current = []
+        current.append(sentence)
+    if current:
+        pieces.append(" ".join(current))
+    return pieces
+
+
+def split_sections(text: str, max_tokens: int = LONG_DOCUMENT_CHUNK_TOKENS) -> List[str]:
+    """
+    Split *text* into chunks of at most ~*max_tokens* estimated tokens.
+
+    Chunks are built from whole paragraphs. A new chunk is started at a
+    section heading once the current chunk is at least half full, so sections
+    stay together where possible; paragraphs that alone exceed the budget are
+    split at sentence boundaries.
+
+    Args:
+        text (str): The extracted document text.
+        max_tokens (int): Chunk budget in estimated tokens.
+
+    Returns:
+        list[str]: The chunks in document order.
+    """
+    paragraphs = []
+    for block in re.split(r"\n\s*\n", text):
+        block = block.strip()
+        if not block:
+            continue
+        # A heading glued to its paragraph by a single newline still starts a section
+        lines = block.split("\n")
+        if len(lines) > 1 and HEADING_PATTERN.match(lines[0]):
+            paragraphs.append(lines[0].strip())
+            block = "\n".join(lines[1:]).strip()
+        paragraphs.extend(_split_oversized(block, max_tokens) if estimate_tokens(block) > max_tokens else [block])
+
+    chunks, current, current_tokens = [], [], 0
+    for paragraph in paragraphs:
+        tokens = estimate_tokens(paragraph)
+        is_heading = "\n" not in paragraph and bool(HEADING_PATTERN.match(paragraph))
+        if current and (current_tokens + tokens > max_tokens
+                        or (is_heading and current_tokens >= max_tokens // 2)):
+            chunks.append("\n\n".join(current))
+            current, current_tokens = [], 0
+        current.append(paragraph)
+        current_tokens += tokens
+    if current:
+        chunks.append("\n\n".join(current))
+    return chunks
+
+
+def _group_for_reduce(summaries: List[str], max_tokens: int) -> List[List[str]]:
+    """Pack consecutive partial summaries into groups that fit one reduce call (at least two per group)."""
+    groups, current, current_tokens = [], [], 0
+    for summary in summaries:
+        tokens = estimate_tokens(summary)
+        if len(current) >= 2 and current_tokens + tokens > max_tokens:
+            groups.append(current)
+            current, current_tokens = [], 0
+        current.append(summary)
+        current_tokens += tokens
+    if current:
+        if len(current) == 1 and groups:
+            groups[-1].append(current[0])  # Never leave a lone summary that cannot shrink
+        else:
+            groups.append(current)
+    return groups
+
+
+def _failed(summaries: List[Optional[str]]) -> str:
+    """Return the first error message among *summaries* (or ""); a missing or empty summary is an error too."""
+    return next((s or EMPTY_SUMMARY_MESSAGE for s in summaries if not s or s.startswith("Error")), "")
+
+
+async def asummarize_long_document(text: str, model_name: str, use_cache: bool = True,
+                                   chunk_tokens: int = LONG_DOCUMENT_CHUNK_TOKENS) -> LongDocumentResult:
+    """
+    Summarize a long document with concurrent map and hierarchical reduce passes.
+
+    Local models (BART) already chunk long inputs themselves and are summarized
+    in a single call.
+
+    Args:
+        text (str): The extracted document text.
+        model_name (str): A key of `SUMMARIZATION_BACKENDS`.
+        use_cache (bool): Passed through to `asummarize_text`.
+        chunk_tokens (int): Map chunk / reduce group budget in estimated tokens.
+
+    Returns:
+        LongDocumentResult: The summary (or the first error message of a
+            failed stage) and a report with chunk counts and per-stage timings.
+    """
+    backend = SUMMARIZATION_BACKENDS.get(model_name)
+    if backend is None:
+        return LongDocumentResult(UNSUPPORTED_MODEL_MESSAGE)
+
+    started = time.perf_counter()
+    report: Dict[str, Any] = {"mode": "map_reduce", "input_tokens": estimate_tokens(text)}
+    if backend.provider == "local":
+        summary = await asummarize_text(text, model_name, use_cache=use_cache)
+        report.update(mode="single_call", total_seconds=time.perf_counter() - started)
+        return LongDocumentResult(summary, report)
+
+    # Split
+    chunks = split_sections(text, chunk_tokens)
+    report["chunks"] = len(chunks)
+    report["split_seconds"] = time.perf_counter() - started
+
+    # Map: every chunk concurrently (the provider rate limiter queues them as needed)
+    map_started = time.perf_counter()
+    summaries = list(await asyncio.gather(*(asummarize_text(chunk, model_name, use_cache=use_cache)
+                                             for chunk in chunks)))
+    report["map_seconds"] = time.perf_counter() - map_started
+    error = _failed(summaries)
+    if error:
+        report["total_seconds"] = time.perf_counter() - started
+        report["failed_stage"] = "map"
+        return LongDocumentResult(error, report)
+
+    # Reduce: merge groups of partial summaries level by level until one remains
+    report["reduce_levels"] = []
+    reduce_budget = max(chunk_tokens, 2 * MAX_SUMMARY_TOKENS)
+    while len(summaries) > 1:
+        level_started = time.perf_counter()
+        groups = _group_for_reduce(summaries, reduce_budget)
+        summaries = list(await asyncio.gather(*(asummarize_text("\n\n".join(group), model_name, use_cache=use_cache)
+                                                 for group in groups)))
+        report["reduce_levels"].append({
+            "inputs": sum(len(group) for group in groups),
+            "outputs": len(groups),
+            "seconds": time.perf_counter() - level_started,
+        })
+        error = _failed(summaries)
+        if error:
+            report["failed_stage"] = f"reduce level {len(report['reduce_levels'])}"
+            break
+
+    report["total_seconds"] = time.perf_counter() - started
+    logger.info(f"Map-reduce summary with {model_name}: {len(chunks)} chunks, "
+                f"{len(report['reduce_levels'])} reduce levels, {report['total_seconds']:.1f}s")
+    return LongDocumentResult(error or summaries[0], report)
@@ -11,26 +11,55 @@
 #
 # --------------------------------------------------------------------------------
 
+import asyncio
 import logging
 from dotenv import load_dotenv  
 # Load environment variables from .env for API keys, DB settings, etc.
 load_dotenv()
 
+# Time the application's imports for the startup report (see /metrics/startup).
+# Provider SDKs, torch and transformers load on first use, and the local models
+# in a background warm-up once the server is listening (see /readyz)
+from startup import ModelWarmup, startup_report
+startup_report.start_import_timing()
+
 from fastapi import FastAPI, UploadFile, File, Form, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, StreamingResponse
 import os
 import tempfile
+import time
 
 # Utility modules for summarization, and persistence
-from summarization_module import summarize_text
+from summarization_module import (
+    SUMMARIZATION_BACKENDS,
+    asummarize_text,
+    astream_summary,
+    bart_scheduler,
+    summary_cache,
+    summary_throughput,
+)
+from streaming import sse_event, stream_metrics
+from metrics import estimate_tokens
+from long_document import asummarize_long_document
+from preflight import REJECTED, SINGLE, PreflightPlan, plan_summary
 from db import Database
+from background_scoring import PENDING, BackgroundScorer, pending_metadata
+from toxicity import ascore_text, ascore_texts, toxicity_cache, toxicity_entries, toxicity_metadata
 
 # Third-party processing libraries
 from tika import parser
 from auth import router as auth_router
 from users_db import initialize_db
-from detoxify import Detoxify
-from evaluation_module import evaluate_with_mistral_small
+from model_registry import model_registry
+from inference_workers import inference_pool
+from provider_clients import provider_registry
+from hedging import hedger
+from rate_limiter import rate_limits
+from evaluation_module import JUDGE_BREAKER, aevaluate_summary, evaluation_stats, judge_cache
+from lexical_metrics import lexical_scores
+from circuit_breaker import ModelUnavailableError, circuit_breakers
+startup_report.stop_import_timing()
 
 
 # --------------------------------------------------------------------------------
@@ -50,7 +79,8 @@ logger = logging.getLogger(__name__)
 # --------------------------------------------------------------------------------
 # Initialize user database schema (creates tables if not present)
 # --------------------------------------------------------------------------------
-initialize_db()
+with startup_report.phase("user_database"):
+    initialize_db()
 
 
 # --------------------------------------------------------------------------------
@@ -68,7 +98,8 @@ app.add_middleware(
 # --------------------------------------------------------------------------------
 # Instantiate the persistence layer for summaries
 # --------------------------------------------------------------------------------
-db = Database()
+with startup_report.phase("summary_database"):
+    db = Database()
 
 
 # --------------------------------------------------------------------------------
@@ -76,11 +107,31 @@ db = Database()
 # --------------------------------------------------------------------------------
 SUPPORTED_FILE_TYPES = [".txt", ".pdf", ".docx"]
 
+# Uploads above this size are rejected before they are written to disk and
+# extracted (token limits are enforced per model by the pre-flight stage)
+MAX_UPLOAD_MB = float(os.getenv("MAX_UPLOAD_MB", "50"))
+
+# Per-model time limit for the summary step of /summarize/compare
+COMPARE_MODEL_TIMEOUT_SECONDS = float(os.getenv("COMPARE_MODEL_TIMEOUT_SECONDS", "180"))
+
 
 # --------------------------------------------------------------------------------
-# Load the Detoxify model to assess toxicity in original reports & summaries
+# Warm the local models (Detoxify by default, see WARMUP_MODELS) in the
+# background once the server is listening; /readyz reports when they are loaded.
+# With INFERENCE_WORKERS > 0 they are loaded in the worker processes instead.
 # --------------------------------------------------------------------------------
-detox_model = Detoxify('unbiased')
+warmup = ModelWarmup()
+
+
+@app.on_event("startup")
+async def start_warmup():
+    inference_pool.start()
+    warmup.start()
+
+
+@app.on_event("shutdown")
+async def stop_inference_workers():
+    await asyncio.to_thread(inference_pool.close)
 
 
 def handle_uploaded_file(file: UploadFile) -> str:
@@ -97,23 +148,99 @@ def handle_uploaded_file(file: UploadFile) -> str:
         return temp_file.name
 
 
+async def score_summary(plain_text: str, summary: str) -> dict:
+    """
+    Evaluate quality and score toxicity of *summary* concurrently.
+
+    Returns:
+        dict: "lexical_scores", "quality_scores", "evaluation_status" plus the
+            `toxicity_metadata` entries.
+    """
+    evaluation, toxicity = await asyncio.gather(
+        aevaluate_summary(plain_text, summary),
+        toxicity_metadata(plain_text, summary),
+    )
+    return {**toxicity, **evaluation}
+
+
+# Worker pool for deferred scoring (see /summarize `defer_scoring`)
+scorer = BackgroundScorer(db, score_summary)
+
+
+@app.on_event("startup")
+async def resume_pending_scoring():
+    """Re-queue summaries whose deferred scoring did not finish before the last shutdown."""
+    await scorer.resume_pending()
+
+
+def check_upload_size(file: UploadFile) -> None:
+    """Reject uploads above MAX_UPLOAD_MB before they are stored or extracted (HTTPException 413)."""
+    if file.size is not None and file.size > MAX_UPLOAD_MB * 1024 * 1024:
+        raise HTTPException(
+            status_code=413,
+            detail=f"{file.filename} is {file.size / 1024 ** 2:.1f} MB, above the {MAX_UPLOAD_MB:g} MB upload limit."
+        )
+
+
+async def preflight(plain_text: str, model: str) -> PreflightPlan:
+    """Run the pre-flight token budget for *model* off the event loop."""
+    plan = await asyncio.to_thread(plan_summary, plain_text, model)
+    logger.info(f"Pre-flight {model}: {plan.route} ({plan.reason}), {plan.input_tokens} tokens")
+    return plan
+
+
+async def generate_summary(plain_text: str, model: str, plan: PreflightPlan, use_cache: bool = True):
+    """
+    Summarize *plain_text* along the route chosen by the pre-flight *plan*:
+    one call, or map-reduce over chunks of the planned size.
+
+    Returns:
+        tuple: (summary, long-document report with per-stage timings or None)
+    """
+    if plan.route == REJECTED:
+        raise ValueError(plan.reason)
+    if plan.route == SINGLE:
+        return await asummarize_text(plain_text, model, use_cache=use_cache), None
+    result = await asummarize_long_document(plain_text, model, use_cache=use_cache, chunk_tokens=plan.chunk_tokens)
+    return result.summary, result.report
+
+
 @app.post("/summarize")
 async def summarize(
     user_id: str = Form(...),
     files: list[UploadFile] = File(None),
-    model: str = Form(...)
+    model: str = Form(...),
+    bypass_cache: bool = Form(False),
+    defer_scoring: bool = Form(False)
 ):
     """
     Endpoint to process one or more uploaded files:
-      1. Validate file types and word count limits.
+      1. Validate file types and upload size.
       2. Extract plaintext via Apache Tika.
-      3. Generate a summary with the specified LLM.
-      4. Evaluate summary quality with Mistral and toxicity with Detoxify.
-      5. Compute toxicity reduction percentages.
-      6. Store the summary and metadata in the database.
+      3. Budget the document in the model's tokens (pre-flight): reject it
+         with the precise reason, or route it to one call or to map-reduce
+         over section-aware chunks.
+      4. Generate the summary with the specified LLM. A failed call, or a
+         model whose circuit breaker is open, returns its error for the file
+         and skips steps 5–7.
+      5. Evaluate summary quality with Mistral and toxicity with Detoxify
+         (all reports and summaries of the request in one batched pass).
+      6. Compute toxicity reduction percentages.
+      7. Store the summary and metadata (including the pre-flight plan) in the database.
+
+    Blocking work (file I/O, Tika, local model inference) runs off the event
+    loop and provider calls are awaited, so other requests keep being served.
+    Identical earlier summaries are served from the summary cache unless
+    `bypass_cache` is set (the fresh summary then refreshes the cache entry).
+
+    With `defer_scoring`, steps 5–6 run in the background: the summary is
+    stored and returned right away with its metadata marked
+    `"scoring": {"status": "pending"}`, and `GET /summaries/{summary_id}/scores`
+    reports the scores once they are ready. Every result carries its `summary_id`.
     """
     logger.info(f"Received summarization request for user: {user_id} with model: {model}")
     summaries = {}
+    to_score = []  # (filename, plain_text, summary, metadata) scored together after the loop
 
     for file in files:
         logger.info(f"Processing file: {file.filename}")
@@ -122,59 +249,361 @@ async def summarize(
             logger.error(f"Unsupported file type: {file.filename}")
             summaries[file.filename] = "file not supported"
             continue
+        try:
+            check_upload_size(file)
+        except HTTPException as e:
+            summaries[file.filename] = f"Error: {e.detail}"
+            continue
 
-        temp_path = handle_uploaded_file(file)
+        temp_path = await asyncio.to_thread(handle_uploaded_file, file)
         try:
             # Extract and sanitize text
             logger.info(f"Extracting text from file {file.filename}...")
-            plain_text = parser.from_file(temp_path).get('content').strip()
+            parsed = await asyncio.to_thread(parser.from_file, temp_path)
+            plain_text = parsed.get('content').strip()
 
-            # Enforce word count limit (max ~1500 words)
-            word_count = len(plain_text.split())
-            if word_count > 1500:
-                raise Exception(
-                    f"Document exceeds 1500-word limit ({word_count} words). "
-                    "Please contact the administrator to increase the limit."
-                )
+            # Budget the document for the model; rejected documents stop here
+            plan = await preflight(plain_text, model)
+            if plan.route == REJECTED:
+                raise Exception(plan.reason)
 
             # Generate summary and evaluate quality & toxicity
             logger.info(f"Generating summary using {model} model...")
-            summary = summarize_text(plain_text, model)
-            quality_scores = evaluate_with_mistral_small(plain_text, summary)
-            summary_scores = {k: float(v) for k, v in detox_model.predict(summary).items()}
-            report_scores  = {k: float(v) for k, v in detox_model.predict(plain_text).items()}
-
-            # Compute overall toxicity scores and reduction percentages
-            summary_scores["overall"] = sum(summary_scores.values()) / len(summary_scores)
-            report_scores["overall"]  = sum(report_scores.values())  / len(report_scores)
-            percentage_reduction = {
-                label: ((report_scores[label] - summary_scores[label]) / report_scores[label] * 100)
-                           if report_scores[label] > 0 else 0.0
-                for label in report_scores
-            }
+            summary, long_document = await generate_summary(plain_text, model, plan, use_cache=not bypass_cache)
+            if not summary or summary.startswith("Error"):
+                # Failed call or open circuit breaker: report it without judging, scoring or storing it
+                logger.warning(f"No summary for {file.filename} ({model}): {summary}")
+                summaries[file.filename] = summary or "Error: The model returned an empty summary."
+                continue
+            metadata = {"filename": file.filename, "model": model, "preflight": plan.to_dict()}
+            if long_document:
+                metadata["long_document"] = long_document
+
+            if defer_scoring:
+                # Store now, score in the background
+                metadata = pending_metadata(metadata)
+                summary_id = await asyncio.to_thread(db.save_summary, user_id, plain_text, summary, metadata)
+                scorer.enqueue(summary_id)
+                logger.info(f"Saved summary {summary_id} for user={user_id}, file={file.filename} (scoring deferred)")
+                summaries[file.filename] = {"summary": summary, "metadata": metadata, "summary_id": summary_id}
+                continue
+
+            summaries[file.filename] = None  # Keeps the response in upload order
+            to_score.append((file.filename, plain_text, summary, metadata))
+
+        except Exception as e:
+            logger.error(f"Error processing {file.filename}: {e}")
+            summaries[file.filename] = f"Error: {e}"
+
+        finally:
+            os.unlink(temp_path)
+
+    if not to_score:
+        return summaries
+
+    # Toxicity of every report and summary in one batched Detoxify pass,
+    # concurrently with the per-file quality evaluations
+    texts = [text for _, plain_text, summary, _ in to_score for text in (plain_text, summary)]
+    toxicity_task = asyncio.ensure_future(ascore_texts(texts))
+    evaluations = await asyncio.gather(
+        *(aevaluate_summary(plain_text, summary) for _, plain_text, summary, _ in to_score),
+        return_exceptions=True,
+    )
+    try:
+        toxicity_analyses = await toxicity_task
+    except Exception as e:
+        logger.error(f"Toxicity scoring failed: {e}")
+        for filename, *_ in to_score:
+            summaries[filename] = f"Error: {e}"
+        return summaries
 
+    for index, ((filename, plain_text, summary, metadata), evaluation) in enumerate(zip(to_score, evaluations)):
+        report, summary_analysis = toxicity_analyses[2 * index], toxicity_analyses[2 * index + 1]
+        try:
+            if isinstance(evaluation, Exception):
+                raise evaluation
+            metadata.update(toxicity_entries(report, summary_analysis), **evaluation)
             # Persist results and prepare response payload
+            summary_id = await asyncio.to_thread(db.save_summary, user_id, plain_text, summary, metadata)
+        except Exception as e:
+            logger.error(f"Error processing {filename}: {e}")
+            summaries[filename] = f"Error: {e}"
+            continue
+        logger.info(f"Saved summary for user={user_id}, file={filename}")
+        summaries[filename] = {"summary": summary, "metadata": metadata, "summary_id": summary_id}
+
+    return summaries
+
+
+@app.post("/summarize/stream")
+async def summarize_stream(
+    user_id: str = Form(...),
+    file: UploadFile = File(...),
+    model: str = Form(...),
+    bypass_cache: bool = Form(False)
+):
+    """
+    Streaming variant of /summarize for a single file, as server-sent events.
+
+    Events, in order:
+      - "start":      filename and model
+      - "token":      each summary delta as it arrives from the model
+      - "summary":    the complete summary with time-to-first-token and total time
+      - "lexical":    local ROUGE, compression and entity/number retention scores
+      - "evaluation" / "toxicity": judge and toxicity results, whichever finishes first
+      - "done":       the stored metadata (same shape as /summarize)
+      - "error":      emitted instead of the remaining events if generation fails
+    """
+    logger.info(f"Received streaming summarization request for user: {user_id} with model: {model}")
+    if not any(file.filename.endswith(ext) for ext in SUPPORTED_FILE_TYPES):
+        raise HTTPException(status_code=400, detail="file not supported")
+    check_upload_size(file)
+
+    temp_path = await asyncio.to_thread(handle_uploaded_file, file)
+    try:
+        parsed = await asyncio.to_thread(parser.from_file, temp_path)
+        plain_text = parsed.get('content').strip()
+    finally:
+        os.unlink(temp_path)
+
+    # Streaming covers single-call summaries only; chunked documents go through /summarize
+    plan = await preflight(plain_text, model)
+    if plan.route == REJECTED:
+        raise HTTPException(status_code=400, detail=plan.reason)
+    if plan.route != SINGLE:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Streaming needs a single-call summary, but {plan.reason}. Use /summarize for long documents."
+        )
+
+    async def events():
+        yield sse_event("start", {"filename": file.filename, "model": model})
+
+        # Forward summary tokens as they arrive while recording TTFT and tokens/s
+        parts = []
+        started = time.perf_counter()
+        first_token_seconds = None
+        try:
+            async for piece in stream_metrics.measure(model, astream_summary(plain_text, model, use_cache=not bypass_cache)):
+                if first_token_seconds is None:
+                    first_token_seconds = time.perf_counter() - started
+                parts.append(piece)
+                yield sse_event("token", {"text": piece})
+        except ModelUnavailableError as e:
+            yield sse_event("error", {"detail": str(e), "unavailable": True})
+            return
+        except Exception as e:
+            logger.error(f"Streaming summary failed for {file.filename} ({model}): {e}")
+            yield sse_event("error", {"detail": f"Error: {e}"})
+            return
+
+        summary = "".join(parts).strip()
+        yield sse_event("summary", {
+            "summary": summary,
+            "ttft_seconds": first_token_seconds,
+            "total_seconds": time.perf_counter() - started,
+        })
+
+        # Local metrics take milliseconds and go out first; then run the (possibly
+        # gated) judge and toxicity scoring concurrently, emitting each when ready
+        metadata = {"filename": file.filename, "model": model, "preflight": plan.to_dict()}
+        lexical = await asyncio.to_thread(lexical_scores, plain_text, summary)
+        yield sse_event("lexical", lexical)
+        pending = {
+            asyncio.ensure_future(aevaluate_summary(plain_text, summary, lexical=lexical)): "evaluation",
+            asyncio.ensure_future(toxicity_metadata(plain_text, summary)): "toxicity",
+        }
+        try:
+            while pending:
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    name = pending.pop(task)
+                    if name == "evaluation":
+                        metadata.update(task.result())
+                        yield sse_event("evaluation", {"quality_scores": metadata["quality_scores"],
+                                                       "evaluation_status": metadata["evaluation_status"]})
+                    else:
+                        metadata.update(task.result())
+                        yield sse_event("toxicity", task.result())
+        except Exception as e:
+            for task in pending:
+                task.cancel()
+            logger.error(f"Scoring failed for {file.filename} ({model}): {e}")
+            yield sse_event("error", {"detail": f"Error: {e}"})
+            return
+
+        await asyncio.to_thread(db.save_summary, user_id, plain_text, summary, metadata)
+        logger.info(f"Saved streamed summary for user={user_id}, file={file.filename}")
+        yield sse_event("done", {"metadata": metadata})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.post("/summarize/compare")
+async def summarize_compare(
+    user_id: str = Form(...),
+    file: UploadFile = File(...),
+    models: list[str] = Form(...),
+    timeout_seconds: float = Form(None),
+    bypass_cache: bool = Form(False)
+):
+    """
+    Summarize one document with several models side by side.
+
+    The file is extracted and the report is scored with Detoxify once; all
+    selected models then run concurrently, each bounded by a per-model
+    timeout, so the wall time follows the slowest model rather than the sum.
+    Every successful summary is evaluated, scored and stored like a
+    /summarize result.
+
+    `models` may be repeated form fields or one comma-separated value.
+    Models whose pre-flight budget rejects the document get a "rejected" row
+    with the reason instead of being called.
+
+    Returns:
+        dict: filename, wall time, report toxicity (with its most offending
+              spans) and one comparison row per model (status, latency, input
+              tokens counted for the model, estimated output tokens, quality
+              scores, overall toxicity reduction, the summary and the
+              pre-flight plan).
+    """
+    selected = list(dict.fromkeys(
+        name.strip() for value in models for name in value.split(",") if name.strip()
+    ))
+    unknown = [name for name in selected if name not in SUMMARIZATION_BACKENDS]
+    if not selected or unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unsupported model(s): {', '.join(unknown) or 'none selected'}. "
+                   f"Choose from {', '.join(SUMMARIZATION_BACKENDS)}."
+        )
+    if not any(file.filename.endswith(ext) for ext in SUPPORTED_FILE_TYPES):
+        raise HTTPException(status_code=400, detail="file not supported")
+    check_upload_size(file)
+    timeout = timeout_seconds or COMPARE_MODEL_TIMEOUT_SECONDS
+    logger.info(f"Received comparison request for user: {user_id} with models: {selected}")
+
+    temp_path = await asyncio.to_thread(handle_uploaded_file, file)
+    try:
+        parsed = await asyncio.to_thread(parser.from_file, temp_path)
+        plain_text = parsed.get('content').strip()
+    finally:
+        os.unlink(temp_path)
+
+    plans = dict(zip(selected, await asyncio.gather(*(preflight(plain_text, model) for model in selected))))
+    if all(plan.route == REJECTED for plan in plans.values()):
+        raise HTTPException(status_code=400, detail=" ".join(dict.fromkeys(plan.reason for plan in plans.values())))
+
+    started = time.perf_counter()
+    # Score the report once, concurrently with the summaries; every model awaits the same task
+    report_task = asyncio.ensure_future(ascore_text(plain_text))
+
+    async def run_model(model: str) -> dict:
+        plan = plans[model]
+        row = {"model": model, "status": "ok", "latency_seconds": None,
+               "input_tokens": plan.input_tokens, "output_tokens": None,
+               "quality_scores": None, "evaluation_status": None, "lexical_scores": None,
+               "toxicity_reduction": None, "summary": None,
+               "preflight": plan.to_dict()}
+        if plan.route == REJECTED:
+            return dict(row, status="rejected", summary=f"Error: {plan.reason}")
+        model_started = time.perf_counter()
+        try:
+            summary, long_document = await asyncio.wait_for(
+                generate_summary(plain_text, model, plan, use_cache=not bypass_cache), timeout
+            )
+        except asyncio.TimeoutError:
+            logger.warning(f"Comparison: {model} timed out after {timeout:.0f}s")
+            return dict(row, status="timeout", latency_seconds=time.perf_counter() - model_started)
+        except Exception as e:
+            logger.error(f"Comparison: {model} failed: {e}")
+            return dict(row, status="error", summary=f"Error: {e}",
+                        latency_seconds=time.perf_counter() - model_started)
+
+        row.update(latency_seconds=time.perf_counter() - model_started,
+                   output_tokens=estimate_tokens(summary or ""), summary=summary)
+        if not summary or summary.startswith("Error"):
+            row["status"] = "error"
+            return row
+
+        try:
+            report = await asyncio.shield(report_task)
+            evaluation, toxicity = await asyncio.gather(
+                aevaluate_summary(plain_text, summary),
+                toxicity_metadata(plain_text, summary, report=report),
+            )
             metadata = {
                 "filename": file.filename,
                 "model": model,
-                "detox_summary": summary_scores,
-                "detox_report": report_scores,
-                "percentage_reduction": percentage_reduction,
-                "quality_scores": quality_scores,
+                **toxicity,
+                **evaluation,
+                "latency_seconds": row["latency_seconds"],
+                "preflight": plan.to_dict(),
             }
-            db.save_summary(user_id, plain_text, summary, metadata)
-            logger.info(f"Saved summary for user={user_id}, file={file.filename}")
+            if long_document:
+                metadata["long_document"] = long_document
+            await asyncio.to_thread(db.save_summary, user_id, plain_text, summary, metadata)
+        except Exception as e:
+            logger.error(f"Comparison: scoring {model} failed: {e}")
+            return dict(row, status="error", summary=f"Error: {e}")
 
-            summaries[file.filename] = {"summary": summary, "metadata": metadata}
+        row.update(quality_scores=evaluation["quality_scores"],
+                   evaluation_status=evaluation["evaluation_status"],
+                   lexical_scores=evaluation["lexical_scores"],
+                   toxicity_reduction=toxicity["percentage_reduction"].get("overall"))
+        return row
 
-        except Exception as e:
-            logger.error(f"Error processing {file.filename}: {e}")
-            summaries[file.filename] = f"Error: {e}"
+    results = await asyncio.gather(*(run_model(model) for model in selected))
+    try:
+        report = await report_task
+    except Exception as e:
+        logger.error(f"Comparison: scoring the report failed: {e}")
+        report = None
+    logger.info(f"Saved comparison of {len(selected)} models for user={user_id}, file={file.filename}")
+
+    return {
+        "filename": file.filename,
+        "wall_seconds": time.perf_counter() - started,
+        "detox_report": report["scores"] if report else None,
+        "report_toxic_spans": report["top_spans"] if report else None,
+        "results": results,
+    }
+
+
+@app.post("/summarize/preflight")
+async def summarize_preflight(
+    file: UploadFile = File(...),
+    models: list[str] = Form(...)
+):
+    """
+    Budget one document for several models without summarizing it.
 
-        finally:
-            os.unlink(temp_path)
+    Returns:
+        dict: filename and, per model, the pre-flight plan: route ("single",
+              "chunked" or "rejected"), reason, token count and method,
+              context window, number of model calls and predicted latency
+              and cost.
+    """
+    selected = list(dict.fromkeys(
+        name.strip() for value in models for name in value.split(",") if name.strip()
+    ))
+    if not any(file.filename.endswith(ext) for ext in SUPPORTED_FILE_TYPES):
+        raise HTTPException(status_code=400, detail="file not supported")
+    check_upload_size(file)
+
+    temp_path = await asyncio.to_thread(handle_uploaded_file, file)
+    try:
+        parsed = await asyncio.to_thread(parser.from_file, temp_path)
+        plain_text = parsed.get('content').strip()
+    finally:
+        os.unlink(temp_path)
 
-    return summaries
+    plans = await asyncio.gather(*(preflight(plain_text, model) for model in selected))
+    return {"filename": file.filename, "plans": {plan.model: plan.to_dict() for plan in plans}}
 
 
 @app.get("/summaries")
@@ -189,6 +618,57 @@ async def get_summaries(user: str):
         return {"summaries": []}
 
 
+@app.get("/summaries/{summary_id}/scores")
+async def get_summary_scores(summary_id: int, wait: float = 0):
+    """
+    Poll (or long-poll) the scoring state of a stored summary.
+
+    Args:
+        summary_id (int): ID returned by /summarize.
+        wait (float): Seconds to wait for pending scoring to finish (at most 60).
+
+    Returns:
+        dict: summary_id, scoring status ("pending", "done", "failed", or
+              "done" for summaries scored inline) and the stored metadata.
+    """
+    record = await scorer.wait(summary_id, min(max(wait, 0.0), 60.0))
+    if record is None:
+        raise HTTPException(status_code=404, detail=f"Summary {summary_id} not found")
+    metadata = record["metadata"]
+    return {
+        "summary_id": summary_id,
+        "status": metadata.get("scoring", {}).get("status", "done"),
+        "metadata": metadata,
+    }
+
+
+@app.post("/summaries/rescore")
+async def rescore_summaries(
+    summary_ids: list[int] = Form(None),
+    user_id: str = Form(None),
+    pending_only: bool = Form(False)
+):
+    """
+    Queue stored summaries for background rescoring in bulk.
+
+    Selects the given `summary_ids`, or else every summary; `user_id`
+    restricts the selection to that user's summaries and `pending_only` to
+    summaries whose scoring never finished. Previous scores stay visible
+    until the new ones arrive.
+
+    Returns:
+        dict: Number and IDs of the queued summaries.
+    """
+    status = PENDING if pending_only else None
+    ids = await asyncio.to_thread(db.list_summary_ids, user_id, status)
+    if summary_ids:
+        existing = set(ids)
+        ids = [summary_id for summary_id in summary_ids if summary_id in existing]
+    queued = await scorer.rescore(ids)
+    logger.info(f"Queued {len(queued)} summaries for rescoring")
+    return {"queued": len(queued), "summary_ids": queued}
+
+
 @app.delete("/summaries/{summary_id}")
 async def delete_summary_route(summary_id: int):
     """
@@ -202,6 +682,139 @@ async def delete_summary_route(summary_id: int):
         raise HTTPException(status_code=500, detail="Could not delete summary")
 
 
+@app.get("/health/models")
+async def model_health():
+    """
+    Report the circuit-breaker state of every summarization model and of the
+    evaluation judge ("closed" = healthy, "open" = failing fast, "half_open" =
+    probing recovery). Models with `available: false` should be greyed out.
+    """
+    return {
+        "models": {name: circuit_breakers.get(name).snapshot() for name in SUMMARIZATION_BACKENDS},
+        "evaluation": circuit_breakers.get(JUDGE_BREAKER).snapshot(),
+    }
+
+
+@app.get("/metrics/models")
+async def model_metrics():
+    """
+    Report load time, hit/miss counts and resident size of every locally hosted model.
+    """
+    return model_registry.stats()
+
+
+@app.get("/metrics/providers")
+async def provider_metrics():
+    """
+    Report per-provider request counts and how many reused a pooled connection.
+    """
+    return provider_registry.snapshot()
+
+
+@app.get("/metrics/streaming")
+async def streaming_metrics():
+    """
+    Report time-to-first-token, tokens/second and total stream time per model.
+    """
+    return stream_metrics.snapshot()
+
+
+@app.get("/healthz")
+async def healthz():
+    """Liveness: the process is up and its event loop is serving requests."""
+    return {"status": "ok"}
+
+
+@app.get("/readyz")
+async def readyz():
+    """
+    Readiness: 200 once every warm-up model is loaded, 503 (with per-model
+    status: pending, loading, ready or failed) until then.
+    """
+    snapshot = warmup.snapshot()
+    return JSONResponse(status_code=200 if snapshot["ready"] else 503, content=snapshot)
+
+
+@app.get("/metrics/startup")
+async def startup_metrics():
+    """
+    Report the startup phases (imports, databases, model warm-up) and the
+    slowest imports by top-level package.
+    """
+    return startup_report.snapshot()
+
+
+@app.get("/metrics/cache")
+async def cache_metrics():
+    """
+    Report hits per tier, hit ratio, savings and size of the summary, toxicity and judge caches.
+
+    "saved" holds what the hits avoided: Detoxify seconds for the toxicity
+    cache; judge seconds, tokens and USD for the judge cache.
+    """
+    return {
+        "summary": summary_cache.stats(),
+        "toxicity": toxicity_cache.stats(),
+        "judge": judge_cache.stats(),
+    }
+
+
+@app.get("/metrics/throughput")
+async def throughput_metrics():
+    """
+    Report the per-model latency history used by the pre-flight predictions.
+    """
+    return summary_throughput.snapshot()
+
+
+@app.get("/metrics/scoring")
+async def scoring_metrics():
+    """
+    Report the background scoring pool: queued, in-progress, completed and failed jobs.
+    """
+    return scorer.stats()
+
+
+@app.get("/metrics/evaluation")
+async def evaluation_metrics():
+    """
+    Report judge outcomes (scored, salvaged, unavailable) and the attempt-count distribution.
+    """
+    return evaluation_stats.snapshot()
+
+
+@app.get("/metrics/hedging")
+async def hedging_metrics():
+    """
+    Report hedge rate, hedge win rate and estimated latency saved per model.
+    """
+    return hedger.snapshot()
+
+
+@app.get("/metrics/bart-batching")
+async def bart_batching_metrics():
+    """
+    Report BART micro-batching: batch count, batch-size and queue-wait histograms.
+    """
+    return bart_scheduler.stats()
+
+
+@app.get("/metrics/inference-workers")
+async def inference_worker_metrics():
+    """
+    Report the inference worker processes: liveness, jobs, batch sizes, failures and restarts.
+    """
+    return inference_pool.stats()
+
+
+@app.get("/metrics/rate-limits")
+async def rate_limit_metrics():
+    """
+    Report per-provider limits, in-flight requests, queue depth, wait times and upstream throttling.
+    """
+    return rate_limits.snapshot()
+
+
 # Include authentication routes (login, signup, token management)
 app.include_router(auth_router)
 
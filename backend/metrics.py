@@ -0,0 +1,170 @@
+"""
+metrics.py
+
+Small in-process metric primitives shared by the backend modules.
+
+`RollingStats` keeps a bounded window of samples (latencies, rates, wait
+times) and reports count/mean/percentiles; `Histogram` counts samples into
+fixed buckets (batch sizes, attempt counts). Both are thread-safe and cheap
+enough to update on every request. `ThroughputStats` learns per-model call
+latency from completed calls for pre-flight predictions. `estimate_tokens`
+provides the shared tokenizer-free token estimate.
+"""
+
+import bisect
+import threading
+from collections import deque
+from typing import Any, Dict, Optional, Sequence
+
+
+class RollingStats:
+    """Bounded window of numeric samples with summary statistics."""
+
+    def __init__(self, window: int = 1000):
+        """
+        Args:
+            window (int): Number of most recent samples kept for percentiles.
+        """
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self.count = 0      # Total samples ever recorded (not just the window)
+        self.total = 0.0    # Sum of all samples ever recorded
+
+    def record(self, value: float) -> None:
+        """Add one sample."""
+        with self._lock:
+            self._samples.append(value)
+            self.count += 1
+            self.total += value
+
+    def percentile(self, q: float) -> Optional[float]:
+        """
+        Return the *q*-th percentile (0–100) of the current window.
+
+        Returns:
+            float | None: The percentile, or None if no samples were recorded.
+        """
+        with self._lock:
+            ordered = sorted(self._samples)
+        if not ordered:
+            return None
+        index = min(len(ordered) - 1, max(0, int(round(q / 100 * (len(ordered) - 1)))))
+        return ordered[index]
+
+    def summary(self) -> Dict[str, Any]:
+        """Return count, mean, p50/p90/p99 and max of the recorded samples."""
+        with self._lock:
+            ordered = sorted(self._samples)
+            count, total = self.count, self.total
+        if not ordered:
+            return {"count": count, "mean": None, "p50": None, "p90": None, "p99": None, "max": None}
+
+        def pick(q):
+            return ordered[min(len(ordered) - 1, int(round(q / 100 * (len(ordered) - 1))))]
+
+        return {
+            "count": count,
+            "mean": total / count,
+            "p50": pick(50),
+            "p90": pick(90),
+            "p99": pick(99),
+            "max": ordered[-1],
+        }
+
+
+class Histogram:
+    """Counts samples into buckets delimited by ascending upper bounds."""
+
+    def __init__(self, bounds: Sequence[float]):
+        """
+        Args:
+            bounds (Sequence[float]): Ascending inclusive upper bounds; samples
+                above the last bound fall into an overflow bucket.
+        """
+        self.bounds = list(bounds)
+        self._counts = [0] * (len(self.bounds) + 1)
+        self._lock = threading.Lock()
+
+    def record(self, value: float) -> None:
+        """Add one sample to its bucket."""
+        with self._lock:
+            self._counts[bisect.bisect_left(self.bounds, value)] += 1
+
+    def snapshot(self) -> Dict[str, int]:
+        """Return bucket counts keyed by "<=bound" labels (plus ">last")."""
+        with self._lock:
+            counts = list(self._counts)
+        labels = [f"<={bound:g}" for bound in self.bounds] + [f">{self.bounds[-1]:g}"]
+        return dict(zip(labels, counts))
+
+
+class ThroughputStats:
+    """
+    Per-key latency model learned from completed calls.
+
+    Every call is reduced to seconds per "work token": output tokens plus
+    input tokens divided by INPUT_TOKEN_SPEEDUP (prompt tokens are processed
+    in parallel and cost far less time than generated ones). Predictions
+    scale the p50/p90 of that rate back up.
+    """
+
+    INPUT_TOKEN_SPEEDUP = 10.0
+
+    def __init__(self, window: int = 200):
+        self.window = window
+        self._rates: Dict[str, RollingStats] = {}
+        self._output_tokens: Dict[str, RollingStats] = {}
+        self._lock = threading.Lock()
+
+    def _work(self, input_tokens: int, output_tokens: int) -> float:
+        return max(1.0, output_tokens + input_tokens / self.INPUT_TOKEN_SPEEDUP)
+
+    def record(self, key: str, input_tokens: int, output_tokens: int, seconds: float) -> None:
+        """Add one completed call of *key*."""
+        with self._lock:
+            if key not in self._rates:
+                self._rates[key] = RollingStats(self.window)
+                self._output_tokens[key] = RollingStats(self.window)
+        self._rates[key].record(seconds / self._work(input_tokens, output_tokens))
+        self._output_tokens[key].record(output_tokens)
+
+    def samples(self, key: str) -> int:
+        """Number of calls recorded for *key*."""
+        stats = self._rates.get(key)
+        return stats.count if stats else 0
+
+    def mean_output_tokens(self, key: str) -> Optional[float]:
+        """Mean output length of *key*'s calls, or None without history."""
+        stats = self._output_tokens.get(key)
+        return stats.total / stats.count if stats and stats.count else None
+
+    def predict(self, key: str, input_tokens: int, output_tokens: int) -> Optional[Dict[str, float]]:
+        """
+        Predict the latency of one call of *key*.
+
+        Returns:
+            dict | None: "p50" and "p90" seconds, or None without history.
+        """
+        stats = self._rates.get(key)
+        if not stats or not stats.count:
+            return None
+        work = self._work(input_tokens, output_tokens)
+        return {"p50": stats.percentile(50) * work, "p90": stats.percentile(90) * work}
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return calls, seconds-per-work-token summary and mean output tokens per key."""
+        with self._lock:
+            keys = list(self._rates)
+        return {key: {"calls": self.samples(key),
+                      "seconds_per_work_token": self._rates[key].summary(),
+                      "mean_output_tokens": self.mean_output_tokens(key)} for key in keys}
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Cheap, tokenizer-free token estimate (~4 characters per token for English).
+
+    Good enough for throughput metrics and budgeting where calling a real
+    tokenizer for every provider would cost more than it is worth.
+    """
+    return max(1, round(len(text) / 4)) if text else 0
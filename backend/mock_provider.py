@@ -0,0 +1,342 @@
+"""
+mock_provider.py
+
+Local stand-in for the LLM vendors, for offline load tests and CI.
+
+Speaks the wire formats used by the provider SDKs in this backend, so the
+real client code paths (pooling, streaming, rate limiting, retries, circuit
+breakers) are exercised without network access or cost:
+
+  - OpenAI / xAI / Mistral chat completions:  POST /v1/chat/completions
+  - RunPod OpenAI-compatible endpoints:       POST /v2/{endpoint_id}/openai/v1/chat/completions
+  - Anthropic Messages API:                   POST /v1/messages
+
+Both plain and streaming (`"stream": true`, server-sent events) responses are
+supported. Time to first token follows a configurable latency distribution,
+output is paced at a configurable token rate, and a share of requests can be
+failed with 500s or throttled with 429 + `Retry-After`. Responses are either
+a canned text or an echo of the start of the prompt; requests to the
+evaluation judge (which asks for JSON) get valid score JSON.
+
+Run it and point the backend at it:
+    python mock_provider.py --port 9000 --latency-distribution lognormal --latency-mean 1.5
+    PROVIDER_BASE_URL=http://127.0.0.1:9000 uvicorn main:app
+
+Settings can be changed at runtime with `POST /mock/config` and request
+counters are available at `GET /mock/stats`.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import random
+import threading
+import time
+import uuid
+from dataclasses import asdict, dataclass, fields
+from typing import Any, AsyncIterator, Dict, List, Tuple
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+from metrics import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+LATENCY_DISTRIBUTIONS = ("fixed", "uniform", "normal", "lognormal")
+
+DEFAULT_CANNED_TEXT = (
+    "The report describes a routine patrol in the northern sector. No hostile contact was made. "
+    "Infrastructure along the main supply route remains intact, and local authorities reported "
+    "no unusual activity. Follow-up reconnaissance is recommended within the next reporting period."
+)
+
+JUDGE_RESPONSE = {
+    "Consistency": {"score": 8, "justification": "Mock judge: consistent with the source."},
+    "Coverage": {"score": 7, "justification": "Mock judge: covers the main points."},
+    "Coherence": {"score": 8, "justification": "Mock judge: reads coherently."},
+    "Fluency": {"score": 9, "justification": "Mock judge: fluent."},
+    "Overall": {"score": 8, "justification": "Mock judge: rounded average."},
+}
+
+
+@dataclass
+class MockConfig:
+    """Behaviour of the mock server (all fields can be updated via POST /mock/config)."""
+    latency_distribution: str = "lognormal"  # Time to first token: fixed, uniform, normal or lognormal
+    latency_mean: float = 0.5                # Mean (fixed/uniform/normal) or median (lognormal), seconds
+    latency_sigma: float = 0.5               # Spread: half-width (uniform), std-dev (normal), log-sigma (lognormal)
+    tokens_per_second: float = 80.0          # Output pacing; 0 returns output instantly
+    error_rate: float = 0.0                  # Share of requests failed with HTTP 500
+    rate_limit_rate: float = 0.0             # Share of requests rejected with HTTP 429
+    retry_after_seconds: float = 1.0         # Retry-After sent with 429s
+    response_mode: str = "canned"            # "canned" or "echo" (first output_tokens words of the prompt)
+    canned_text: str = DEFAULT_CANNED_TEXT
+    output_tokens: int = 120                 # Echo length in words
+    seed: int = None                         # Seed for reproducible runs
+
+    def sample_latency(self, rng: random.Random) -> float:
+        """Draw one time-to-first-token sample in seconds."""
+        if self.latency_distribution == "fixed":
+            return self.latency_mean
+        if self.latency_distribution == "uniform":
+            return max(0.0, rng.uniform(self.latency_mean - self.latency_sigma, self.latency_mean + self.latency_sigma))
+        if self.latency_distribution == "normal":
+            return max(0.0, rng.gauss(self.latency_mean, self.latency_sigma))
+        return self.latency_mean * rng.lognormvariate(0.0, self.latency_sigma)
+
+
+class MockState:
+    """Current configuration, random source and request counters."""
+
+    def __init__(self, config: MockConfig):
+        self._lock = threading.Lock()
+        self.configure(asdict(config))
+        self.counters: Dict[str, int] = {}
+
+    def configure(self, updates: Dict[str, Any]) -> MockConfig:
+        known = {f.name for f in fields(MockConfig)}
+        unknown = set(updates) - known
+        if unknown:
+            raise ValueError(f"Unknown setting(s): {', '.join(sorted(unknown))}")
+        with self._lock:
+            current = asdict(self.config) if hasattr(self, "config") else {}
+            config = MockConfig(**dict(current, **updates))
+            if config.latency_distribution not in LATENCY_DISTRIBUTIONS:
+                raise ValueError(f"latency_distribution must be one of {', '.join(LATENCY_DISTRIBUTIONS)}")
+            if config.response_mode not in ("canned", "echo"):
+                raise ValueError("response_mode must be 'canned' or 'echo'")
+            self.config = config
+            self.rng = random.Random(config.seed)
+        return config
+
+    def count(self, name: str) -> None:
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + 1
+
+
+state = MockState(MockConfig())
+app = FastAPI(title="Mock LLM provider")
+
+
+def _messages_text(body: Dict[str, Any]) -> Tuple[str, str]:
+    """Return (system prompt, last user message) from an OpenAI- or Anthropic-style body."""
+    system = body.get("system") or ""
+    if isinstance(system, list):  # Anthropic content blocks
+        system = " ".join(block.get("text", "") for block in system)
+    user = ""
+    for message in body.get("messages", []):
+        content = message.get("content") or ""
+        if isinstance(content, list):
+            content = " ".join(block.get("text", "") for block in content if isinstance(block, dict))
+        if message.get("role") == "system":
+            system = f"{system} {content}".strip()
+        elif message.get("role") == "user":
+            user = content
+    return system, user
+
+
+def _completion_text(body: Dict[str, Any]) -> str:
+    """Pick the reply: judge JSON, an echo of the prompt or the canned text."""
+    system, user = _messages_text(body)
+    if "JSON" in system:
+        return json.dumps(JUDGE_RESPONSE)
+    config = state.config
+    if config.response_mode == "echo":
+        return " ".join(user.split()[:config.output_tokens])
+    return config.canned_text
+
+
+def _pieces(text: str) -> List[str]:
+    """Split *text* into word-sized stream deltas (approximately one token each)."""
+    words = text.split(" ")
+    return [word if i == 0 else " " + word for i, word in enumerate(words)]
+
+
+def _injected_failure(api: str):
+    """Return an error response for a sampled 429/500, or None."""
+    config, rng = state.config, state.rng
+    draw = rng.random()
+    if draw < config.rate_limit_rate:
+        state.count("rate_limited")
+        return JSONResponse(
+            status_code=429,
+            headers={"Retry-After": f"{config.retry_after_seconds:g}"},
+            content=_error_body(api, "rate_limit_error", "Mock rate limit exceeded"),
+        )
+    if draw < config.rate_limit_rate + config.error_rate:
+        state.count("errors")
+        return JSONResponse(status_code=500, content=_error_body(api, "api_error", "Mock internal error"))
+    return None
+
+
+def _error_body(api: str, kind: str, message: str) -> Dict[str, Any]:
+    if api == "anthropic":
+        return {"type": "error", "error": {"type": kind, "message": message}}
+    return {"error": {"message": message, "type": kind, "code": kind}}
+
+
+async def _paced(pieces: List[str]) -> AsyncIterator[str]:
+    """Yield *pieces* at the configured token rate."""
+    rate = state.config.tokens_per_second
+    for piece in pieces:
+        if rate > 0:
+            await asyncio.sleep(1.0 / rate)
+        yield piece
+
+
+async def _generation_delay(n_tokens: int) -> None:
+    """Sleep for a full non-streamed generation: time to first token plus output time."""
+    config = state.config
+    await asyncio.sleep(config.sample_latency(state.rng)
+                        + (n_tokens / config.tokens_per_second if config.tokens_per_second > 0 else 0.0))
+
+
+def _sse(data: Dict[str, Any], event: str = None) -> str:
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {json.dumps(data)}\n\n"
+
+
+async def _openai_chat(body: Dict[str, Any]):
+    """OpenAI-compatible chat completion (OpenAI, xAI, Mistral and RunPod)."""
+    state.count("chat_completions")
+    failure = _injected_failure("openai")
+    if failure is not None:
+        return failure
+
+    model = body.get("model", "mock-model")
+    text = _completion_text(body)
+    prompt_tokens = estimate_tokens(" ".join(_messages_text(body)))
+    completion_tokens = estimate_tokens(text)
+    completion_id = f"chatcmpl-{uuid.uuid4().hex[:24]}"
+    created = int(time.time())
+    usage = {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+             "total_tokens": prompt_tokens + completion_tokens}
+
+    if not body.get("stream"):
+        await _generation_delay(completion_tokens)
+        return {
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": created,
+            "model": model,
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": text},
+                         "finish_reason": "stop"}],
+            "usage": usage,
+        }
+
+    async def events():
+        def chunk(delta, finish_reason=None, **extra):
+            return _sse(dict({
+                "id": completion_id, "object": "chat.completion.chunk", "created": created, "model": model,
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+            }, **extra))
+
+        await asyncio.sleep(state.config.sample_latency(state.rng))
+        yield chunk({"role": "assistant", "content": ""})
+        async for piece in _paced(_pieces(text)):
+            yield chunk({"content": piece})
+        yield chunk({}, "stop", usage=usage)
+        yield "data: [DONE]\n\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+
+@app.post("/v1/chat/completions")
+async def chat_completions(request: Request):
+    return await _openai_chat(await request.json())
+
+
+@app.post("/v2/{endpoint_id}/openai/v1/chat/completions")
+async def runpod_chat_completions(endpoint_id: str, request: Request):
+    state.count(f"runpod:{endpoint_id}")
+    return await _openai_chat(await request.json())
+
+
+@app.post("/v1/messages")
+async def anthropic_messages(request: Request):
+    """Anthropic Messages API (plain and streaming)."""
+    body = await request.json()
+    state.count("messages")
+    failure = _injected_failure("anthropic")
+    if failure is not None:
+        return failure
+
+    model = body.get("model", "mock-model")
+    text = _completion_text(body)
+    input_tokens = estimate_tokens(" ".join(_messages_text(body)))
+    output_tokens = estimate_tokens(text)
+    message_id = f"msg_{uuid.uuid4().hex[:24]}"
+
+    if not body.get("stream"):
+        await _generation_delay(output_tokens)
+        return {
+            "id": message_id, "type": "message", "role": "assistant", "model": model,
+            "content": [{"type": "text", "text": text}],
+            "stop_reason": "end_turn", "stop_sequence": None,
+            "usage": {"input_tokens": input_tokens, "output_tokens": output_tokens},
+        }
+
+    async def events():
+        await asyncio.sleep(state.config.sample_latency(state.rng))
+        yield _sse({"type": "message_start", "message": {
+            "id": message_id, "type": "message", "role": "assistant", "model": model, "content": [],
+            "stop_reason": None, "stop_sequence": None,
+            "usage": {"input_tokens": input_tokens, "output_tokens": 1},
+        }}, "message_start")
+        yield _sse({"type": "content_block_start", "index": 0,
+                    "content_block": {"type": "text", "text": ""}}, "content_block_start")
+        async for piece in _paced(_pieces(text)):
+            yield _sse({"type": "content_block_delta", "index": 0,
+                        "delta": {"type": "text_delta", "text": piece}}, "content_block_delta")
+        yield _sse({"type": "content_block_stop", "index": 0}, "content_block_stop")
+        yield _sse({"type": "message_delta", "delta": {"stop_reason": "end_turn", "stop_sequence": None},
+                    "usage": {"output_tokens": output_tokens}}, "message_delta")
+        yield _sse({"type": "message_stop"}, "message_stop")
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+
+@app.get("/mock/config")
+async def get_config():
+    return asdict(state.config)
+
+
+@app.post("/mock/config")
+async def update_config(request: Request):
+    """Update any subset of the `MockConfig` fields, e.g. {"rate_limit_rate": 0.2}."""
+    try:
+        return asdict(state.configure(await request.json()))
+    except (TypeError, ValueError) as e:
+        return JSONResponse(status_code=400, content={"detail": str(e)})
+
+
+@app.get("/mock/stats")
+async def get_stats():
+    return dict(state.counters)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mock OpenAI/Anthropic/Mistral/RunPod provider server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9000)
+    for f in fields(MockConfig):
+        option = "--" + f.name.replace("_", "-")
+        if f.name == "latency_distribution":
+            parser.add_argument(option, choices=LATENCY_DISTRIBUTIONS, default=f.default)
+        elif f.name == "response_mode":
+            parser.add_argument(option, choices=("canned", "echo"), default=f.default)
+        else:
+            kind = int if f.name in ("output_tokens", "seed") else float if isinstance(f.default, float) else str
+            parser.add_argument(option, type=kind, default=f.default)
+    args = vars(parser.parse_args())
+    host, port = args.pop("host"), args.pop("port")
+    state.configure(args)
+
+    import uvicorn
+    uvicorn.run(app, host=host, port=port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,461 @@
+"""
+model_registry.py
+
+Process-wide registry for the locally hosted models (BART, its tokenizer and
+Detoxify). Each model is loaded once per process and the same warm instance is
+handed to every caller. On CPU-only nodes BART can optionally run with dynamic
+int8 quantization of its linear layers; the quantized weights are cached on
+disk. Resident memory of every entry is tracked and the least-recently-used
+entries are evicted once the configured memory budget is exceeded. Per-model
+load time, hit/miss counts and resident size are exposed through
+`ModelRegistry.stats()` so nodes can be sized from real numbers.
+"""
+
+import asyncio
+import functools
+import gc
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Memory budget (in MB) shared by all resident models; 0 disables eviction
+MODEL_MEMORY_BUDGET_MB = int(os.getenv("MODEL_MEMORY_BUDGET_MB", "6144"))
+
+# Worker threads that run blocking local-model inference off the event loop
+INFERENCE_THREADS = int(os.getenv("INFERENCE_THREADS", "2"))
+
+# Opt-in dynamic int8 quantization of BART's linear layers (CPU only)
+BART_QUANTIZE = os.getenv("BART_QUANTIZE", "0") == "1"
+
+# Directory for on-disk copies of quantized models
+QUANTIZED_MODEL_DIR = os.getenv(
+    "QUANTIZED_MODEL_DIR", os.path.join(os.path.expanduser("~"), ".cache", "battle-brief", "quantized")
+)
+
+# Key suffix of the int8 weights in the on-disk state dict (see `_portable_int8_state`)
+INT8_WEIGHT_SUFFIX = "#int8"
+
+# Default checkpoints used by the application
+DEFAULT_BART_MODEL = "facebook/bart-large-cnn"
+DEFAULT_DETOXIFY_VARIANT = "unbiased"
+
+
+def estimate_resident_bytes(obj: Any) -> int:
+    """
+    Estimate the resident memory held by a loaded model object.
+
+    Parameters and buffers of torch modules are counted exactly, including the
+    packed int8 weights of dynamically quantized layers. Wrappers that
+    hold a torch module in a `.model` attribute (e.g. Detoxify) are unwrapped,
+    and tuples/lists are summed. Tokenizers and other plain objects are
+    counted as zero because their footprint is negligible next to the weights.
+
+    Args:
+        obj: The object returned by a registry loader.
+
+    Returns:
+        int: Estimated number of bytes held by the object's tensors.
+    """
+    if isinstance(obj, (tuple, list)):
+        return sum(estimate_resident_bytes(item) for item in obj)
+
+    # Unwrap helper classes that keep the actual network in `.model`
+    if not hasattr(obj, "parameters") and hasattr(obj, "model"):
+        return estimate_resident_bytes(obj.model)
+
+    if hasattr(obj, "parameters") and hasattr(obj, "buffers"):
+        total = 0
+        for tensor in list(obj.parameters()) + list(obj.buffers()):
+            total += tensor.numel() * tensor.element_size()
+        # Quantized linear layers keep (weight, bias) in packed params instead of parameters
+        for value in obj.state_dict().values():
+            if isinstance(value, tuple):
+                total += sum(t.numel() * t.element_size() for t in value if hasattr(t, "element_size"))
+        return total
+
+    return 0
+
+
+class ModelRegistry:
+    """
+    Thread-safe, memory-budgeted LRU cache of loaded models.
+
+    Entries are created on first use by a caller-supplied loader, reused on
+    every later call and evicted least-recently-used first when the sum of
+    resident sizes exceeds the memory budget. The entry that was just
+    requested is never evicted, so a single model larger than the budget is
+    still served (with a warning).
+    """
+
+    def __init__(self, memory_budget_mb: int = MODEL_MEMORY_BUDGET_MB):
+        """
+        Args:
+            memory_budget_mb (int): Total resident size allowed across all
+                entries, in megabytes. 0 or a negative value disables eviction.
+        """
+        self.memory_budget_bytes = max(0, memory_budget_mb) * 1024 * 1024
+        self._entries: "OrderedDict[str, Any]" = OrderedDict()
+        self._sizes: Dict[str, int] = {}
+        self._stats: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.RLock()
+        self._load_locks: Dict[str, threading.Lock] = {}
+
+    def _stat(self, key: str) -> Dict[str, Any]:
+        """Return (creating if needed) the statistics record for *key*."""
+        return self._stats.setdefault(key, {
+            "hits": 0,
+            "misses": 0,
+            "loads": 0,
+            "evictions": 0,
+            "last_load_seconds": None,
+            "total_load_seconds": 0.0,
+            "resident_bytes": 0,
+        })
+
+    def get(
+        self,
+        key: str,
+        loader: Callable[[], Any],
+        size_fn: Callable[[Any], int] = estimate_resident_bytes,
+    ) -> Any:
+        """
+        Return the warm instance registered under *key*, loading it on a miss.
+
+        Concurrent callers asking for the same missing key wait for a single
+        load instead of loading the model several times.
+
+        Args:
+            key (str): Unique identifier of the model (e.g. "bart:facebook/bart-large-cnn").
+            loader (Callable): Zero-argument function that builds the model.
+            size_fn (Callable): Function estimating the resident bytes of the
+                loaded object.
+
+        Returns:
+            The loaded (and now most-recently-used) model object.
+        """
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self._stat(key)["hits"] += 1
+                return self._entries[key]
+            load_lock = self._load_locks.setdefault(key, threading.Lock())
+
+        with load_lock:
+            # Another thread may have finished loading while we were waiting
+            with self._lock:
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+                    self._stat(key)["hits"] += 1
+                    return self._entries[key]
+                self._stat(key)["misses"] += 1
+
+            logger.info(f"Loading model '{key}' into the registry...")
+            started = time.perf_counter()
+            obj = loader()
+            elapsed = time.perf_counter() - started
+            size = size_fn(obj)
+
+            with self._lock:
+                self._entries[key] = obj
+                self._sizes[key] = size
+                stat = self._stat(key)
+                stat["loads"] += 1
+                stat["last_load_seconds"] = elapsed
+                stat["total_load_seconds"] += elapsed
+                stat["resident_bytes"] = size
+                self._enforce_budget(keep=key)
+
+            logger.info(f"Loaded model '{key}' in {elapsed:.2f}s ({size / 1024 ** 2:.1f} MB)")
+            return obj
+
+    def _enforce_budget(self, keep: str) -> None:
+        """Evict least-recently-used entries (except *keep*) until within budget."""
+        if not self.memory_budget_bytes:
+            return
+
+        evicted = False
+        while self.resident_bytes() > self.memory_budget_bytes:
+            victim = next((k for k in self._entries if k != keep), None)
+            if victim is None:
+                logger.warning(
+                    f"Model '{keep}' alone exceeds the memory budget "
+                    f"({self._sizes[keep] / 1024 ** 2:.1f} MB > "
+                    f"{self.memory_budget_bytes / 1024 ** 2:.1f} MB)"
+                )
+                break
+            self._remove(victim)
+            self._stat(victim)["evictions"] += 1
+            logger.info(f"Evicted model '{victim}' from the registry (memory budget exceeded)")
+            evicted = True
+
+        if evicted:
+            _release_memory()
+
+    def _remove(self, key: str) -> None:
+        """Drop *key* from the registry without touching its statistics counters."""
+        self._entries.pop(key, None)
+        self._sizes.pop(key, None)
+        self._stat(key)["resident_bytes"] = 0
+
+    def evict(self, key: str) -> bool:
+        """
+        Explicitly unload *key*.
+
+        Returns:
+            bool: True if the entry was resident and has been removed.
+        """
+        with self._lock:
+            if key not in self._entries:
+                return False
+            self._remove(key)
+            self._stat(key)["evictions"] += 1
+        _release_memory()
+        return True
+
+    def resident_bytes(self) -> int:
+        """Return the summed resident size of all loaded entries."""
+        with self._lock:
+            return sum(self._sizes.values())
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Snapshot of the registry state for monitoring.
+
+        Returns:
+            dict: Budget, total resident size and per-model counters
+                  (hits, misses, loads, evictions, load times, resident size).
+        """
+        with self._lock:
+            return {
+                "memory_budget_bytes": self.memory_budget_bytes,
+                "resident_bytes": sum(self._sizes.values()),
+                "resident_models": list(self._entries.keys()),
+                "models": {key: dict(stat, resident=key in self._entries)
+                           for key, stat in self._stats.items()},
+            }
+
+
+def _release_memory() -> None:
+    """Return freed model memory to the allocator (and the GPU, if any)."""
+    gc.collect()
+    try:
+        import torch
+        if torch.cuda.is_available():
+            torch.cuda.empty_cache()
+    except ImportError:
+        pass
+
+
+# Shared registry instance used by every module in the process
+model_registry = ModelRegistry()
+
+# Shared executor for CPU/GPU-bound inference (BART generation, Detoxify scoring)
+inference_executor = ThreadPoolExecutor(max_workers=INFERENCE_THREADS, thread_name_prefix="inference")
+
+
+async def run_inference(func: Callable[..., Any], *args, **kwargs) -> Any:
+    """
+    Run a blocking inference call on the shared inference executor.
+
+    Keeps the event loop free to serve other requests while local models
+    (including their first, lazy load) are busy.
+
+    Args:
+        func (Callable): The blocking function to run.
+        *args, **kwargs: Arguments forwarded to *func*.
+
+    Returns:
+        The return value of *func*.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(inference_executor, functools.partial(func, *args, **kwargs))
+
+
+def get_device():
+    """Return the torch device local models should run on."""
+    import torch
+    return torch.device("cuda" if torch.cuda.is_available() else "cpu")
+
+
+def bart_quantization_enabled(quantized: bool = None) -> bool:
+    """
+    Whether BART runs int8-quantized.
+
+    Args:
+        quantized (bool): Explicit choice; None uses the BART_QUANTIZE setting.
+            Quantization is only applied on CPU.
+    """
+    quantized = BART_QUANTIZE if quantized is None else quantized
+    return quantized and get_device().type == "cpu"
+
+
+def quantized_model_path(model_name: str) -> str:
+    """
+    On-disk location of the int8 weights of *model_name*.
+
+    The torch and transformers versions are part of the file name, since the
+    packed int8 layout of the state dict can change between versions.
+    """
+    import torch
+    import transformers
+    safe_name = model_name.strip("/").replace("/", "--")
+    return os.path.join(QUANTIZED_MODEL_DIR,
+                        f"{safe_name}.int8-weights.torch-{torch.__version__}.tf-{transformers.__version__}.pt")
+
+
+def _quantize_bart(model):
+    """Dynamic int8 quantization of BART's `torch.nn.Linear` layers."""
+    import torch
+    model.eval()
+    return torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+
+def _portable_int8_state(state: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Replace each packed (quantized weight, bias) entry of an int8 state dict by
+    (int8 values, scale, zero point, bias).
+
+    Pickling a quantized tensor stores its qscheme as a bare global that
+    pickle resolves by scanning `sys.modules`, which fails once a lazily
+    importing package (e.g. transformers) is imported before torch; plain
+    tensors save anywhere and load with `weights_only=True`.
+    """
+    portable = OrderedDict()
+    portable._metadata = getattr(state, "_metadata", None)  # Per-module versions read by load_state_dict
+    for key, value in state.items():
+        if isinstance(value, tuple) and value and getattr(value[0], "is_quantized", False):
+            weight, *rest = value
+            portable[key + INT8_WEIGHT_SUFFIX] = (weight.int_repr(), weight.q_scale(), weight.q_zero_point(), *rest)
+        else:
+            portable[key] = value
+    return portable
+
+
+def _restore_int8_state(portable: Dict[str, Any]) -> Dict[str, Any]:
+    """Inverse of `_portable_int8_state`."""
+    import torch
+    state = OrderedDict()
+    state._metadata = getattr(portable, "_metadata", None)
+    for key, value in portable.items():
+        if key.endswith(INT8_WEIGHT_SUFFIX):
+            int_repr, scale, zero_point, *rest = value
+            weight = torch._make_per_tensor_quantized_tensor(int_repr, scale, zero_point)
+            state[key[:-len(INT8_WEIGHT_SUFFIX)]] = (weight, *rest)
+        else:
+            state[key] = value
+    return state
+
+
+def _empty_quantized_bart(model_name: str):
+    """The int8 module structure of *model_name*, built from its config without loading or initializing weights."""
+    from transformers import BartConfig, BartForConditionalGeneration, GenerationConfig
+    try:
+        from transformers.initialization import no_init_weights
+    except ImportError:  # transformers < 5
+        from transformers.modeling_utils import no_init_weights
+
+    with no_init_weights():
+        model = BartForConditionalGeneration(BartConfig.from_pretrained(model_name))
+    try:
+        # from_pretrained also reads the checkpoint's generation defaults (beams, length penalty, ...)
+        model.generation_config = GenerationConfig.from_pretrained(model_name)
+    except OSError:
+        pass  # No generation_config.json: keep the defaults derived from the config
+    return _quantize_bart(model)
+
+
+def load_quantized_bart(model_name: str):
+    """
+    Load the dynamic int8 version of BART, quantizing and caching it on first use.
+
+    Only `torch.nn.Linear` layers are quantized (weights to int8, activations
+    quantized on the fly); embeddings and layer norms stay fp32. Only the
+    state dict is cached. Later loads build the int8 structure from the
+    config alone (the fp32 checkpoint is neither loaded nor re-quantized) and
+    read the cached weights with `weights_only=True`, so a tampered cache
+    file cannot run code on load.
+    """
+    import torch
+    from transformers import BartForConditionalGeneration
+
+    path = quantized_model_path(model_name)
+    if os.path.exists(path):
+        logger.info(f"Loading quantized BART weights from {path}")
+        try:
+            model = _empty_quantized_bart(model_name)
+            model.load_state_dict(_restore_int8_state(torch.load(path, weights_only=True)))
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable quantized BART cache {path}: {e}")
+        else:
+            model.eval()
+            return model
+
+    model = _quantize_bart(BartForConditionalGeneration.from_pretrained(model_name))
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    torch.save(_portable_int8_state(model.state_dict()), tmp_path)
+    os.replace(tmp_path, path)  # Atomic, so concurrent workers never read a partial file
+    logger.info(f"Saved quantized BART weights to {path}")
+    model.eval()
+    return model
+
+
+def get_bart_tokenizer(model_name: str = DEFAULT_BART_MODEL):
+    """Return the warm BART (fast) tokenizer from the registry without loading the model."""
+    def load():
+        from transformers import BartTokenizerFast
+        return BartTokenizerFast.from_pretrained(model_name)
+
+    return model_registry.get(f"tokenizer:{model_name}", load)
+
+
+def get_bart(model_name: str = DEFAULT_BART_MODEL, quantized: bool = None) -> Tuple[Any, Any, Any]:
+    """
+    Return a warm BART (fast) tokenizer/model pair from the registry.
+
+    Args:
+        model_name (str): HuggingFace model identifier of the BART variant.
+        quantized (bool): Use the dynamic int8 model (CPU only); None follows
+            the BART_QUANTIZE setting.
+
+    Returns:
+        tuple: (tokenizer, model, device); the model is already on *device*
+               and in evaluation mode.
+    """
+    device = get_device()
+
+    def load_model():
+        from transformers import BartForConditionalGeneration
+        model = BartForConditionalGeneration.from_pretrained(model_name).to(device)
+        model.eval()  # Inference only
+        return model
+
+    tokenizer = get_bart_tokenizer(model_name)
+    if bart_quantization_enabled(quantized):
+        model = model_registry.get(f"bart-int8:{model_name}", lambda: load_quantized_bart(model_name))
+    else:
+        model = model_registry.get(f"bart:{model_name}", load_model)
+    return tokenizer, model, device
+
+
+def get_detoxify(variant: str = DEFAULT_DETOXIFY_VARIANT):
+    """
+    Return a warm Detoxify classifier from the registry.
+
+    Args:
+        variant (str): Detoxify checkpoint name ("original", "unbiased", "multilingual").
+
+    Returns:
+        Detoxify: The loaded classifier.
+    """
+    def load():
+        from detoxify import Detoxify
+        return Detoxify(variant)
+
+    return model_registry.get(f"detoxify:{variant}", load)
@@ -0,0 +1,261 @@
+"""
+preflight.py
+
+Pre-flight budgeting of a summarization request before any model is called.
+
+For every target model the extracted document is measured in that model's
+own tokens — with its real tokenizer where one is cheap to hold (BART, and
+GPT 4.1 when `tiktoken` is installed) and with a calibrated characters-per-
+token estimate otherwise. The count is checked against the model's context
+window together with the prompt and the MAX_SUMMARY_TOKENS completion
+allowance, and the request is routed to a single call, to the chunked
+map-reduce path (`long_document`), or rejected with a precise reason.
+Latency is predicted from the model's recorded throughput (priors until
+history exists) and cost from list prices.
+"""
+
+import functools
+import json
+import logging
+import math
+import os
+import re
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, Optional, Tuple
+
+from long_document import LONG_DOCUMENT_CHUNK_TOKENS, split_sections
+from metrics import estimate_tokens
+from model_registry import DEFAULT_BART_MODEL, get_bart_tokenizer
+from summarization_module import (
+    MAX_SUMMARY_TOKENS,
+    SUMMARIZATION_BACKENDS,
+    UNSUPPORTED_MODEL_MESSAGE,
+    summary_throughput,
+)
+
+try:
+    import tiktoken
+except ImportError:  # Optional: GPT 4.1 then uses the calibrated estimate
+    tiktoken = None
+
+logger = logging.getLogger(__name__)
+
+SINGLE = "single"
+CHUNKED = "chunked"
+REJECTED = "rejected"
+
+# Documents above this many tokens (in the target model's tokens) are rejected
+MAX_DOCUMENT_TOKENS = int(os.getenv("MAX_DOCUMENT_TOKENS", "70000"))
+
+# Documents above this many tokens use the map-reduce path even when they fit
+# the context window (concurrent chunk calls finish sooner than one long call)
+SINGLE_CALL_MAX_TOKENS = int(os.getenv("SINGLE_CALL_MAX_TOKENS", "2000"))
+
+# Smallest map chunk worth using when a context window forces smaller chunks
+MIN_CHUNK_TOKENS = int(os.getenv("MIN_CHUNK_TOKENS", "500"))
+
+# RunPod serverless bills GPU time rather than tokens
+RUNPOD_USD_PER_SECOND = float(os.getenv("RUNPOD_USD_PER_SECOND", "0.00044"))
+
+
+@dataclass(frozen=True)
+class ModelProfile:
+    """Static budgeting facts of one summarization model."""
+    context_window: int                 # Prompt + completion tokens per call
+    chars_per_token: float              # Calibrated estimate when no tokenizer is used
+    prior_tokens_per_second: float      # Output speed assumed until throughput history exists
+    usd_per_million_input: float = 0.0
+    usd_per_million_output: float = 0.0
+    usd_per_second: float = 0.0         # Time-billed deployments (RunPod)
+    tokenizer: Optional[str] = None     # "bart" or "tiktoken:<encoding>"
+
+
+# Per-model profiles keyed like SUMMARIZATION_BACKENDS. RunPod context windows
+# depend on the deployment (vLLM max_model_len); override any window with
+# CONTEXT_WINDOW_<MODEL> (e.g. CONTEXT_WINDOW_LLAMA_3_1=32768).
+MODEL_PROFILES = {
+    "GPT 4.1": ModelProfile(1_047_576, 4.0, 80, 2.00, 8.00, tokenizer="tiktoken:o200k_base"),
+    "Sonnet 3.7": ModelProfile(200_000, 3.5, 60, 3.00, 15.00),
+    "Bart": ModelProfile(1024, 4.2, 15, tokenizer="bart"),
+    "Mistral small 3": ModelProfile(32_768, 3.6, 120, 0.10, 0.30),
+    "Gemini 2.5 Pro": ModelProfile(1_048_576, 4.0, 70, 1.25, 10.00),
+    "DeepSeek-R1": ModelProfile(16_384, 3.9, 50, usd_per_second=RUNPOD_USD_PER_SECOND),
+    "Llama 3.1": ModelProfile(8192, 4.0, 60, usd_per_second=RUNPOD_USD_PER_SECOND),
+    "Grok 3": ModelProfile(131_072, 4.0, 60, 3.00, 15.00),
+}
+
+
+@dataclass
+class PreflightPlan:
+    """Routing decision and predictions for one document and model."""
+    model: str
+    route: str
+    reason: str
+    input_tokens: int = 0
+    token_count_method: str = ""
+    context_window: int = 0
+    prompt_overhead_tokens: int = 0
+    chunk_tokens: Optional[int] = None
+    calls: int = 0
+    predicted_latency_seconds: Optional[Dict[str, Any]] = None
+    predicted_cost_usd: Optional[float] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def context_window(model_name: str) -> int:
+    """Context window of *model_name* (CONTEXT_WINDOW_<MODEL> overrides the profile)."""
+    variable = "CONTEXT_WINDOW_" + re.sub(r"[^A-Z0-9]+", "_", model_name.upper()).strip("_")
+    return int(os.getenv(variable, MODEL_PROFILES[model_name].context_window))
+
+
+@functools.lru_cache(maxsize=None)
+def _tiktoken_encoding(name: str):
+    return tiktoken.get_encoding(name)
+
+
+def count_tokens(model_name: str, text: str) -> Tuple[int, str]:
+    """
+    Count *text* in *model_name*'s tokens.
+
+    Returns:
+        tuple: (token count, method) where method is "tokenizer" or "estimate".
+    """
+    profile = MODEL_PROFILES[model_name]
+    if profile.tokenizer == "bart":
+        tokenizer = get_bart_tokenizer(DEFAULT_BART_MODEL)
+        return len(tokenizer(text, add_special_tokens=True, verbose=False)["input_ids"]), "tokenizer"
+    if profile.tokenizer and profile.tokenizer.startswith("tiktoken:") and tiktoken is not None:
+        encoding = _tiktoken_encoding(profile.tokenizer.split(":", 1)[1])
+        return len(encoding.encode(text, disallowed_special=())), "tokenizer"
+    return (math.ceil(len(text) / profile.chars_per_token) if text else 0), "estimate"
+
+
+@functools.lru_cache(maxsize=None)
+def prompt_overhead_tokens(model_name: str) -> int:
+    """Tokens the request adds around the document (system prompt and payload, measured empty)."""
+    backend = SUMMARIZATION_BACKENDS[model_name]
+    if backend.provider == "local":
+        return 0
+    return count_tokens(model_name, json.dumps(backend.generation_params()))[0]
+
+
+def _expected_output_tokens(model_name: str) -> int:
+    mean = summary_throughput.mean_output_tokens(model_name)
+    return min(MAX_SUMMARY_TOKENS, round(mean)) if mean else MAX_SUMMARY_TOKENS
+
+
+def predict_call_seconds(model_name: str, input_tokens: int, output_tokens: int) -> Dict[str, Any]:
+    """
+    Predict one call's latency (*input_tokens* in `estimate_tokens` units).
+
+    Uses the recorded throughput of *model_name* when available, otherwise
+    the profile's prior output speed (p90 assumed twice the p50).
+    """
+    predicted = summary_throughput.predict(model_name, input_tokens, output_tokens)
+    if predicted is not None:
+        return dict(predicted, source="history", samples=summary_throughput.samples(model_name))
+    work = output_tokens + input_tokens / summary_throughput.INPUT_TOKEN_SPEEDUP
+    p50 = work / MODEL_PROFILES[model_name].prior_tokens_per_second
+    return {"p50": p50, "p90": 2 * p50, "source": "prior", "samples": 0}
+
+
+def _call_cost(profile: ModelProfile, input_tokens: int, output_tokens: int, seconds: float) -> float:
+    return (input_tokens * profile.usd_per_million_input / 1e6
+            + output_tokens * profile.usd_per_million_output / 1e6
+            + seconds * profile.usd_per_second)
+
+
+def plan_summary(text: str, model_name: str, max_document_tokens: int = MAX_DOCUMENT_TOKENS,
+                 single_call_max_tokens: int = SINGLE_CALL_MAX_TOKENS,
+                 chunk_tokens: int = LONG_DOCUMENT_CHUNK_TOKENS) -> PreflightPlan:
+    """
+    Decide how (and whether) *text* is summarized by *model_name*.
+
+    Blocking (the BART tokenizer runs over the whole text); call through
+    `asyncio.to_thread` from async code.
+
+    Args:
+        text (str): The extracted document text.
+        model_name (str): A key of `SUMMARIZATION_BACKENDS`.
+        max_document_tokens (int): Hard limit in the model's tokens.
+        single_call_max_tokens (int): Largest document sent in one call.
+        chunk_tokens (int): Preferred map chunk size (`estimate_tokens` units).
+
+    Returns:
+        PreflightPlan: Route ("single", "chunked" or "rejected"), the reason,
+            token counts, number of model calls and predicted latency and cost.
+    """
+    backend = SUMMARIZATION_BACKENDS.get(model_name)
+    if backend is None or model_name not in MODEL_PROFILES:
+        return PreflightPlan(model_name, REJECTED, UNSUPPORTED_MODEL_MESSAGE)
+
+    profile = MODEL_PROFILES[model_name]
+    tokens, method = count_tokens(model_name, text)
+    window = context_window(model_name)
+    overhead = prompt_overhead_tokens(model_name)
+    plan = PreflightPlan(model_name, SINGLE, "", input_tokens=tokens, token_count_method=method,
+                         context_window=window, prompt_overhead_tokens=overhead)
+    if tokens > max_document_tokens:
+        plan.route = REJECTED
+        plan.reason = (f"Document is {tokens} tokens for {model_name}, above the {max_document_tokens}-token limit. "
+                       "Please contact the administrator to increase the limit.")
+        return plan
+
+    estimated = estimate_tokens(text)
+    output_tokens = _expected_output_tokens(model_name)
+    budget = window - overhead - MAX_SUMMARY_TOKENS
+
+    # Local BART chunks long inputs itself: always one (possibly long) call
+    if backend.provider == "local" or tokens <= min(budget, single_call_max_tokens):
+        if tokens <= budget or (backend.provider == "local" and tokens <= window):
+            plan.reason = "fits in one call"
+        else:
+            plan.reason = f"{tokens} tokens exceed the {window}-token input window; {model_name} chunks internally"
+        plan.calls = 1
+        plan.predicted_latency_seconds = predict_call_seconds(model_name, estimated, output_tokens)
+        plan.predicted_cost_usd = _call_cost(profile, tokens + overhead, output_tokens,
+                                             plan.predicted_latency_seconds["p50"])
+        return plan
+
+    # Map chunks must fit the window in this model's tokens
+    ratio = tokens / max(1, estimated)
+    chunk_tokens = min(chunk_tokens, int(budget / ratio))
+    if chunk_tokens < MIN_CHUNK_TOKENS:
+        plan.route = REJECTED
+        plan.reason = (f"Document is {tokens} tokens; the {window}-token context window of {model_name} "
+                       f"leaves no room for chunks of at least {MIN_CHUNK_TOKENS} tokens after the prompt "
+                       f"and the {MAX_SUMMARY_TOKENS}-token summary allowance.")
+        return plan
+
+    plan.route = CHUNKED
+    plan.chunk_tokens = chunk_tokens
+    plan.reason = (f"{tokens} tokens exceed the {budget}-token single-call budget of the {window}-token context window"
+                   if tokens > budget else f"{tokens} tokens are above the {single_call_max_tokens}-token single-call threshold")
+
+    # Same tree as `asummarize_long_document`: concurrent map, then reduce levels
+    chunks = len(split_sections(text, chunk_tokens))
+    per_group = max(2, max(chunk_tokens, 2 * MAX_SUMMARY_TOKENS) // max(1, output_tokens))
+    remaining, reduce_calls, levels = chunks, 0, 0
+    while remaining > 1:
+        remaining = math.ceil(remaining / per_group)
+        reduce_calls += remaining
+        levels += 1
+    plan.calls = chunks + reduce_calls
+
+    map_call = predict_call_seconds(model_name, min(estimated, chunk_tokens), output_tokens)
+    reduce_call = predict_call_seconds(model_name, per_group * output_tokens, output_tokens)
+    plan.predicted_latency_seconds = {
+        "p50": map_call["p50"] + levels * reduce_call["p50"],
+        "p90": map_call["p90"] + levels * reduce_call["p90"],
+        "source": map_call["source"],
+        "samples": map_call["samples"],
+        "reduce_levels": levels,
+    }
+    plan.predicted_cost_usd = (
+        _call_cost(profile, round(tokens / chunks) + overhead, output_tokens, map_call["p50"]) * chunks
+        + _call_cost(profile, round(per_group * output_tokens * ratio) + overhead, output_tokens,
+                     reduce_call["p50"]) * reduce_calls
+    )
+    return plan
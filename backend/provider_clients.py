@@ -0,0 +1,351 @@
+"""
+provider_clients.py
+
+Process-wide registry of LLM provider clients shared by the summarization and
+evaluation modules.
+
+Every SDK client (OpenAI, xAI/Grok, Anthropic, Mistral, Gemini) and the HTTP
+session used for the RunPod endpoints is created once on first use and then
+reused (the asyncio variants are bound to the serving event loop), so
+requests ride on pooled keep-alive connections instead of paying a fresh TLS
+handshake per summary. Pool sizes, timeouts and base URLs are configurable per
+provider through environment variables, and per-provider request/connection
+counters show how often connections are actually reused.
+"""
+
+import logging
+import os
+import threading
+from typing import Any, Callable, Dict, List
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+# Supported providers (used as keys for configuration and statistics)
+PROVIDERS = ("openai", "xai", "anthropic", "mistral", "gemini", "runpod")
+
+# Default connection-pool and timeout settings shared by all providers
+DEFAULT_POOL_MAXSIZE = 20        # Maximum simultaneous connections per provider
+DEFAULT_POOL_KEEPALIVE = 10      # Idle keep-alive connections retained per provider
+DEFAULT_TIMEOUT_SECONDS = 120.0  # Total read timeout per request
+DEFAULT_CONNECT_TIMEOUT_SECONDS = 10.0
+
+
+def provider_setting(provider: str, name: str, default: float) -> float:
+    """
+    Read a numeric setting for *provider* from the environment.
+
+    `<PROVIDER>_<NAME>` (e.g. `RUNPOD_TIMEOUT_SECONDS`) takes precedence over
+    the global `PROVIDER_<NAME>` (e.g. `PROVIDER_TIMEOUT_SECONDS`).
+
+    Args:
+        provider (str): Provider key, e.g. "openai".
+        name (str): Setting name, e.g. "POOL_MAXSIZE".
+        default (float): Value used when neither variable is set.
+
+    Returns:
+        float: The configured value.
+    """
+    value = os.getenv(f"{provider.upper()}_{name}") or os.getenv(f"PROVIDER_{name}")
+    return float(value) if value else default
+
+
+# Default API roots per provider and the path each SDK expects after the root
+DEFAULT_BASE_URLS = {
+    "openai": "https://api.openai.com/v1",
+    "xai": "https://api.x.ai/v1",
+    "anthropic": "https://api.anthropic.com",
+    "mistral": "https://api.mistral.ai",
+    "runpod": "https://api.runpod.ai",
+}
+BASE_URL_SUFFIXES = {"openai": "/v1", "xai": "/v1"}
+
+
+def provider_base_url(provider: str) -> str:
+    """
+    Return the API base URL for *provider*.
+
+    `<PROVIDER>_BASE_URL` (e.g. `RUNPOD_BASE_URL`) is used verbatim. Otherwise
+    `PROVIDER_BASE_URL` — typically a local mock server (see mock_provider.py)
+    that speaks every wire format — is used with the SDK-specific path
+    suffix. Without either, the vendor's public endpoint is returned.
+    """
+    specific = os.getenv(f"{provider.upper()}_BASE_URL")
+    if specific:
+        return specific.rstrip("/")
+    shared = os.getenv("PROVIDER_BASE_URL")
+    if shared:
+        return shared.rstrip("/") + BASE_URL_SUFFIXES.get(provider, "")
+    return DEFAULT_BASE_URLS[provider]
+
+
+class ConnectionStats:
+    """Thread-safe request and connection counters for one provider."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.connections_opened = 0
+
+    def record_request(self) -> None:
+        with self._lock:
+            self.requests += 1
+
+    def record_connection(self) -> None:
+        with self._lock:
+            self.connections_opened += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return the counters plus the share of requests served on a reused connection."""
+        with self._lock:
+            reused = max(0, self.requests - self.connections_opened)
+            return {
+                "requests": self.requests,
+                "connections_opened": self.connections_opened,
+                "reused_requests": reused,
+                "reuse_ratio": reused / self.requests if self.requests else None,
+            }
+
+
+class ProviderRegistry:
+    """Lazily creates, caches and reports on one client per provider."""
+
+    def __init__(self):
+        self._clients: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+        self.stats: Dict[str, ConnectionStats] = {name: ConnectionStats() for name in PROVIDERS}
+        # Callbacks `(provider, status_code, headers)` run for every HTTP response (e.g. rate limiting)
+        self.response_observers: List[Callable[[str, int, Any], None]] = []
+
+    def _observe_response(self, provider: str, response) -> None:
+        for observer in self.response_observers:
+            observer(provider, response.status_code, response.headers)
+
+    def get(self, key: str, factory: Callable[[], Any]) -> Any:
+        """
+        Return the client cached under *key*, building it with *factory* on first use.
+
+        Args:
+            key (str): Cache key (usually the provider name).
+            factory (Callable): Zero-argument function creating the client.
+        """
+        client = self._clients.get(key)
+        if client is not None:
+            return client
+        with self._lock:
+            if key not in self._clients:
+                logger.info(f"Creating pooled client for '{key}'")
+                self._clients[key] = factory()
+            return self._clients[key]
+
+    def timeout(self, provider: str) -> httpx.Timeout:
+        """Build the httpx timeout configured for *provider*."""
+        return httpx.Timeout(
+            provider_setting(provider, "TIMEOUT_SECONDS", DEFAULT_TIMEOUT_SECONDS),
+            connect=provider_setting(provider, "CONNECT_TIMEOUT_SECONDS", DEFAULT_CONNECT_TIMEOUT_SECONDS),
+        )
+
+    def limits(self, provider: str) -> httpx.Limits:
+        """Build the httpx connection-pool limits configured for *provider*."""
+        return httpx.Limits(
+            max_connections=int(provider_setting(provider, "POOL_MAXSIZE", DEFAULT_POOL_MAXSIZE)),
+            max_keepalive_connections=int(provider_setting(provider, "POOL_KEEPALIVE", DEFAULT_POOL_KEEPALIVE)),
+        )
+
+    def http_client(self, provider: str, headers: Dict[str, str] = None) -> httpx.Client:
+        """
+        Build a pooled httpx client for *provider* that feeds its connection stats.
+
+        New TCP connections are detected through httpcore's trace extension,
+        every outgoing request and incoming response through httpx event hooks.
+        """
+        stats = self.stats[provider]
+
+        def trace(event_name, info):
+            if event_name == "connection.connect_tcp.complete":
+                stats.record_connection()
+
+        def on_request(request):
+            stats.record_request()
+            request.extensions["trace"] = trace
+
+        def on_response(response):
+            self._observe_response(provider, response)
+
+        return httpx.Client(
+            limits=self.limits(provider),
+            timeout=self.timeout(provider),
+            headers=headers,
+            event_hooks={"request": [on_request], "response": [on_response]},
+        )
+
+    def async_http_client(self, provider: str, headers: Dict[str, str] = None) -> httpx.AsyncClient:
+        """Asyncio counterpart of `http_client` (same limits, timeouts and stats)."""
+        stats = self.stats[provider]
+
+        async def trace(event_name, info):
+            if event_name == "connection.connect_tcp.complete":
+                stats.record_connection()
+
+        async def on_request(request):
+            stats.record_request()
+            request.extensions["trace"] = trace
+
+        async def on_response(response):
+            self._observe_response(provider, response)
+
+        return httpx.AsyncClient(
+            limits=self.limits(provider),
+            timeout=self.timeout(provider),
+            headers=headers,
+            event_hooks={"request": [on_request], "response": [on_response]},
+        )
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return per-provider connection reuse statistics."""
+        result = {name: stats.snapshot() for name, stats in self.stats.items()}
+        session = self._clients.get("runpod")
+        if session is not None:
+            # The sync RunPod session is plain requests; urllib3 keeps its own counters per host pool
+            runpod = result["runpod"]
+            for adapter in session.adapters.values():
+                pools = adapter.poolmanager.pools
+                for key in pools.keys():
+                    runpod["connections_opened"] += pools[key].num_connections
+                    runpod["requests"] += pools[key].num_requests
+            runpod["reused_requests"] = max(0, runpod["requests"] - runpod["connections_opened"])
+            runpod["reuse_ratio"] = (runpod["reused_requests"] / runpod["requests"]
+                                     if runpod["requests"] else None)
+        for name in result:
+            result[name]["client_created"] = any(key.split("-")[0] == name for key in self._clients)
+        return result
+
+
+# Shared registry instance used by every module in the process
+provider_registry = ProviderRegistry()
+
+
+def get_openai_client():
+    """Return the shared OpenAI client (GPT-4.1)."""
+    from openai import OpenAI
+    return provider_registry.get("openai", lambda: OpenAI(
+        api_key=os.getenv("OPENAI_API_KEY"),
+        base_url=provider_base_url("openai"),
+        http_client=provider_registry.http_client("openai"),
+    ))
+
+
+def get_async_openai_client():
+    """Return the shared asyncio OpenAI client (GPT-4.1)."""
+    from openai import AsyncOpenAI
+    return provider_registry.get("openai-async", lambda: AsyncOpenAI(
+        api_key=os.getenv("OPENAI_API_KEY"),
+        base_url=provider_base_url("openai"),
+        http_client=provider_registry.async_http_client("openai"),
+    ))
+
+
+def get_xai_client():
+    """Return the shared OpenAI-compatible client for xAI (Grok)."""
+    from openai import OpenAI
+    return provider_registry.get("xai", lambda: OpenAI(
+        api_key=os.getenv("XAI_API_KEY"),
+        base_url=provider_base_url("xai"),
+        http_client=provider_registry.http_client("xai"),
+    ))
+
+
+def get_async_xai_client():
+    """Return the shared asyncio OpenAI-compatible client for xAI (Grok)."""
+    from openai import AsyncOpenAI
+    return provider_registry.get("xai-async", lambda: AsyncOpenAI(
+        api_key=os.getenv("XAI_API_KEY"),
+        base_url=provider_base_url("xai"),
+        http_client=provider_registry.async_http_client("xai"),
+    ))
+
+
+def get_anthropic_client():
+    """Return the shared Anthropic client (Claude Sonnet)."""
+    import anthropic
+    return provider_registry.get("anthropic", lambda: anthropic.Anthropic(
+        api_key=os.getenv("ANTHROPIC_API_KEY"),
+        base_url=provider_base_url("anthropic"),
+        http_client=provider_registry.http_client("anthropic"),
+    ))
+
+
+def get_async_anthropic_client():
+    """Return the shared asyncio Anthropic client (Claude Sonnet)."""
+    import anthropic
+    return provider_registry.get("anthropic-async", lambda: anthropic.AsyncAnthropic(
+        api_key=os.getenv("ANTHROPIC_API_KEY"),
+        base_url=provider_base_url("anthropic"),
+        http_client=provider_registry.async_http_client("anthropic"),
+    ))
+
+
+def get_mistral_client():
+    """
+    Return the shared Mistral client (summarization and the evaluation judge).
+
+    The same instance serves blocking calls (`chat.complete`) and asyncio
+    calls (`chat.complete_async`), each on its own connection pool.
+    """
+    from mistralai import Mistral
+    return provider_registry.get("mistral", lambda: Mistral(
+        api_key=os.getenv("MISTRAL_API_KEY"),
+        server_url=provider_base_url("mistral"),
+        client=provider_registry.http_client("mistral"),
+        async_client=provider_registry.async_http_client("mistral"),
+        timeout_ms=int(provider_setting("mistral", "TIMEOUT_SECONDS", DEFAULT_TIMEOUT_SECONDS) * 1000),
+    ))
+
+
+def get_gemini_model(model_name: str):
+    """
+    Return a shared Gemini model handle.
+
+    `genai.configure` is called once per process; the handle keeps its gRPC
+    channel open between requests.
+    """
+    import google.generativeai as genai
+
+    def configure():
+        genai.configure(api_key=os.getenv("GOOGLE_GENAI_API_KEY"))
+        return genai
+
+    provider_registry.get("gemini", configure)
+    return provider_registry.get(f"gemini:{model_name}", lambda: genai.GenerativeModel(model_name))
+
+
+def get_runpod_session() -> requests.Session:
+    """Return the shared keep-alive HTTP session for the RunPod endpoints."""
+    def create():
+        pool_maxsize = int(provider_setting("runpod", "POOL_MAXSIZE", DEFAULT_POOL_MAXSIZE))
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_maxsize)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        session.headers["Authorization"] = f"Bearer {os.getenv('RUNPOD_API_KEY')}"
+        return session
+
+    return provider_registry.get("runpod", create)
+
+
+def get_async_runpod_client() -> httpx.AsyncClient:
+    """Return the shared asyncio HTTP client for the RunPod endpoints."""
+    return provider_registry.get("runpod-async", lambda: provider_registry.async_http_client(
+        "runpod", headers={"Authorization": f"Bearer {os.getenv('RUNPOD_API_KEY')}"}
+    ))
+
+
+def runpod_timeout():
+    """Return the (connect, read) timeout tuple for RunPod requests."""
+    return (
+        provider_setting("runpod", "CONNECT_TIMEOUT_SECONDS", DEFAULT_CONNECT_TIMEOUT_SECONDS),
+        provider_setting("runpod", "TIMEOUT_SECONDS", DEFAULT_TIMEOUT_SECONDS),
+    )
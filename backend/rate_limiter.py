@@ -0,0 +1,210 @@
+"""
+rate_limiter.py
+
+Client-side rate limiting in front of every LLM provider.
+
+Each provider gets a `ProviderLimiter` enforcing requests-per-minute and
+tokens-per-minute with token buckets plus a cap on concurrent in-flight
+requests, so bursts of uploads queue locally instead of being rejected with
+429s upstream. Token cost is estimated from the prompt length plus the
+completion budget. `Retry-After` headers seen on 429/503 responses pause the
+provider's queue for the requested time. Queue depth, wait times and throttle
+counts are exposed per provider.
+
+Limits are read per provider through `provider_setting` (e.g. `OPENAI_RPM`,
+`ANTHROPIC_TPM`, `MISTRAL_MAX_IN_FLIGHT`, or `PROVIDER_RPM` for all); 0
+disables a limit.
+"""
+
+import asyncio
+import email.utils
+import logging
+import threading
+import time
+from contextlib import asynccontextmanager
+from typing import Any, Dict, Optional
+
+from metrics import RollingStats
+from provider_clients import PROVIDERS, provider_registry, provider_setting
+
+logger = logging.getLogger(__name__)
+
+# Default limits applied to every provider unless overridden
+DEFAULT_RPM = 500
+DEFAULT_TPM = 200_000
+DEFAULT_MAX_IN_FLIGHT = 16
+
+
+class TokenBucket:
+    """Classic token bucket refilled continuously at `rate_per_minute / 60` per second."""
+
+    def __init__(self, rate_per_minute: float):
+        self.capacity = float(rate_per_minute)
+        self.tokens = self.capacity
+        self.refill_per_second = self.capacity / 60.0
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.refill_per_second)
+        self.updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """Seconds until *amount* tokens are available (0 if they are now)."""
+        if not self.capacity:
+            return 0.0
+        self._refill(now)
+        amount = min(amount, self.capacity)  # Oversized requests wait for a full bucket, not forever
+        return max(0.0, (amount - self.tokens) / self.refill_per_second)
+
+    def consume(self, amount: float) -> None:
+        if self.capacity:
+            self.tokens -= min(amount, self.capacity)
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Parse a `Retry-After` header (delay in seconds or an HTTP date).
+
+    Returns:
+        float | None: Seconds to wait, or None if the header is missing or invalid.
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
+
+
+class ProviderLimiter:
+    """RPM/TPM token buckets plus an in-flight cap for one provider."""
+
+    def __init__(self, provider: str):
+        self.provider = provider
+        self.rpm = TokenBucket(provider_setting(provider, "RPM", DEFAULT_RPM))
+        self.tpm = TokenBucket(provider_setting(provider, "TPM", DEFAULT_TPM))
+        self.max_in_flight = int(provider_setting(provider, "MAX_IN_FLIGHT", DEFAULT_MAX_IN_FLIGHT))
+        self._lock = threading.Lock()
+        self._condition: Optional[asyncio.Condition] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.blocked_until = 0.0  # monotonic time before which no request is sent (Retry-After)
+        self.in_flight = 0
+        self.queued = 0
+        self.max_queue_depth = 0
+        self.requests = 0
+        self.throttled = 0  # 429/503 responses received despite local limiting
+        self.wait_seconds = RollingStats()
+
+    def _next_start_delay(self, tokens: float) -> float:
+        """Seconds until a request costing *tokens* may start (0 = now). Called under `_lock`."""
+        now = time.monotonic()
+        if self.max_in_flight and self.in_flight >= self.max_in_flight:
+            return float("inf")  # Woken up by `release`
+        return max(self.blocked_until - now, self.rpm.wait_time(1, now), self.tpm.wait_time(tokens, now))
+
+    async def acquire(self, tokens: float) -> None:
+        """Wait (in FIFO-ish order) until a request costing *tokens* may be sent."""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # asyncio primitives are bound to the loop that first uses them
+            self._condition, self._loop = asyncio.Condition(), loop
+        started = time.perf_counter()
+        with self._lock:
+            self.queued += 1
+            self.max_queue_depth = max(self.max_queue_depth, self.queued)
+        try:
+            async with self._condition:
+                while True:
+                    with self._lock:
+                        delay = self._next_start_delay(tokens)
+                        if delay <= 0:
+                            self.rpm.consume(1)
+                            self.tpm.consume(tokens)
+                            self.in_flight += 1
+                            self.requests += 1
+                            break
+                    try:
+                        await asyncio.wait_for(self._condition.wait(),
+                                               timeout=None if delay == float("inf") else delay)
+                    except asyncio.TimeoutError:
+                        pass
+        finally:
+            with self._lock:
+                self.queued -= 1
+        self.wait_seconds.record(time.perf_counter() - started)
+
+    async def release(self) -> None:
+        """Mark one in-flight request as finished and wake up waiters."""
+        with self._lock:
+            self.in_flight -= 1
+        async with self._condition:
+            self._condition.notify_all()
+
+    def defer(self, seconds: float) -> None:
+        """Pause new requests for *seconds* (called when a `Retry-After` header arrives)."""
+        with self._lock:
+            self.throttled += 1
+            self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+        logger.warning(f"{self.provider}: throttled upstream, pausing requests for {seconds:.1f}s")
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "rpm_limit": self.rpm.capacity or None,
+                "tpm_limit": self.tpm.capacity or None,
+                "max_in_flight": self.max_in_flight or None,
+                "in_flight": self.in_flight,
+                "queue_depth": self.queued,
+                "max_queue_depth": self.max_queue_depth,
+                "requests": self.requests,
+                "throttled_upstream": self.throttled,
+                "paused_for_seconds": max(0.0, self.blocked_until - time.monotonic()),
+                "wait_seconds": self.wait_seconds.summary(),
+            }
+
+
+class RateLimits:
+    """One `ProviderLimiter` per provider."""
+
+    def __init__(self):
+        self.limiters: Dict[str, ProviderLimiter] = {name: ProviderLimiter(name) for name in PROVIDERS}
+
+    @asynccontextmanager
+    async def limit(self, provider: str, tokens: float):
+        """
+        Hold a rate-limit slot of *provider* for the duration of the block.
+
+        Args:
+            provider (str): Provider key; unknown keys (e.g. "local") are not limited.
+            tokens (float): Estimated tokens of the request (prompt + completion budget).
+        """
+        limiter = self.limiters.get(provider)
+        if limiter is None:
+            yield
+            return
+        await limiter.acquire(tokens)
+        try:
+            yield
+        finally:
+            await limiter.release()
+
+    def observe_response(self, provider: str, status_code: int, headers) -> None:
+        """Honor `Retry-After` on throttling responses (wired into the provider HTTP clients)."""
+        if status_code not in (429, 503) or provider not in self.limiters:
+            return
+        delay = parse_retry_after(headers.get("retry-after"))
+        self.limiters[provider].defer(delay if delay is not None else 1.0)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return queue depth, wait times and limits per provider."""
+        return {name: limiter.snapshot() for name, limiter in self.limiters.items()}
+
+
+# Shared limiter registry used by the summarization and evaluation modules
+rate_limits = RateLimits()
+provider_registry.response_observers.append(rate_limits.observe_response)
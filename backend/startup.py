@@ -0,0 +1,170 @@
+"""
+startup.py
+
+Fast-startup support: an import-time report and background model warm-up.
+
+`startup_report` times the application's imports by top-level package
+(self time, so `torch` is not charged to the module that imported it) and
+the named startup phases, and logs the breakdown once the server is up.
+Heavy local models are no longer loaded at import: `ModelWarmup` loads the
+WARMUP_MODELS on the inference executor (or in every inference worker
+process) after the server is listening and tracks each one's state, which
+backs the /readyz endpoint while /healthz only reports that the process is
+alive.
+"""
+
+import asyncio
+import builtins
+import logging
+import os
+import sys
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Optional
+
+from inference_workers import inference_pool
+from model_registry import (
+    DEFAULT_BART_MODEL,
+    DEFAULT_DETOXIFY_VARIANT,
+    get_bart,
+    get_bart_tokenizer,
+    get_detoxify,
+    run_inference,
+)
+
+logger = logging.getLogger(__name__)
+
+# Local models loaded in the background after startup, in order; the service
+# reports ready once all of them are loaded ("" disables warm-up)
+WARMUP_MODELS = [name.strip() for name in os.getenv("WARMUP_MODELS", "detoxify").split(",") if name.strip()]
+
+# Import entries listed in the startup report
+STARTUP_REPORT_TOP = int(os.getenv("STARTUP_REPORT_TOP", "15"))
+
+# Loaders available to WARMUP_MODELS
+WARMUP_LOADERS: Dict[str, Callable[[], Any]] = {
+    "detoxify": lambda: get_detoxify(DEFAULT_DETOXIFY_VARIANT),
+    "bart_tokenizer": lambda: get_bart_tokenizer(DEFAULT_BART_MODEL),
+    "bart": lambda: get_bart(DEFAULT_BART_MODEL),
+}
+
+PENDING = "pending"
+LOADING = "loading"
+READY = "ready"
+FAILED = "failed"
+
+
+class StartupReport:
+    """Import-time breakdown and durations of the startup phases."""
+
+    def __init__(self):
+        self.imports: Dict[str, float] = defaultdict(float)
+        self.phases: Dict[str, float] = {}
+        self._original_import = None
+        self._import_started = 0.0
+        self._stack: List[float] = []
+
+    def _timed_import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        """`__import__` replacement charging first-time imports to their top-level package."""
+        if level or name in sys.modules:
+            return self._original_import(name, globals, locals, fromlist, level)
+        self._stack.append(0.0)
+        started = time.perf_counter()
+        try:
+            return self._original_import(name, globals, locals, fromlist, level)
+        finally:
+            elapsed = time.perf_counter() - started
+            nested = self._stack.pop()
+            self.imports[name.partition(".")[0]] += elapsed - nested
+            if self._stack:
+                self._stack[-1] += elapsed
+
+    def start_import_timing(self) -> None:
+        """Start timing imports (call before the application's imports)."""
+        if self._original_import is None:
+            self._original_import = builtins.__import__
+            self._import_started = time.perf_counter()
+            builtins.__import__ = self._timed_import
+
+    def stop_import_timing(self) -> None:
+        """Stop timing imports and record the total as the "imports" phase."""
+        if self._original_import is not None:
+            builtins.__import__ = self._original_import
+            self._original_import = None
+            self.phases["imports"] = time.perf_counter() - self._import_started
+
+    @contextmanager
+    def phase(self, name: str):
+        """Record how long the enclosed startup step takes."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = time.perf_counter() - started
+
+    def snapshot(self, top: int = STARTUP_REPORT_TOP) -> Dict[str, Any]:
+        slowest = sorted(self.imports.items(), key=lambda item: item[1], reverse=True)[:top]
+        return {
+            "phases_seconds": dict(self.phases),
+            "slowest_imports_seconds": dict(slowest),
+            "imported_packages": len(self.imports),
+        }
+
+    def log(self) -> None:
+        report = self.snapshot()
+        phases = ", ".join(f"{name} {seconds:.2f}s" for name, seconds in report["phases_seconds"].items())
+        imports = ", ".join(f"{name} {seconds:.2f}s" for name, seconds in report["slowest_imports_seconds"].items())
+        logger.info(f"Startup: {phases}; slowest imports: {imports}")
+
+
+# Process-wide report, filled by main.py during startup
+startup_report = StartupReport()
+
+
+class ModelWarmup:
+    """Loads local models in the background and tracks their readiness."""
+
+    def __init__(self, models: List[str] = None):
+        """
+        Args:
+            models (list[str]): Keys of WARMUP_LOADERS to load, in order
+                (default WARMUP_MODELS).
+        """
+        models = WARMUP_MODELS if models is None else models
+        unknown = [name for name in models if name not in WARMUP_LOADERS]
+        if unknown:
+            logger.warning(f"Ignoring unknown WARMUP_MODELS entries: {', '.join(unknown)}")
+        self.models = [name for name in models if name in WARMUP_LOADERS]
+        self.status: Dict[str, Dict[str, Any]] = {name: {"status": PENDING} for name in self.models}
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        """Start loading in the background (on the running loop)."""
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def _run(self) -> None:
+        for name in self.models:
+            self.status[name] = {"status": LOADING}
+            started = time.perf_counter()
+            try:
+                if inference_pool.enabled:
+                    await inference_pool.warm(name)
+                else:
+                    await run_inference(WARMUP_LOADERS[name])
+            except Exception as e:
+                logger.error(f"Warm-up of {name} failed: {e}")
+                self.status[name] = {"status": FAILED, "detail": f"Error: {e}"}
+            else:
+                self.status[name] = {"status": READY}
+            seconds = time.perf_counter() - started
+            self.status[name]["seconds"] = seconds
+            startup_report.phases[f"warmup:{name}"] = seconds
+        startup_report.log()
+
+    def ready(self) -> bool:
+        return all(entry["status"] == READY for entry in self.status.values())
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {"ready": self.ready(), "models": {name: dict(entry) for name, entry in self.status.items()}}
@@ -0,0 +1,90 @@
+"""
+streaming.py
+
+Helpers for streaming summaries to the client as server-sent events (SSE).
+
+Provides the SSE wire formatting and `StreamMetrics`, which wraps a model's
+token stream to record time-to-first-token and tokens/second per model so
+providers can be compared on perceived latency rather than total time.
+"""
+
+import json
+import time
+from collections import defaultdict
+from typing import Any, AsyncIterator, Dict
+
+from metrics import RollingStats, estimate_tokens
+
+
+def sse_event(event: str, data: Any) -> str:
+    """
+    Format one server-sent event.
+
+    Args:
+        event (str): Event name (e.g. "token", "evaluation").
+        data: JSON-serializable payload.
+
+    Returns:
+        str: The encoded event, terminated by a blank line.
+    """
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+class StreamMetrics:
+    """Per-model time-to-first-token, tokens/second and total stream time."""
+
+    def __init__(self):
+        self.ttft_seconds = defaultdict(RollingStats)
+        self.tokens_per_second = defaultdict(RollingStats)
+        self.total_seconds = defaultdict(RollingStats)
+
+    async def measure(self, model_name: str, pieces: AsyncIterator[str]) -> AsyncIterator[str]:
+        """
+        Pass *pieces* through unchanged while timing the stream.
+
+        Time-to-first-token is measured from the first iteration (i.e. when the
+        provider call is issued) to the first non-empty piece; tokens/second
+        covers the generation phase after the first piece, using the
+        character-based token estimate.
+
+        Args:
+            model_name (str): Model the stream belongs to.
+            pieces (AsyncIterator[str]): The model's text deltas.
+
+        Yields:
+            str: The same text deltas.
+        """
+        started = time.perf_counter()
+        first_piece_at = None
+        parts = []
+
+        async for piece in pieces:
+            if not piece:
+                continue
+            if first_piece_at is None:
+                first_piece_at = time.perf_counter()
+                self.ttft_seconds[model_name].record(first_piece_at - started)
+            parts.append(piece)
+            yield piece
+
+        finished = time.perf_counter()
+        self.total_seconds[model_name].record(finished - started)
+        if first_piece_at is not None and finished > first_piece_at:
+            self.tokens_per_second[model_name].record(
+                estimate_tokens("".join(parts)) / (finished - first_piece_at)
+            )
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return the recorded statistics keyed by model name."""
+        return {
+            model: {
+                "ttft_seconds": self.ttft_seconds[model].summary(),
+                "tokens_per_second": self.tokens_per_second[model].summary(),
+                "total_seconds": self.total_seconds[model].summary(),
+            }
+            for model in list(self.total_seconds)
+        }
+
+
+# Shared metrics recorder for all streaming requests in the process
+stream_metrics = StreamMetrics()
@@ -1,14 +1,53 @@
 import os
 from dotenv import load_dotenv
-from openai import OpenAI
-from transformers import pipeline, AutoTokenizer, AutoModelForSeq2SeqLM, BartTokenizer, BartForConditionalGeneration, PegasusTokenizer, PegasusForConditionalGeneration
-import anthropic
-import torch
 import requests
-import runpod
 import logging
-from mistralai import Mistral
-import google.generativeai as genai
+import asyncio
+import functools
+import inspect
+import json
+import time
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional
+import httpx
+# Provider SDKs, torch and transformers are imported on first use (see
+# `provider_clients` and `model_registry`) to keep startup fast
+
+from model_registry import DEFAULT_BART_MODEL, bart_quantization_enabled, get_bart, run_inference
+from bart_scheduler import (
+    BART_LENGTH_BUCKET_TOKENS,
+    BART_MICRO_BATCHING,
+    BartBatchScheduler,
+    bart_request_executor,
+    length_bucket,
+)
+from cache import TieredCache, content_hash, make_key
+from inference_workers import inference_pool
+from hedging import HedgePolicy, hedger
+from metrics import ThroughputStats, estimate_tokens
+from rate_limiter import rate_limits
+from circuit_breaker import (
+    CIRCUIT_LOCAL_SLOW_CALL_SECONDS,
+    ModelUnavailableError,
+    circuit_breakers,
+    unavailable_message,
+)
+from chunking import TokenChunker
+from extractive import compress_for_model, compression_ratio
+from provider_clients import (
+    get_anthropic_client,
+    get_async_anthropic_client,
+    get_async_openai_client,
+    get_async_runpod_client,
+    get_async_xai_client,
+    get_gemini_model,
+    get_mistral_client,
+    get_openai_client,
+    get_runpod_session,
+    get_xai_client,
+    provider_base_url,
+    runpod_timeout,
+)
 
 # Configure logger
 logging.basicConfig(level=logging.INFO)
@@ -19,7 +58,192 @@ load_dotenv()
 #global cap for all summaries (in tokens)
 MAX_SUMMARY_TOKENS = 650
 
-def summarize_text(text, model_name):
+# Message returned when summarize_text receives an unknown model name
+UNSUPPORTED_MODEL_MESSAGE = (
+    "Error: Unsupported model selected. "
+    "Please choose from GPT 4.1, Sonnet 3.7, Bart, "
+    "Mistral small 3, Gemini 2.5 Pro, DeepSeek-R1, Llama 3.1, or Grok 3."
+)
+
+# Number of BART chunks summarized together in one batched `generate` call (1 = sequential)
+BART_CHUNK_BATCH_SIZE = int(os.getenv("BART_CHUNK_BATCH_SIZE", "4"))
+
+# Version of the summarization prompts; bump whenever a system prompt changes so
+# previously cached summaries are no longer served
+SUMMARY_PROMPT_VERSION = "1"
+
+# Content-addressed summary cache (in-memory LRU + SQLite table in summaries.db)
+SUMMARY_CACHE_ENABLED = os.getenv("SUMMARY_CACHE_ENABLED", "1") != "0"
+
+# Hedged requests for backends with a `HedgePolicy` (asyncio path only). Opt-in:
+# every hedge is an extra billed provider request; set SUMMARY_HEDGING_ENABLED=1 to enable
+SUMMARY_HEDGING_ENABLED = os.getenv("SUMMARY_HEDGING_ENABLED", "0") == "1"
+summary_cache = TieredCache(
+    "summary_cache",
+    max_memory_entries=int(os.getenv("SUMMARY_CACHE_MEMORY_ENTRIES", "256")),
+    ttl_seconds=float(os.getenv("SUMMARY_CACHE_TTL_SECONDS", str(7 * 24 * 3600))),
+    max_disk_bytes=int(float(os.getenv("SUMMARY_CACHE_MAX_MB", "256")) * 1024 * 1024),
+)
+
+# Latency history of successful backend calls (feeds the pre-flight predictions)
+summary_throughput = ThroughputStats()
+
+
+def summary_cache_key(text, model_name, streamed=False):
+    """
+    Build the summary cache key for *text* summarized by *model_name*.
+
+    The key covers the whitespace-normalized document hash, the model, the
+    prompt version, MAX_SUMMARY_TOKENS and the backend's generation parameters
+    (request payload without the document), so any change to one of them
+    produces a fresh summary instead of a stale cached one.
+
+    Args:
+        text (str): The document to summarize.
+        model_name (str): A key of `SUMMARIZATION_BACKENDS`.
+        streamed (bool): Whether the summary comes from the streaming path.
+            Local models decode greedily when streaming, so their streamed
+            summaries are cached separately from the beam-search ones.
+    """
+    backend = SUMMARIZATION_BACKENDS[model_name]
+    params = backend.generation_params()
+    if streamed and backend.provider == "local":
+        params = dict(params, num_beams=1)
+    return make_key(
+        document=content_hash(text),
+        model=model_name,
+        prompt_version=SUMMARY_PROMPT_VERSION,
+        max_summary_tokens=MAX_SUMMARY_TOKENS,
+        params=params,
+    )
+
+
+def _is_cacheable_summary(summary):
+    """Only successful, non-empty summaries are cached (errors are retried next time)."""
+    return isinstance(summary, str) and bool(summary.strip()) and not summary.startswith("Error")
+
+
+def _request_tokens(text):
+    """Token cost charged to the provider's TPM budget: prompt estimate plus the completion cap."""
+    return estimate_tokens(text) + MAX_SUMMARY_TOKENS
+
+
+def _record_outcome(model_name, breaker, text, summary, seconds):
+    """Report a finished call to the breaker and, if it succeeded, to the throughput history."""
+    ok = _is_cacheable_summary(summary)
+    breaker.record(ok, seconds)
+    if ok:
+        summary_throughput.record(model_name, estimate_tokens(text), estimate_tokens(summary), seconds)
+
+
+def _guarded_summarize(model_name, backend, text):
+    """Call `backend.summarize` through the model's circuit breaker (blocking path)."""
+    breaker = circuit_breakers.get(model_name)
+    if not breaker.allow():
+        return unavailable_message(model_name)
+    started = time.perf_counter()
+    try:
+        summary = backend.summarize(text)
+    except Exception:
+        breaker.record(False, time.perf_counter() - started)
+        raise
+    _record_outcome(model_name, breaker, text, summary, time.perf_counter() - started)
+    return summary
+
+
+async def _guarded_asummarize(model_name, backend, text):
+    """
+    Call `backend.asummarize` through the model's circuit breaker and inside
+    its provider's rate-limit slot.
+
+    While the breaker is open this fails fast with the "temporarily
+    unavailable" message. Queueing time in the rate limiter is not counted
+    as backend latency.
+    """
+    breaker = circuit_breakers.get(model_name)
+    if not breaker.allow():
+        return unavailable_message(model_name)
+    started = time.perf_counter()
+    try:
+        async with rate_limits.limit(backend.provider, _request_tokens(text)):
+            started = time.perf_counter()
+            summary = await backend.asummarize(text)
+    except asyncio.CancelledError:
+        breaker.cancel()  # Hedge loser or caller timeout: no verdict on the backend
+        raise
+    except Exception:
+        breaker.record(False, time.perf_counter() - started)
+        raise
+    _record_outcome(model_name, breaker, text, summary, time.perf_counter() - started)
+    return summary
+
+
+async def _guarded_astream(model_name, backend, text):
+    """
+    Stream from `backend.astream` through the model's circuit breaker, holding
+    its provider's rate-limit slot until the stream ends.
+
+    Raises:
+        ModelUnavailableError: If the breaker is open.
+    """
+    breaker = circuit_breakers.get(model_name)
+    if not breaker.allow():
+        raise ModelUnavailableError(unavailable_message(model_name))
+    received = False
+    started = time.perf_counter()
+    try:
+        async with rate_limits.limit(backend.provider, _request_tokens(text)):
+            started = time.perf_counter()
+            async for piece in backend.astream(text):
+                received = received or bool(piece.strip())
+                yield piece
+    except (asyncio.CancelledError, GeneratorExit):
+        breaker.cancel()  # Client went away mid-stream
+        raise
+    except Exception:
+        breaker.record(False, time.perf_counter() - started)
+        raise
+    breaker.record(received, time.perf_counter() - started)
+
+
+async def _arun_backend(model_name, backend, text):
+    """
+    Run *backend* for *text*, hedging per its `HedgePolicy` if it has one.
+
+    Returns:
+        tuple: (summary, served_by_model) — the latter is False when a
+               fallback model answered, so the summary is not cached under
+               *model_name*.
+    """
+    policy = backend.hedge if SUMMARY_HEDGING_ENABLED else None
+    if policy is None:
+        return await _guarded_asummarize(model_name, backend, text), True
+
+    hedge_model = policy.fallback_model or model_name
+    hedge_backend = SUMMARIZATION_BACKENDS[hedge_model]
+    summary, hedge_won = await hedger.call(
+        model_name, policy,
+        primary=lambda: _guarded_asummarize(model_name, backend, text),
+        hedge=lambda: _guarded_asummarize(hedge_model, hedge_backend, text),
+        is_good=_is_cacheable_summary,
+    )
+    return summary, not (hedge_won and policy.fallback_model)
+
+
+def _cached_summary(text, model_name, streamed=False):
+    """Return (key, cached summary or None) for a cache-enabled lookup."""
+    key = summary_cache_key(text, model_name, streamed=streamed)
+    return key, summary_cache.get(key, saved_bytes=len(text.encode("utf-8")))
+
+
+async def _acompress(text, model_name):
+    """Apply the model's extractive pre-compression off the event loop (no-op when disabled)."""
+    if compression_ratio(model_name) >= 1:
+        return text
+    return await asyncio.to_thread(compress_for_model, text, model_name)
+
+
+def summarize_text(text, model_name, use_cache=True):
     """
     Dispatch text summarization to the selected model implementation.
 
@@ -35,78 +259,134 @@ def summarize_text(text, model_name):
               - "DeepSeek-R1"
               - "Llama 3.1"
               - "Grok 3"
+        use_cache (bool): Serve an identical earlier summary from the summary
+            cache. When False the cache is bypassed for the lookup, but the
+            fresh summary still replaces the cached one.
+
+    If the model has an extractive keep ratio below 1 (see `extractive`), the
+    text is pre-compressed first and the compressed text is what the model
+    sees and what the cache key covers.
 
     Returns:
         str: The summary produced by the chosen model function. If an
              unsupported model is passed, returns an error message listing
              valid options.
     """
-    summary = None
-
-    # Select the appropriate summarization backend based on model_name
-    if model_name == "GPT 4.1":
-        # Use OpenAI GPT 4.1 via the OpenAI SDK
-        summary = summarize_with_gpt_4point1(text)
+    backend = SUMMARIZATION_BACKENDS.get(model_name)
+    if backend is None:
+        # Fallback for unsupported model names
+        return UNSUPPORTED_MODEL_MESSAGE
+    text = compress_for_model(text, model_name)
 
-    elif model_name == "Sonnet 3.7":
-        # Use Anthropic Claude Sonnet 3.7 client
-        summary = summarize_with_claude_sonnet_3_7(text)
+    if not SUMMARY_CACHE_ENABLED:
+        return _guarded_summarize(model_name, backend, text)
 
-    elif model_name == "Bart":
-        # Use Hugging Face’s Bart sequence‐to‐sequence model
-        summary = summarize_with_bart(text)
+    if use_cache:
+        key, cached = _cached_summary(text, model_name)
+        if cached is not None:
+            return cached
+    else:
+        key = summary_cache_key(text, model_name)
 
-    elif model_name == "Mistral small 3":
-        # Use Mistral AI’s small model via their Python SDK
-        summary = summarize_with_mistral_small3(text)
+    summary = _guarded_summarize(model_name, backend, text)
+    if _is_cacheable_summary(summary):
+        summary_cache.put(key, summary)
+    return summary
 
-    elif model_name == "Gemini 2.5 Pro":
-        # Use Google’s Gemini 2.5 Pro via google-generativeai
-        summary = summarize_with_gemini2point5_pro(text)
 
-    elif model_name == "DeepSeek-R1":
-        # Use DeepSeek-R1 hosted on RunPod
-        summary = summarize_with_DeepSeek_R1_runpod(text)
+async def asummarize_text(text, model_name, use_cache=True):
+    """
+    Asyncio variant of `summarize_text`.
 
-    elif model_name == "Llama 3.1":
-        # Use RunPod’s Llama-3.1 via the OpenAI-compatible endpoint
-        summary = summarize_with_llama3_point_1(text)
+    Provider calls are awaited on the shared async clients and local models run
+    on the inference executor, so the event loop keeps serving other requests
+    while a summary is being generated.
 
-    elif model_name == "Grok 3":
-        # Use xAI’s Grok 3-latest model via OpenAI-compatible client
-        summary = summarize_with_grok_3(text)
+    Args:
+        text (str): The input report or document to summarize.
+        model_name (str): Identifier of the summarization model to use
+            (see `SUMMARIZATION_BACKENDS`).
+        use_cache (bool): See `summarize_text`.
 
+    Returns:
+        str: The summary, or an error message for unsupported models.
+    """
+    backend = SUMMARIZATION_BACKENDS.get(model_name)
+    if backend is None:
+        return UNSUPPORTED_MODEL_MESSAGE
+    text = await _acompress(text, model_name)
+
+    if not SUMMARY_CACHE_ENABLED:
+        summary, _ = await _arun_backend(model_name, backend, text)
+        return summary
+
+    if use_cache:
+        key, cached = _cached_summary(text, model_name)
+        if cached is not None:
+            return cached
     else:
-        # Fallback for unsupported model names
-        return (
-            "Error: Unsupported model selected. "
-            "Please choose from GPT 4.1, Sonnet 3.7, Bart, "
-            "Mistral small 3, Gemini 2.5 Pro, DeepSeek-R1, Llama 3.1, or Grok 3."
-        )
+        key = summary_cache_key(text, model_name)
 
+    summary, served_by_model = await _arun_backend(model_name, backend, text)
+    if served_by_model and _is_cacheable_summary(summary):
+        summary_cache.put(key, summary)
     return summary
 
-def summarize_with_llama3_point_1(text: str) -> str:
+
+async def astream_summary(text, model_name, use_cache=True):
     """
-    Summarizing text using RunPod’s Llama-3.1 via the OpenAI-compatible endpoint.
+    Stream a summary from the selected model as text deltas.
+
+    A cached summary is yielded as a single piece. A freshly streamed summary
+    is cached only once the stream has been consumed to the end.
 
     Args:
-        text (str): The input text to be summarized.
+        text (str): The input report or document to summarize.
+        model_name (str): Identifier of the summarization model to use.
+        use_cache (bool): See `summarize_text`.
 
-    Returns:
-        str: The generated summary, or an error message on failure.
+    Yields:
+        str: Pieces of the summary in generation order. Provider errors are
+             raised to the caller; an unsupported model yields the usual error message.
+
+    Raises:
+        ModelUnavailableError: If the model's circuit breaker is open.
     """
+    backend = SUMMARIZATION_BACKENDS.get(model_name)
+    if backend is None:
+        yield UNSUPPORTED_MODEL_MESSAGE
+        return
+    text = await _acompress(text, model_name)
+
+    if not SUMMARY_CACHE_ENABLED:
+        async for piece in _guarded_astream(model_name, backend, text):
+            yield piece
+        return
+
+    if use_cache:
+        key, cached = _cached_summary(text, model_name, streamed=True)
+        if cached is not None:
+            yield cached
+            return
+    else:
+        key = summary_cache_key(text, model_name, streamed=True)
+
+    parts = []
+    async for piece in _guarded_astream(model_name, backend, text):
+        parts.append(piece)
+        yield piece
+
+    summary = "".join(parts).strip()
+    if _is_cacheable_summary(summary):
+        summary_cache.put(key, summary)
+
+def _llama3_point_1_request(text: str):
+    """Build the RunPod URL and chat-completion payload for Llama-3.1."""
     # Retrieving the RunPod endpoint identifier from environment variables
     runpod_llama_endpoint_id = os.getenv("LLAMA3_POINT_1_ENDPOINT_ID")
 
     # Constructing endpoint URL for chat completions
-    url = f"https://api.runpod.ai/v2/{runpod_llama_endpoint_id}/openai/v1/chat/completions"
-
-    # Preparing request headers (JSON + Bearer authorization)
-    headers = {
-        "Content-Type": "application/json",
-        "Authorization": f"Bearer {os.getenv('RUNPOD_API_KEY')}"
-    }
+    url = f"{provider_base_url('runpod')}/v2/{runpod_llama_endpoint_id}/openai/v1/chat/completions"
 
     # Building the payload with system/user messages and generation parameters
     data = {
@@ -127,10 +407,24 @@ def summarize_with_llama3_point_1(text: str) -> str:
         "max_tokens": MAX_SUMMARY_TOKENS, # Enforcing global summary token cap
         "presence_penalty": 0.1           # Discourage repetitive phrases
     }
+    return url, data
+
+
+def summarize_with_llama3_point_1(text: str) -> str:
+    """
+    Summarizing text using RunPod’s Llama-3.1 via the OpenAI-compatible endpoint.
+
+    Args:
+        text (str): The input text to be summarized.
+
+    Returns:
+        str: The generated summary, or an error message on failure.
+    """
+    url, data = _llama3_point_1_request(text)
 
     try:
-        # Executing the POST request with a 120s timeout
-        response = requests.post(url, headers=headers, json=data, timeout=120)
+        # Executing the POST request on the shared keep-alive session (bearer auth preset)
+        response = get_runpod_session().post(url, json=data, timeout=runpod_timeout())
         response.raise_for_status()
 
         # Parsing JSON and extract the assistant’s reply
@@ -152,26 +446,63 @@ def summarize_with_llama3_point_1(text: str) -> str:
         return "Error: Unexpected response format from Llama-3.1."
 
 
-def summarize_with_DeepSeek_R1_runpod(text):
-    """
-    Summarizing text using DeepSeek-R1 hosted on RunPod via the OpenAI-compatible endpoint.
+async def asummarize_with_llama3_point_1(text: str) -> str:
+    """Asyncio variant of `summarize_with_llama3_point_1` (same payload and error handling)."""
+    url, data = _llama3_point_1_request(text)
+    response = None
 
-    Args:
-        text (str): The input report text to be summarized.
+    try:
+        # Executing the POST request on the shared asyncio client (bearer auth preset)
+        response = await get_async_runpod_client().post(url, json=data)
+        response.raise_for_status()
+        return response.json()["choices"][0]["message"]["content"].strip()
 
-    Returns:
-        str: The generated summary, or an error message on failure.
+    except httpx.HTTPError as e:
+        # Log HTTP/network errors and surface a user-friendly message
+        logger.error(
+            f"RunPod Llama-3.1 error: {e} – response: {getattr(response, 'text', '')}"
+        )
+        return "Error: Could not generate summary using Llama-3.1. Please try again later."
+
+    except (KeyError, IndexError):
+        # Handling unexpected or malformed API responses
+        return "Error: Unexpected response format from Llama-3.1."
+
+
+async def _astream_runpod_chat(url, data):
+    """
+    Stream text deltas from a RunPod OpenAI-compatible chat endpoint.
+
+    Sends the payload with `"stream": true` and parses the server-sent
+    `data:` lines until the `[DONE]` sentinel.
     """
+    async with get_async_runpod_client().stream("POST", url, json=dict(data, stream=True)) as response:
+        response.raise_for_status()
+        async for line in response.aiter_lines():
+            if not line.startswith("data:"):
+                continue
+            payload = line[len("data:"):].strip()
+            if payload == "[DONE]":
+                break
+            choices = json.loads(payload).get("choices") or [{}]
+            delta = (choices[0].get("delta") or {}).get("content")
+            if delta:
+                yield delta
+
+
+async def astream_with_llama3_point_1(text: str):
+    """Stream the Llama-3.1 summary from RunPod as text deltas."""
+    url, data = _llama3_point_1_request(text)
+    async for piece in _astream_runpod_chat(url, data):
+        yield piece
+
+
+def _deepseek_r1_request(text):
+    """Build the RunPod URL and chat-completion payload for DeepSeek-R1."""
     # Retrieving the RunPod endpoint identifier for DeepSeek-R1 from environment
     deepseek_R1_endpoint_id = os.getenv("DEEPSEEK_R1_ENDPOINT_ID")
     # Constructing the RunPod chat completions URL
-    url = f"https://api.runpod.ai/v2/{deepseek_R1_endpoint_id}/openai/v1/chat/completions"
-
-    # Preparing request headers with JSON content type and Bearer token
-    headers = {
-        "Content-Type": "application/json",
-        "Authorization": f"Bearer {os.getenv('RUNPOD_API_KEY')}"
-    }
+    url = f"{provider_base_url('runpod')}/v2/{deepseek_R1_endpoint_id}/openai/v1/chat/completions"
 
     # Building the payload: model spec, system/user prompts, and generation parameters
     data = {
@@ -197,23 +528,99 @@ def summarize_with_DeepSeek_R1_runpod(text):
         "max_tokens": MAX_SUMMARY_TOKENS * 4,    # Allowing buffer for internal reasoning tokens of DeepSeek-R1
         "presence_penalty": 0.1                  # Discourage repetition
     }
+    return url, data
+
+
+def _clean_deepseek_r1_output(content):
+    """Strip DeepSeek-R1's internal <think> block and bold markdown from *content*."""
+    # Removing internal <think> block and strip whitespace
+    marker = "</think>\n\n"
+    start = content.find(marker)
+    summary = content[start + len(marker):].strip() if start != -1 else content.strip()
+
+    # Cleaning up any bold markdown artifacts
+    return summary.replace("**", "")
+
+
+class DeepSeekStreamFilter:
+    """
+    Incremental version of `_clean_deepseek_r1_output` for token streams.
+
+    Text is held back until the closing `</think>` tag has been seen and is
+    then passed through with leading whitespace and `**` markers removed. If
+    the stream ends without a think block, the buffered text is released as-is
+    (minus the markers), matching the non-streaming behaviour.
+    """
+
+    MARKER = "</think>"
+
+    def __init__(self):
+        self._buffer = ""           # Text received before the end of the think block
+        self._passthrough = False   # True once the think block has been skipped
+        self._leading = True        # Still stripping whitespace after the think block
+        self._pending = ""          # Trailing "*" that may be half of a "**" marker
+
+    def feed(self, piece: str) -> str:
+        """Consume one streamed delta and return the text that may be emitted now."""
+        if not self._passthrough:
+            self._buffer += piece
+            index = self._buffer.find(self.MARKER)
+            if index == -1:
+                return ""
+            piece = self._buffer[index + len(self.MARKER):]
+            self._buffer = ""
+            self._passthrough = True
+
+        if self._leading:
+            piece = piece.lstrip()
+            if not piece:
+                return ""
+            self._leading = False
+        return self._clean(piece)
+
+    def flush(self) -> str:
+        """Return whatever is still held back once the stream has ended."""
+        if not self._passthrough:
+            self._passthrough = True
+            return self._clean(self._buffer.strip()) + self._take_pending()
+        return self._take_pending()
+
+    def _clean(self, piece: str) -> str:
+        """Drop "**" markers, holding back a trailing "*" until the next delta."""
+        text = (self._pending + piece).replace("**", "")
+        self._pending = ""
+        if text.endswith("*"):
+            self._pending, text = "*", text[:-1]
+        return text
+
+    def _take_pending(self) -> str:
+        pending, self._pending = self._pending, ""
+        return pending
+
+
+def summarize_with_DeepSeek_R1_runpod(text):
+    """
+    Summarizing text using DeepSeek-R1 hosted on RunPod via the OpenAI-compatible endpoint.
+
+    Args:
+        text (str): The input report text to be summarized.
+
+    Returns:
+        str: The generated summary, or an error message on failure.
+    """
+    url, data = _deepseek_r1_request(text)
 
     try:
-        # Executing the POST request with a 120-second timeout
-        response = requests.post(url, headers=headers, json=data, timeout=120)
+        # Executing the POST request on the shared keep-alive session (bearer auth preset)
+        response = get_runpod_session().post(url, json=data, timeout=runpod_timeout())
         response.raise_for_status()
 
         # Parsing JSON response and extracting the assistant's message content
         result = response.json()
         content = result["choices"][0]["message"]["content"]
 
-        # Removing internal <think> block and strip whitespace
-        marker = "</think>\n\n"
-        start = content.find(marker)
-        summary = content[start + len(marker):].strip() if start != -1 else content.strip()
-
-        # Cleaning up any bold markdown artifacts
-        return summary.replace("**", "")
+        # Removing the internal <think> block and markdown artifacts
+        return _clean_deepseek_r1_output(content)
 
     except requests.exceptions.RequestException as e:
         # Logging HTTP/network errors and returning a user-friendly message
@@ -231,6 +638,68 @@ def summarize_with_DeepSeek_R1_runpod(text):
         return "Error: Invalid JSON response from DeepSeek-R1."
 
 
+async def asummarize_with_DeepSeek_R1_runpod(text):
+    """Asyncio variant of `summarize_with_DeepSeek_R1_runpod` (same payload and error handling)."""
+    url, data = _deepseek_r1_request(text)
+    response = None
+
+    try:
+        # Executing the POST request on the shared asyncio client (bearer auth preset)
+        response = await get_async_runpod_client().post(url, json=data)
+        response.raise_for_status()
+        return _clean_deepseek_r1_output(response.json()["choices"][0]["message"]["content"])
+
+    except httpx.HTTPError as e:
+        # Logging HTTP/network errors and returning a user-friendly message
+        logger.error(f"RunPod DeepSeek-R1 error: {e} – response: {getattr(response, 'text', '')}")
+        return "Error: Could not generate summary using DeepSeek-R1. Please try again later."
+
+    except (KeyError, IndexError) as e:
+        # Handling unexpected JSON structure
+        logger.error(f"DeepSeek-R1 unexpected response format: {e}")
+        return "Error: Unexpected response format from DeepSeek-R1."
+
+    except ValueError as e:
+        # Handling JSON decoding errors
+        logger.error(f"DeepSeek-R1 JSON decode failed: {e}")
+        return "Error: Invalid JSON response from DeepSeek-R1."
+
+
+async def astream_with_DeepSeek_R1_runpod(text):
+    """Stream the DeepSeek-R1 summary, dropping the <think> section incrementally."""
+    url, data = _deepseek_r1_request(text)
+    stream_filter = DeepSeekStreamFilter()
+    async for piece in _astream_runpod_chat(url, data):
+        visible = stream_filter.feed(piece)
+        if visible:
+            yield visible
+    remainder = stream_filter.flush()
+    if remainder:
+        yield remainder
+
+
+def _gpt_4point1_request(text):
+    """Build the chat-completion arguments for GPT-4.1."""
+    return dict(
+        model="gpt-4.1",
+        messages=[
+            {
+                "role": "system",
+                "content": "You are a military intelligence analyst tasked with summarizing reports. Provide accurate summaries that capture key information while maintaining appropriate security posture and take care of ethical considerations."
+                "Return only the final summary in plain text (Paragraph form)."
+                "while writing summary, make sure summary should not include any markdown formatting, no lists, no headings, "
+                "no asterisks or backticks."
+            },
+            {
+                "role": "user",
+                "content": text
+            }
+        ],
+        max_tokens=MAX_SUMMARY_TOKENS,  # Enforcing token cap for summary length
+        temperature=0.3,           
+    )
+
+
 def summarize_with_gpt_4point1(text):
     """
     Args:
@@ -238,29 +707,12 @@ def summarize_with_gpt_4point1(text):
     Returns:
         str: The summarized text.
     """
-    # Initializing the OpenAI API client using the key from environment variables
-    openai_client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+    # Reusing the shared, connection-pooled OpenAI client
+    openai_client = get_openai_client()
 
     try:
         # Creating a chat completion request to GPT-4.1 with system and user messages
-        response = openai_client.chat.completions.create(
-            model="gpt-4.1",
-            messages=[
-                {
-                    "role": "system",
-                    "content": "You are a military intelligence analyst tasked with summarizing reports. Provide accurate summaries that capture key information while maintaining appropriate security posture and take care of ethical considerations."
-                    "Return only the final summary in plain text (Paragraph form)."
-                    "while writing summary, make sure summary should not include any markdown formatting, no lists, no headings, "
-                    "no asterisks or backticks."
-                },
-                {
-                    "role": "user",
-                    "content": text
-                }
-            ],
-            max_tokens=MAX_SUMMARY_TOKENS,  # Enforcing token cap for summary length
-            temperature=0.3,           
-        )
+        response = openai_client.chat.completions.create(**_gpt_4point1_request(text))
         # Extracting and returning the generated summary from the API response
         return response.choices[0].message.content
 
@@ -269,6 +721,48 @@ def summarize_with_gpt_4point1(text):
         print(f"GPT-4.1 summarization failed: {type(e).__name__}: {e}")
         return f"Error: Could not generate GPT-4.1 summary. {str(e)}"
 
+
+async def asummarize_with_gpt_4point1(text):
+    """Asyncio variant of `summarize_with_gpt_4point1`."""
+    try:
+        response = await get_async_openai_client().chat.completions.create(**_gpt_4point1_request(text))
+        return response.choices[0].message.content
+
+    except Exception as e:
+        # Logging the exception and returning a user-friendly error message
+        logger.error(f"GPT-4.1 summarization failed: {type(e).__name__}: {e}")
+        return f"Error: Could not generate GPT-4.1 summary. {str(e)}"
+
+
+async def _astream_openai_chat(client, request):
+    """Stream text deltas from an OpenAI-compatible chat-completion call."""
+    stream = await client.chat.completions.create(**dict(request, stream=True))
+    async for chunk in stream:
+        if chunk.choices and chunk.choices[0].delta.content:
+            yield chunk.choices[0].delta.content
+
+
+async def astream_with_gpt_4point1(text):
+    """Stream the GPT-4.1 summary as text deltas."""
+    async for piece in _astream_openai_chat(get_async_openai_client(), _gpt_4point1_request(text)):
+        yield piece
+
+def _claude_sonnet_3_7_request(text):
+    """Build the Messages API arguments for Claude Sonnet 3.7."""
+    return dict(
+        model="claude-3-7-sonnet-20250219",
+        system=(
+            "You are a military intelligence analyst tasked with summarizing reports. Provide accurate summaries that capture key information while maintaining appropriate security posture and take care of ethical considerations."
+            "Return only the final summary in plain text (Paragraph form)."
+            "while writing summary, make sure summary should not include any markdown formatting, no lists, no headings, "
+            "no asterisks or backticks."
+        ),
+        messages=[{"role": "user", "content": text}],
+        max_tokens=MAX_SUMMARY_TOKENS,  # Global Cap the summary length in tokens
+        temperature=0.3,
+    )
+
+
 def summarize_with_claude_sonnet_3_7(text: str) -> str:
     """
     Summarize text using Anthropic Claude Sonnet 3.7 via the anthropic Python client.
@@ -279,22 +773,11 @@ def summarize_with_claude_sonnet_3_7(text: str) -> str:
     Returns:
         str: The summary produced by Claude Sonnet 3.7 or an error message.
     """
-    # Initializing the Anthropic client with API key from environment variables
-    client = anthropic.Anthropic(api_key=os.getenv("ANTHROPIC_API_KEY"))
+    # Reusing the shared, connection-pooled Anthropic client
+    client = get_anthropic_client()
     try:
         # Sending a request to Claude Sonnet 3.7 with system instructions and user content
-        response = client.messages.create(
-            model="claude-3-7-sonnet-20250219",
-            system=(
-                "You are a military intelligence analyst tasked with summarizing reports. Provide accurate summaries that capture key information while maintaining appropriate security posture and take care of ethical considerations."
-                "Return only the final summary in plain text (Paragraph form)."
-                "while writing summary, make sure summary should not include any markdown formatting, no lists, no headings, "
-                "no asterisks or backticks."
-            ),
-            messages=[{"role": "user", "content": text}],
-            max_tokens=MAX_SUMMARY_TOKENS,  # Global Cap the summary length in tokens
-            temperature=0.3,
-        )
+        response = client.messages.create(**_claude_sonnet_3_7_request(text))
         # Extracting the generated summary text and trim whitespace
         summarize_text = response.content[0].text.strip()
         return summarize_text
@@ -305,18 +788,132 @@ def summarize_with_claude_sonnet_3_7(text: str) -> str:
         return f"Error: Could not generate summary using Sonnet 3.7. {e}"
 
 
+async def asummarize_with_claude_sonnet_3_7(text: str) -> str:
+    """Asyncio variant of `summarize_with_claude_sonnet_3_7`."""
+    try:
+        response = await get_async_anthropic_client().messages.create(**_claude_sonnet_3_7_request(text))
+        return response.content[0].text.strip()
+
+    except Exception as e:
+        # Logging the error for debugging and returning a user-friendly message
+        logger.error(f"Sonnet 3.7 (anthropic) summarization failed: {e}")
+        return f"Error: Could not generate summary using Sonnet 3.7. {e}"
+
+
+async def astream_with_claude_sonnet_3_7(text: str):
+    """Stream the Claude Sonnet 3.7 summary as text deltas."""
+    async with get_async_anthropic_client().messages.stream(**_claude_sonnet_3_7_request(text)) as stream:
+        async for piece in stream.text_stream:
+            yield piece
+
 
+def generate_bart_chunk_summaries(model, tokenizer, chunks, attention_chunks, device,
+                                  batch_size=BART_CHUNK_BATCH_SIZE, **generate_kwargs):
+    """
+    Summarize several token chunks with BART using padded, length-bucketed batches.
+
+    Chunks are sorted by length and grouped into batches of *batch_size* so that
+    each `generate` call pads as little as possible. If a batched call fails, the
+    chunks of that batch are retried one by one so a single bad chunk cannot
+    take the others down with it.
+
+    Args:
+        model: Loaded BART model (already on *device*).
+        tokenizer: Matching BART tokenizer (provides the pad token id).
+        chunks (list[torch.Tensor]): 1-D tensors of input token ids.
+        attention_chunks (list[torch.Tensor]): 1-D attention masks matching *chunks*.
+        device (torch.device): Device the model runs on.
+        batch_size (int): Maximum number of chunks per `generate` call.
+        **generate_kwargs: Generation parameters forwarded to `model.generate`.
+
+    Returns:
+        list[str | None]: Summary per chunk in the original order; None for
+                          chunks that failed even in single-chunk mode.
+    """
+    import torch
+
+    summaries = [None] * len(chunks)
+    batch_size = max(1, batch_size)
+
+    # Bucket chunks of similar length together to minimize padding
+    order = sorted(range(len(chunks)), key=lambda i: len(chunks[i]))
+    for start in range(0, len(order), batch_size):
+        batch_indices = order[start:start + batch_size]
+        try:
+            # Right-pad ids with the pad token and masks with zeros
+            input_batch = torch.nn.utils.rnn.pad_sequence(
+                [chunks[i] for i in batch_indices], batch_first=True,
+                padding_value=tokenizer.pad_token_id).to(device)
+            attention_batch = torch.nn.utils.rnn.pad_sequence(
+                [attention_chunks[i] for i in batch_indices], batch_first=True,
+                padding_value=0).to(device)
+
+            with torch.no_grad():
+                summary_ids = model.generate(input_batch, attention_mask=attention_batch,
+                                             **generate_kwargs)
+
+            decoded = tokenizer.batch_decode(summary_ids, skip_special_tokens=True)
+            for i, summary in zip(batch_indices, decoded):
+                summaries[i] = summary.strip()
+
+        except Exception as e:
+            # Fall back to single-chunk generation to isolate the failing chunk
+            logger.error(f"Batched BART generation failed for {len(batch_indices)} chunks: {e}")
+            for i in batch_indices:
+                try:
+                    with torch.no_grad():
+                        summary_ids = model.generate(
+                            chunks[i].unsqueeze(0).to(device),
+                            attention_mask=attention_chunks[i].unsqueeze(0).to(device),
+                            **generate_kwargs
+                        )
+                    summaries[i] = tokenizer.decode(summary_ids[0], skip_special_tokens=True).strip()
+                except Exception as chunk_error:
+                    # Log chunk processing errors but continue with remaining chunks
+                    logger.error(f"Error processing chunk {i+1}: {chunk_error}")
+
+    return summaries
+
+
+# Cross-request micro-batching of all non-streamed BART generate calls
+bart_scheduler = BartBatchScheduler(generate_bart_chunk_summaries)
+
+
+def _bart_generate(model, tokenizer, device, input_ids, attention_mask, streamer=None, **generate_kwargs):
+    """
+    Generate the summary of one BART input (1-D ids and mask) and decode it.
+
+    Non-streamed passes go through `bart_scheduler` so they share `generate`
+    calls with concurrent requests; streamed passes (and BART_MICRO_BATCHING=0)
+    call `model.generate` directly.
+    """
+    if streamer is None and BART_MICRO_BATCHING:
+        summary = bart_scheduler.submit(model, tokenizer, device, input_ids, attention_mask,
+                                        **generate_kwargs).result()
+        if summary is None:
+            raise RuntimeError("batched BART generation failed")
+        return summary
+
+    import torch
+    with torch.no_grad():
+        summary_ids = model.generate(input_ids.unsqueeze(0).to(device),
+                                     attention_mask=attention_mask.unsqueeze(0).to(device),
+                                     streamer=streamer, **generate_kwargs)
+    return tokenizer.decode(summary_ids[0], skip_special_tokens=True).strip()
 
 
 def summarize_with_bart(text, model_name="facebook/bart-large-cnn", max_input_tokens=1024, 
                         chunk_overlap=150, chunk_max_length=200, chunk_min_length=50,
-                        final_max_length=MAX_SUMMARY_TOKENS, final_min_length=150):
+                        final_max_length=MAX_SUMMARY_TOKENS, final_min_length=150,
+                        batch_size=BART_CHUNK_BATCH_SIZE, streamer=None, quantized=None):
     """
     Summarize text using Facebook's BART (Bidirectional and Auto-Regressive Transformers) model.
     
     This function handles both short and long texts by implementing a chunking strategy for 
     texts that exceed the model's input token limit. For long texts, it processes overlapping
-    chunks and then performs hierarchical summarization to produce a final coherent summary.
+    chunks (in padded batches) and then performs hierarchical summarization to produce a final
+    coherent summary. Non-streamed generate calls are micro-batched with those of concurrent
+    requests by `bart_scheduler`.
     
     Args:
         text (str): Input text to be summarized
@@ -327,112 +924,73 @@ def summarize_with_bart(text, model_name="facebook/bart-large-cnn", max_input_to
         chunk_min_length (int): Minimum length for individual chunk summaries
         final_max_length (int): Maximum length for the final consolidated summary
         final_min_length (int): Minimum length for the final consolidated summary
+        batch_size (int): Number of chunks generated per batched `generate` call
+        streamer: Optional HuggingFace streamer receiving the tokens of the final
+            summary as they are generated (that pass then uses greedy decoding,
+            since beam search cannot stream)
+        quantized (bool): Run the dynamic int8 model on CPU; None follows the
+            BART_QUANTIZE setting
         
     Returns:
         str: Generated summary text or error message if processing fails
     """
+    import torch
+
     try:
-        # Initialize BART model and tokenizer with optimal device allocation
-        device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
-        tokenizer = BartTokenizer.from_pretrained(model_name)
-        model = BartForConditionalGeneration.from_pretrained(model_name).to(device)
-        model.eval()  # Set to evaluation mode for inference optimization
+        # Fetch the warm BART model and tokenizer from the process-wide registry
+        tokenizer, model, device = get_bart(model_name, quantized=quantized)
         
-        # Tokenize input text while preserving attention masks for proper model processing
-        inputs = tokenizer(text, return_tensors="pt", truncation=False, 
-                          add_special_tokens=True, return_attention_mask=True)
-        input_ids = inputs["input_ids"][0]
-        attention_mask = inputs["attention_mask"][0]
+        # Tokenize once (fast tokenizer + offsets) and split into overlapping,
+        # sentence-aligned chunks that fit the model's input capacity
+        chunker = TokenChunker(tokenizer, max_tokens=max_input_tokens, overlap=chunk_overlap)
+        token_chunks = chunker.chunk(text)
         
         # Handle short texts that fit within model's input capacity directly
-        if len(input_ids) <= max_input_tokens:
+        if len(token_chunks) == 1:
             # Process entire text in single pass for optimal coherence
-            input_batch = input_ids.unsqueeze(0).to(device)
-            attention_batch = attention_mask.unsqueeze(0).to(device)
-            
-            # Generate summary with memory-efficient context management
-            with torch.no_grad():
-                summary_ids = model.generate(
-                    input_batch,
-                    attention_mask=attention_batch,
-                    max_length=min(final_max_length, len(input_ids) // 2),  # Adaptive max length based on input size
-                    min_length=max(final_min_length, len(input_ids) // 8),  # Adaptive min length for proportional summarization
-                    length_penalty=1.0,      # Balanced penalty to avoid overly short/long outputs
-                    num_beams=4,             # Beam search for higher quality generation
-                    no_repeat_ngram_size=3,  # Prevent repetitive phrase generation
-                    repetition_penalty=1.2,  # Mild penalty for repetition while maintaining coherence
-                    early_stopping=True,     # Stop generation when optimal summary is found
-                    do_sample=False          # Deterministic output for consistent results
-                )
+            input_ids = torch.tensor(token_chunks[0].input_ids)
+            # Adaptive lengths follow the input-length bucket, so documents of similar
+            # length share generation settings and can be batched together
+            bucketed_length = length_bucket(len(input_ids))
             
-            # Decode and return the generated summary
-            summary = tokenizer.decode(summary_ids[0], skip_special_tokens=True)
-            return summary.strip()
-        
-        # Calculate optimal chunking strategy for long texts
-        # Distribute input tokens evenly across chunks to maintain context balance
-        num_chunks = (len(input_ids) + max_input_tokens - 1) // max_input_tokens
-        optimal_chunk_size = len(input_ids) // num_chunks if num_chunks > 1 else max_input_tokens
+            # Generate and decode the summary
+            return _bart_generate(
+                model, tokenizer, device, input_ids, torch.ones_like(input_ids), streamer,
+                max_length=min(final_max_length, bucketed_length // 2),  # Adaptive max length based on input size
+                min_length=max(final_min_length, bucketed_length // 8),  # Adaptive min length for proportional summarization
+                length_penalty=1.0,      # Balanced penalty to avoid overly short/long outputs
+                num_beams=4 if streamer is None else 1,  # Beam search for higher quality generation
+                no_repeat_ngram_size=3,  # Prevent repetitive phrase generation
+                repetition_penalty=1.2,  # Mild penalty for repetition while maintaining coherence
+                early_stopping=True,     # Stop generation when optimal summary is found
+                do_sample=False          # Deterministic output for consistent results
+            )
         
-        # Create overlapping text chunks with preserved attention masks
-        chunks = []
-        attention_chunks = []
-        start = 0
+        # Convert chunk token slices to tensors with full attention masks
+        chunks = [torch.tensor(chunk.input_ids) for chunk in token_chunks]
+        attention_chunks = [torch.ones_like(chunk) for chunk in chunks]
         
-        # Implement intelligent chunking with sentence boundary awareness
-        while start < len(input_ids):
-            end = min(start + optimal_chunk_size, len(input_ids))
-            
-            # Attempt to break chunks at sentence boundaries to preserve semantic coherence
-            if end < len(input_ids) and start > 0:
-                # Search for sentence-ending punctuation within reasonable proximity
-                search_start = max(end - 50, start + optimal_chunk_size // 2)
-                period_positions = [i for i in range(search_start, end) 
-                                  if tokenizer.decode([input_ids[i]]).strip() in '.!?']
-                if period_positions:
-                    end = period_positions[-1] + 1  # Include the punctuation token
-            
-            # Store chunk and corresponding attention mask
-            chunks.append(input_ids[start:end])
-            attention_chunks.append(attention_mask[start:end])
-            
-            # Check for completion of input processing
-            if end == len(input_ids):
-                break
-            start = end - chunk_overlap  # Maintain context continuity with overlap
+        chunk_kwargs = dict(
+            max_length=chunk_max_length,    # Consistent chunk summary length
+            min_length=chunk_min_length,    # Ensure meaningful content in each summary
+            length_penalty=1.0,             # Balanced length optimization
+            num_beams=3,                    # Reduced beam size for processing speed
+            no_repeat_ngram_size=3,         # Prevent repetitive content
+            repetition_penalty=1.2,         # Encourage diverse vocabulary usage
+            early_stopping=True,            # Optimize generation efficiency
+            do_sample=False                 # Deterministic chunk processing
+        )
         
-        # Process individual chunks with robust error handling
-        summaries = []
-        for i, (chunk, attn_chunk) in enumerate(zip(chunks, attention_chunks)):
-            try:
-                # Prepare chunk tensors for GPU/CPU processing
-                input_batch = chunk.unsqueeze(0).to(device)
-                attention_batch = attn_chunk.unsqueeze(0).to(device)
-                
-                # Generate summary for current chunk with optimized parameters
-                with torch.no_grad():
-                    summary_ids = model.generate(
-                        input_batch,
-                        attention_mask=attention_batch,
-                        max_length=chunk_max_length,    # Consistent chunk summary length
-                        min_length=chunk_min_length,    # Ensure meaningful content in each summary
-                        length_penalty=1.0,             # Balanced length optimization
-                        num_beams=3,                    # Reduced beam size for processing speed
-                        no_repeat_ngram_size=3,         # Prevent repetitive content
-                        repetition_penalty=1.2,         # Encourage diverse vocabulary usage
-                        early_stopping=True,            # Optimize generation efficiency
-                        do_sample=False                 # Deterministic chunk processing
-                    )
-                
-                # Decode chunk summary and add to collection
-                summary = tokenizer.decode(summary_ids[0], skip_special_tokens=True)
-                summaries.append(summary.strip())
-            
-                
-            except Exception as e:
-                # Log chunk processing errors but continue with remaining chunks
-                logger.error(f"Error processing chunk {i+1}: {e}")
-                continue
+        # Summarize chunks in padded batches (falls back to per-chunk on batch failure),
+        # micro-batched together with chunks of concurrent requests when enabled
+        if BART_MICRO_BATCHING:
+            futures = [bart_scheduler.submit(model, tokenizer, device, chunk, attention, **chunk_kwargs)
+                       for chunk, attention in zip(chunks, attention_chunks)]
+            chunk_summaries = [future.result() for future in futures]
+        else:
+            chunk_summaries = generate_bart_chunk_summaries(
+                model, tokenizer, chunks, attention_chunks, device, batch_size=batch_size, **chunk_kwargs)
+        summaries = [summary for summary in chunk_summaries if summary is not None]
         
         # Validate that at least some chunks were processed successfully
         if not summaries:
@@ -452,28 +1010,19 @@ def summarize_with_bart(text, model_name="facebook/bart-large-cnn", max_input_to
                                truncation=True, max_length=max_input_tokens,
                                return_attention_mask=True)
         
-        # Prepare final summarization batch tensors
-        input_batch = final_inputs["input_ids"].to(device)
-        attention_batch = final_inputs["attention_mask"].to(device)
-        
-        # Generate final consolidated summary with enhanced quality parameters
-        with torch.no_grad():
-            summary_ids = model.generate(
-                input_batch,
-                attention_mask=attention_batch,
-                max_length=final_max_length,        # Global summary length constraint
-                min_length=final_min_length,        # Ensure comprehensive coverage
-                length_penalty=1.0,                 # Balanced output length optimization
-                num_beams=4,                        # Higher quality for final summary
-                no_repeat_ngram_size=3,             # Prevent repetitive final content
-                repetition_penalty=1.2,             # Encourage vocabulary diversity
-                early_stopping=True,                # Efficient generation termination
-                do_sample=False                     # Consistent final output
-            )
-        
-        # Decode and return the final hierarchical summary
-        final_summary = tokenizer.decode(summary_ids[0], skip_special_tokens=True)
-        return final_summary.strip()
+        # Generate and decode the final consolidated summary with enhanced quality parameters
+        return _bart_generate(
+            model, tokenizer, device,
+            final_inputs["input_ids"][0], final_inputs["attention_mask"][0], streamer,
+            max_length=final_max_length,        # Global summary length constraint
+            min_length=final_min_length,        # Ensure comprehensive coverage
+            length_penalty=1.0,                 # Balanced output length optimization
+            num_beams=4 if streamer is None else 1,  # Higher quality for final summary
+            no_repeat_ngram_size=3,             # Prevent repetitive final content
+            repetition_penalty=1.2,             # Encourage vocabulary diversity
+            early_stopping=True,                # Efficient generation termination
+            do_sample=False                     # Consistent final output
+        )
     
     except Exception as e:
         # Log comprehensive error information for debugging
@@ -486,11 +1035,86 @@ def summarize_with_bart(text, model_name="facebook/bart-large-cnn", max_input_to
             torch.cuda.empty_cache()
 
 
+async def asummarize_with_bart(text, **kwargs):
+    """
+    Asyncio variant of `summarize_with_bart`.
+
+    BART runs locally and is CPU/GPU-bound, so generation is moved to the shared
+    inference executor instead of blocking the event loop. With micro-batching
+    the request runs on `bart_request_executor` instead: its thread mostly waits
+    for `bart_scheduler`, and the small inference pool must not cap how many
+    requests can share a batch. When the inference worker pool is running,
+    the request is routed to a worker process instead.
+    """
+    if inference_pool.enabled:
+        return await inference_pool.summarize_bart(text, **kwargs)
+    if BART_MICRO_BATCHING:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(bart_request_executor, functools.partial(summarize_with_bart, text, **kwargs))
+    return await run_inference(summarize_with_bart, text, **kwargs)
+
+
+async def astream_with_bart(text, **kwargs):
+    """
+    Stream the BART summary through a HuggingFace token streamer.
+
+    Generation runs on the inference executor; the streamer hands decoded text
+    back to the event loop through a queue. Only the final generation pass is
+    streamed (chunk summaries of long inputs are produced first), and if no
+    final pass is needed the complete summary is yielded at the end.
+    """
+    from transformers import TextStreamer
+
+    loop = asyncio.get_running_loop()
+    queue = asyncio.Queue()
+    finished = object()
+
+    class QueueStreamer(TextStreamer):
+        """Forward finalized text from the generation thread to the event loop."""
+        def on_finalized_text(self, piece, stream_end=False):
+            if piece:
+                loop.call_soon_threadsafe(queue.put_nowait, piece)
+
+    tokenizer, _, _ = await run_inference(get_bart, kwargs.get("model_name", DEFAULT_BART_MODEL))
+    streamer = QueueStreamer(tokenizer, skip_special_tokens=True)
+    generation = asyncio.ensure_future(run_inference(summarize_with_bart, text, streamer=streamer, **kwargs))
+    generation.add_done_callback(lambda _: queue.put_nowait(finished))
+
+    streamed = False
+    while True:
+        piece = await queue.get()
+        if piece is finished:
+            break
+        streamed = True
+        yield piece
+
+    summary = generation.result()
+    if not streamed:
+        yield summary
+
+
 
 
 
 
     
+# Gemini model version used for summarization
+GEMINI_MODEL_NAME = "gemini-2.5-pro-preview-05-06"
+
+
+def _gemini2point5_pro_prompt(text):
+    """Build the single-turn Gemini prompt (role instructions followed by the report)."""
+    return (
+        "You are a military intelligence analyst tasked with summarizing reports. "
+        "Provide accurate summaries that capture key information while maintaining appropriate security posture and taking care of ethical considerations."
+        "Summarize this report and return only summary in plain text. Here is report text:\n\n" + text
+    )
+
+
+# Returned when Gemini answers without text (e.g. a blocked prompt), so callers see an error rather than None
+GEMINI_EMPTY_RESPONSE_MESSAGE = "Error: Could not generate summary using Gemini API. Details: empty response"
+
+
 def summarize_with_gemini2point5_pro(text):
     """
     Summarize text using Google's Gemini pro via the google-generativeai library.
@@ -501,23 +1125,12 @@ def summarize_with_gemini2point5_pro(text):
     Returns:
         str: The summarized text or an error message
     """
-    # Retrieving the Google Generative AI API key from environment variables
-    api_key = os.getenv("GOOGLE_GENAI_API_KEY")
-    model_name_to_use = "gemini-2.5-pro-preview-05-06" 
-
     try:
-        # Configuring the Google Generative AI library with authentication credentials
-        genai.configure(api_key=api_key)
-        
-        # Initializing the Gemini model instance with the specified version
-        model = genai.GenerativeModel(model_name_to_use)
+        # Reusing the shared Gemini model handle (library configured once per process)
+        model = get_gemini_model(GEMINI_MODEL_NAME)
 
         # Constructing the prompt with military intelligence analyst role and ethical guidelines
-        prompt = (
-            "You are a military intelligence analyst tasked with summarizing reports. "
-            "Provide accurate summaries that capture key information while maintaining appropriate security posture and taking care of ethical considerations."
-            "Summarize this report and return only summary in plain text. Here is report text:\n\n" + text
-        )
+        prompt = _gemini2point5_pro_prompt(text)
         
         # Generating summary content using the Gemini model with the constructed prompt
         response = model.generate_content(prompt)
@@ -526,6 +1139,7 @@ def summarize_with_gemini2point5_pro(text):
         if response and hasattr(response, 'text') and response.text:
              # Returning the cleaned summary with whitespace trimmed
              return response.text.strip()
+        return GEMINI_EMPTY_RESPONSE_MESSAGE
              
     except Exception as e:
         # Extracting detailed error information when available for better debugging
@@ -535,6 +1149,54 @@ def summarize_with_gemini2point5_pro(text):
         return f"Error: Could not generate summary using Gemini API. Details: {error_details}"
 
 
+async def asummarize_with_gemini2point5_pro(text):
+    """Asyncio variant of `summarize_with_gemini2point5_pro`."""
+    try:
+        model = get_gemini_model(GEMINI_MODEL_NAME)
+        response = await model.generate_content_async(_gemini2point5_pro_prompt(text))
+        if response and hasattr(response, 'text') and response.text:
+            return response.text.strip()
+        return GEMINI_EMPTY_RESPONSE_MESSAGE
+
+    except Exception as e:
+        error_details = e.message if hasattr(e, 'message') else str(e)
+        return f"Error: Could not generate summary using Gemini API. Details: {error_details}"
+
+
+async def astream_with_gemini2point5_pro(text):
+    """Stream the Gemini 2.5 Pro summary as text deltas."""
+    model = get_gemini_model(GEMINI_MODEL_NAME)
+    response = await model.generate_content_async(_gemini2point5_pro_prompt(text), stream=True)
+    async for chunk in response:
+        if chunk.parts:
+            yield chunk.text
+
+
+def _grok_3_request(text):
+    """Build the chat-completion arguments for Grok 3."""
+    return dict(
+        model="grok-3-latest",
+        messages=[
+            {
+                "role": "system",
+                "content": (
+                    "You are a military intelligence analyst tasked with summarizing reports. Provide accurate summaries that capture key information while maintaining appropriate security posture and take care of ethical considerations. "
+                    "Return only the final summary in plain text (Paragraph form)."
+                    "while writing summary, make sure summary should not include any markdown formatting, no lists, no headings, "
+                    "no asterisks or backticks."
+            
+                ),
+            },
+            {
+                "role": "user",
+                "content": text,
+            },
+        ],
+        max_tokens=MAX_SUMMARY_TOKENS,  # enforcing global token cap for summary
+        temperature=0.3,
+        stream=False,                  # disabling streaming mode
+    )
+
 
 def summarize_with_grok_3(text: str) -> str:
     """
@@ -545,36 +1207,12 @@ def summarize_with_grok_3(text: str) -> str:
     Returns:
         str: A concise, plain-text summary.
     """
-    # Initializing Grok client with XAI API key and custom base URL
-    grok_client = OpenAI(
-        api_key=os.getenv("XAI_API_KEY"),
-        base_url="https://api.x.ai/v1",
-    )
+    # Reusing the shared, connection-pooled xAI client (OpenAI-compatible)
+    grok_client = get_xai_client()
 
     try:
         # Building and sending chat completion request
-        response = grok_client.chat.completions.create(
-            model="grok-3-latest",
-            messages=[
-                {
-                    "role": "system",
-                    "content": (
-                        "You are a military intelligence analyst tasked with summarizing reports. Provide accurate summaries that capture key information while maintaining appropriate security posture and take care of ethical considerations. "
-                        "Return only the final summary in plain text (Paragraph form)."
-                        "while writing summary, make sure summary should not include any markdown formatting, no lists, no headings, "
-                        "no asterisks or backticks."
-                
-                    ),
-                },
-                {
-                    "role": "user",
-                    "content": text,
-                },
-            ],
-            max_tokens=MAX_SUMMARY_TOKENS,  # enforcing global token cap for summary
-            temperature=0.3,
-            stream=False,                  # disabling streaming mode
-        )
+        response = grok_client.chat.completions.create(**_grok_3_request(text))
 
         # Extracting the assistant’s reply and trim whitespace
         return response.choices[0].message.content.strip()
@@ -585,10 +1223,52 @@ def summarize_with_grok_3(text: str) -> str:
         return f"Error: Could not generate Grok-3 summary. {e}"
 
 
+async def asummarize_with_grok_3(text: str) -> str:
+    """Asyncio variant of `summarize_with_grok_3`."""
+    try:
+        response = await get_async_xai_client().chat.completions.create(**_grok_3_request(text))
+        return response.choices[0].message.content.strip()
+
+    except Exception as e:
+        logger.error(f"Grok-3 summarization failed: {type(e).__name__}: {e}")
+        return f"Error: Could not generate Grok-3 summary. {e}"
+
+
+async def astream_with_grok_3(text: str):
+    """Stream the Grok 3 summary as text deltas."""
+    async for piece in _astream_openai_chat(get_async_xai_client(), _grok_3_request(text)):
+        yield piece
+
+
 
 
 
 
+def _mistral_small3_request(text):
+    """Build the chat-completion arguments for Mistral small 3."""
+    return dict(
+        model="mistral-small-latest",
+        messages=[
+            {
+                "role": "system",
+                "content": (
+                    "You are a military intelligence analyst tasked with summarizing reports. Provide accurate summaries that capture key information while maintaining appropriate security posture and take care of ethical considerations. "
+                    "Return only the final summary in plain text (Paragraph form)."
+                    "while writing summary, make sure summary should not include any markdown formatting, no lists, no headings, "
+                    "no asterisks or backticks."
+                ),
+            },
+            {
+                "role": "user",
+                "content": text
+            },
+        ],
+        max_tokens=MAX_SUMMARY_TOKENS,  # Enforce global token limit for consistency
+        temperature=0.3,              
+        stream=False,                   # Disable streaming for complete response handling
+    )
+
+
 def summarize_with_mistral_small3(text: str) -> str:
     """
     Summarize text using Mistral AI's small model via their Python SDK.
@@ -605,8 +1285,8 @@ def summarize_with_mistral_small3(text: str) -> str:
         str: A plain-text summary without markdown formatting, or an error message
              if the summarization process fails.
     """
-    # Initializing Mistral client with API key from environment variables
-    client = Mistral(api_key=os.getenv("MISTRAL_API_KEY"))
+    # Reusing the shared, connection-pooled Mistral client
+    client = get_mistral_client()
 
     # Validating client initialization to prevent downstream errors
     if not client:
@@ -614,27 +1294,7 @@ def summarize_with_mistral_small3(text: str) -> str:
 
     try:
         # Sending chat completion request to Mistral's small model
-        response = client.chat.complete(
-            model="mistral-small-latest",
-            messages=[
-                {
-                    "role": "system",
-                    "content": (
-                        "You are a military intelligence analyst tasked with summarizing reports. Provide accurate summaries that capture key information while maintaining appropriate security posture and take care of ethical considerations. "
-                        "Return only the final summary in plain text (Paragraph form)."
-                        "while writing summary, make sure summary should not include any markdown formatting, no lists, no headings, "
-                        "no asterisks or backticks."
-                    ),
-                },
-                {
-                    "role": "user",
-                    "content": text
-                },
-            ],
-            max_tokens=MAX_SUMMARY_TOKENS,  # Enforce global token limit for consistency
-            temperature=0.3,              
-            stream=False,                   # Disable streaming for complete response handling
-        )
+        response = client.chat.complete(**_mistral_small3_request(text))
 
         # Extracting and returning the generated summary with whitespace trimmed
         return response.choices[0].message.content.strip()
@@ -642,3 +1302,91 @@ def summarize_with_mistral_small3(text: str) -> str:
     except Exception as e:
         # Returning user-friendly error message with technical details
         return f"Error: Could not generate Mistral summary. {e}"
+
+
+async def asummarize_with_mistral_small3(text: str) -> str:
+    """Asyncio variant of `summarize_with_mistral_small3`."""
+    try:
+        response = await get_mistral_client().chat.complete_async(**_mistral_small3_request(text))
+        return response.choices[0].message.content.strip()
+
+    except Exception as e:
+        # Returning user-friendly error message with technical details
+        return f"Error: Could not generate Mistral summary. {e}"
+
+
+async def astream_with_mistral_small3(text: str):
+    """Stream the Mistral small 3 summary as text deltas."""
+    request = {k: v for k, v in _mistral_small3_request(text).items() if k != "stream"}
+    stream = await get_mistral_client().chat.stream_async(**request)
+    async for event in stream:
+        choices = event.data.choices
+        if choices and choices[0].delta.content:
+            yield choices[0].delta.content
+
+
+@dataclass(frozen=True)
+class SummarizationBackend:
+    """Sync, asyncio and streaming entry points of one summarization model."""
+    summarize: Callable[[str], str]
+    asummarize: Callable[[str], Awaitable[str]]
+    astream: Callable[[str], AsyncIterator[str]]
+    provider: str  # Provider key shared with provider_clients ("local" for in-process models)
+    generation_params: Callable[[], Dict[str, Any]]  # Request settings that affect the output (cache key)
+    hedge: Optional[HedgePolicy] = None  # Duplicate slow requests (see hedging.py); None disables hedging
+    slow_call_seconds: Optional[float] = None  # Breaker slow-call threshold; None = CIRCUIT_SLOW_CALL_SECONDS
+
+
+def _bart_generation_params():
+    """Default generation settings of `summarize_with_bart` (everything but the text and batching)."""
+    params = {
+        name: parameter.default
+        for name, parameter in inspect.signature(summarize_with_bart).parameters.items()
+        if parameter.default is not inspect.Parameter.empty
+        and name not in ("batch_size", "streamer", "quantized")
+    }
+    return dict(params, num_beams=4, length_bucket=BART_LENGTH_BUCKET_TOKENS, quantized=bart_quantization_enabled())
+
+
+# Summarization backends keyed by the model names used by the frontend
+SUMMARIZATION_BACKENDS = {
+    # OpenAI GPT 4.1 via the OpenAI SDK
+    "GPT 4.1": SummarizationBackend(
+        summarize_with_gpt_4point1, asummarize_with_gpt_4point1, astream_with_gpt_4point1, "openai",
+        lambda: _gpt_4point1_request("")),
+    # Anthropic Claude Sonnet 3.7 client
+    "Sonnet 3.7": SummarizationBackend(
+        summarize_with_claude_sonnet_3_7, asummarize_with_claude_sonnet_3_7, astream_with_claude_sonnet_3_7, "anthropic",
+        lambda: _claude_sonnet_3_7_request("")),
+    # Hugging Face’s Bart sequence‐to‐sequence model
+    "Bart": SummarizationBackend(
+        summarize_with_bart, asummarize_with_bart, astream_with_bart, "local",
+        _bart_generation_params, slow_call_seconds=CIRCUIT_LOCAL_SLOW_CALL_SECONDS),
+    # Mistral AI’s small model via their Python SDK
+    "Mistral small 3": SummarizationBackend(
+        summarize_with_mistral_small3, asummarize_with_mistral_small3, astream_with_mistral_small3, "mistral",
+        lambda: _mistral_small3_request("")),
+    # Google’s Gemini 2.5 Pro via google-generativeai
+    "Gemini 2.5 Pro": SummarizationBackend(
+        summarize_with_gemini2point5_pro, asummarize_with_gemini2point5_pro, astream_with_gemini2point5_pro, "gemini",
+        lambda: {"model": GEMINI_MODEL_NAME, "prompt": _gemini2point5_pro_prompt("")}),
+    # DeepSeek-R1 hosted on RunPod
+    "DeepSeek-R1": SummarizationBackend(
+        summarize_with_DeepSeek_R1_runpod, asummarize_with_DeepSeek_R1_runpod, astream_with_DeepSeek_R1_runpod, "runpod",
+        lambda: _deepseek_r1_request("")[1],
+        hedge=HedgePolicy(percentile=95)),
+    # RunPod’s Llama-3.1 via the OpenAI-compatible endpoint
+    "Llama 3.1": SummarizationBackend(
+        summarize_with_llama3_point_1, asummarize_with_llama3_point_1, astream_with_llama3_point_1, "runpod",
+        lambda: _llama3_point_1_request("")[1],
+        hedge=HedgePolicy(percentile=95)),
+    # xAI’s Grok 3-latest model via OpenAI-compatible client
+    "Grok 3": SummarizationBackend(
+        summarize_with_grok_3, asummarize_with_grok_3, astream_with_grok_3, "xai",
+        lambda: _grok_3_request("")),
+}
+
+# Per-backend breaker thresholds (local models are exempt from the slow-call rule by default)
+for _name, _backend in SUMMARIZATION_BACKENDS.items():
+    if _backend.slow_call_seconds is not None:
+        circuit_breakers.configure(_name, slow_call_seconds=_backend.slow_call_seconds)
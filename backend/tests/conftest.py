@@ -0,0 +1,11 @@
+import os
+import sys
+import tempfile
+
+# Backend modules are imported by their plain names (as main.py does)
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import db  # noqa: E402
+
+# Caches created at import time must not write to the real summaries.db
+db.DATABASE_PATH = os.path.join(tempfile.mkdtemp(prefix="bbb-tests-"), "summaries.db")
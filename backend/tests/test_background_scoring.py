@@ -0,0 +1,131 @@
+"""
+Deferred scoring of stored summaries (`background_scoring`).
+
+The scorer runs against a temporary database with a stub `score` coroutine,
+so no judge model or Detoxify is needed.
+"""
+
+import asyncio
+
+import pytest
+
+import db as db_module
+from background_scoring import DONE, FAILED, PENDING, BackgroundScorer, pending_metadata
+
+
+@pytest.fixture
+def database(tmp_path, monkeypatch):
+    monkeypatch.setattr(db_module, "DATABASE_PATH", str(tmp_path / "summaries.db"))
+    database = db_module.Database()
+    yield database
+    database.conn.close()
+
+
+def save_pending(database, text="report", summary="summary"):
+    return database.save_summary("alice", text, summary, pending_metadata({"filename": "report.txt"}))
+
+
+def test_pending_metadata_keeps_the_score_shapes():
+    metadata = pending_metadata({"filename": "report.txt", "model": "Bart"})
+
+    assert metadata["scoring"]["status"] == PENDING
+    assert metadata["filename"] == "report.txt"
+    # The history view iterates these before scoring has finished
+    for key in ("quality_scores", "detox_report", "detox_summary", "percentage_reduction"):
+        assert metadata[key] == {}
+
+
+def test_enqueued_summary_is_scored_and_wait_returns_when_done(database):
+    summary_id = save_pending(database, "plain text", "the summary")
+    calls = []
+
+    async def score(plain_text, summary):
+        calls.append((plain_text, summary))
+        await release.wait()
+        return {"quality_scores": {"coherence": 4}}
+
+    async def run():
+        scorer = BackgroundScorer(database, score, workers=2)
+        assert scorer.enqueue(summary_id)
+        assert not scorer.enqueue(summary_id)  # Already queued
+
+        waiting = asyncio.create_task(scorer.wait(summary_id, timeout=10))
+        await asyncio.sleep(0.05)
+        assert not waiting.done()  # Still scoring
+        release.set()
+        record = await asyncio.wait_for(waiting, 5)  # Returns on completion, not at the timeout
+        return scorer, record
+
+    release = asyncio.Event()
+    scorer, record = asyncio.run(run())
+
+    assert calls == [("plain text", "the summary")]
+    assert record["metadata"]["scoring"]["status"] == DONE
+    assert record["metadata"]["quality_scores"] == {"coherence": 4}
+    assert record["metadata"]["filename"] == "report.txt"
+    assert scorer.stats()["completed"] == 1
+
+
+def test_failed_scoring_marks_the_summary_failed(database):
+    summary_id = save_pending(database)
+
+    async def score(plain_text, summary):
+        raise RuntimeError("judge unavailable")
+
+    async def run():
+        scorer = BackgroundScorer(database, score, workers=1)
+        scorer.enqueue(summary_id)
+        return scorer, await scorer.wait(summary_id, timeout=5)
+
+    scorer, record = asyncio.run(run())
+
+    scoring = record["metadata"]["scoring"]
+    assert scoring["status"] == FAILED
+    assert "judge unavailable" in scoring["detail"]
+    assert record["metadata"]["quality_scores"] == {}  # Placeholders are kept
+    assert scorer.stats()["failed"] == 1
+
+
+def test_rescore_keeps_previous_scores_until_replaced(database):
+    summary_id = database.save_summary("alice", "report", "summary", {
+        "filename": "report.txt", "quality_scores": {"coherence": 2}, "scoring": {"status": DONE},
+    })
+
+    async def score(plain_text, summary):
+        await release.wait()
+        return {"quality_scores": {"coherence": 5}}
+
+    async def run():
+        scorer = BackgroundScorer(database, score, workers=1)
+        assert await scorer.rescore([summary_id, 999]) == [summary_id]
+        during = database.get_summary(summary_id)["metadata"]
+        release.set()
+        return during, await scorer.wait(summary_id, timeout=5)
+
+    release = asyncio.Event()
+    during, record = asyncio.run(run())
+
+    assert during["scoring"]["status"] == PENDING
+    assert during["quality_scores"] == {"coherence": 2}
+    assert record["metadata"]["scoring"]["status"] == DONE
+    assert record["metadata"]["quality_scores"] == {"coherence": 5}
+
+
+def test_resume_pending_requeues_unfinished_summaries(database):
+    pending = [save_pending(database, text=f"report {index}") for index in range(2)]
+    database.save_summary("alice", "scored", "summary", {"scoring": {"status": DONE}})
+    scored = []
+
+    async def score(plain_text, summary):
+        scored.append(plain_text)
+        return {}
+
+    async def run():
+        scorer = BackgroundScorer(database, score, workers=2)
+        assert await scorer.resume_pending() == 2
+        return [await scorer.wait(summary_id, timeout=5) for summary_id in pending]
+
+    records = asyncio.run(run())
+
+    assert sorted(scored) == ["report 0", "report 1"]
+    assert all(record["metadata"]["scoring"]["status"] == DONE for record in records)
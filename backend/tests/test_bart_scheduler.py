@@ -0,0 +1,37 @@
+"""
+Batching and model references of `bart_scheduler.BartBatchScheduler`.
+
+`run_batch` is a stub, so no model is loaded.
+"""
+
+import gc
+import weakref
+
+from bart_scheduler import BartBatchScheduler
+
+
+class FakeModel:
+    pass
+
+
+def echo_batch(model, tokenizer, ids, masks, device, batch_size, **generate_kwargs):
+    return [f"{len(item)} tokens" for item in ids]
+
+
+def test_same_group_inputs_share_a_batch():
+    scheduler = BartBatchScheduler(echo_batch, window_ms=50, max_batch_size=4)
+    model = FakeModel()
+    futures = [scheduler.submit(model, None, "cpu", [1] * 10, [1] * 10, num_beams=4) for _ in range(3)]
+    assert [future.result(timeout=5) for future in futures] == ["10 tokens"] * 3
+    assert scheduler.stats()["batches"] == 1
+
+
+def test_drained_groups_release_their_model():
+    scheduler = BartBatchScheduler(echo_batch, window_ms=1)
+    model = FakeModel()
+    collected = weakref.ref(model)
+    scheduler.submit(model, None, "cpu", [1] * 10, [1] * 10, num_beams=4).result(timeout=5)
+    del model
+    gc.collect()
+    assert collected() is None
+    assert not scheduler._groups
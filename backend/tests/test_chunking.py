@@ -0,0 +1,132 @@
+"""
+Overlap and boundary semantics of `chunking.TokenChunker`.
+
+Uses a small word-level fast tokenizer built in memory (one token per word
+or punctuation mark, no special tokens), so the tests need no model download.
+"""
+
+import random
+
+import pytest
+from tokenizers import Tokenizer, models, pre_tokenizers
+from transformers import PreTrainedTokenizerFast
+
+from chunking import TokenChunker
+
+WORDS = ["troops", "advanced", "north", "supply", "lines", "held", "artillery", "fired", "at", "dawn",
+         "the", "convoy", "reached", "bridge", "command", "reported", "losses", "were", "light"]
+
+
+def make_text(sentences: int = 120, seed: int = 0) -> str:
+    rng = random.Random(seed)
+    return " ".join(" ".join(rng.choice(WORDS) for _ in range(rng.randint(4, 14))) + rng.choice(".!?")
+                    for _ in range(sentences))
+
+
+@pytest.fixture(scope="module")
+def tokenizer():
+    vocab = {token: index for index, token in enumerate(["[UNK]", ".", "!", "?"] + WORDS)}
+    backend = Tokenizer(models.WordLevel(vocab, unk_token="[UNK]"))
+    backend.pre_tokenizer = pre_tokenizers.Whitespace()
+    return PreTrainedTokenizerFast(tokenizer_object=backend, unk_token="[UNK]")
+
+
+@pytest.fixture(scope="module")
+def text():
+    return make_text()
+
+
+def nominal_size(total: int, max_tokens: int) -> int:
+    """Chunk size before boundary snapping: tokens split evenly over the fewest chunks that fit."""
+    return total // -(-total // max_tokens)
+
+
+def chunks_of(tokenizer, text, **kwargs):
+    chunker = TokenChunker(tokenizer, **kwargs)
+    return chunker, chunker.chunk(text)
+
+
+@pytest.mark.parametrize("mode", ["tokens", "sentences"])
+def test_chunks_fit_and_cover_the_document(tokenizer, text, mode):
+    chunker, chunks = chunks_of(tokenizer, text, max_tokens=64, overlap=8, boundary_window=16, boundary_mode=mode)
+    total = len(chunker.encode(text).input_ids)
+    assert len(chunks) > 1
+    assert all(len(chunk.input_ids) <= 64 for chunk in chunks)
+    assert all(len(chunk.input_ids) == chunk.token_end - chunk.token_start for chunk in chunks)
+    assert chunks[0].token_start == 0 and chunks[-1].token_end == total
+
+
+@pytest.mark.parametrize("mode", ["tokens", "sentences"])
+@pytest.mark.parametrize("overlap", [0, 5, 12])
+def test_consecutive_chunks_overlap_exactly(tokenizer, text, mode, overlap):
+    _, chunks = chunks_of(tokenizer, text, max_tokens=64, overlap=overlap, boundary_window=16, boundary_mode=mode)
+    for previous, current in zip(chunks, chunks[1:]):
+        assert previous.token_end - current.token_start == overlap
+        assert previous.input_ids[len(previous.input_ids) - overlap:] == current.input_ids[:overlap]
+
+
+@pytest.mark.parametrize("mode", ["tokens", "sentences"])
+def test_non_final_chunks_end_on_a_boundary_within_the_window(tokenizer, text, mode):
+    chunker, chunks = chunks_of(tokenizer, text, max_tokens=64, overlap=8, boundary_window=16, boundary_mode=mode)
+    encoding = chunker.encode(text)
+    boundaries = chunker.boundary_positions(text, encoding)
+    assert boundaries
+    total = len(encoding.input_ids)
+    chunk_size = nominal_size(total, 64)
+    snapped = 0
+    for chunk in chunks[:-1]:
+        nominal_end = min(chunk.token_start + chunk_size, total)
+        search_start = max(nominal_end - 16, chunk.token_start + chunk_size // 2)
+        if any(search_start <= position < nominal_end for position in boundaries):
+            assert chunk.token_end - 1 in boundaries
+            assert text[chunk.char_end - 1] in ".!?"
+            snapped += 1
+    assert snapped
+
+
+def test_no_boundary_in_window_keeps_the_nominal_end(tokenizer):
+    text = " ".join(["troops"] * 300) + "."
+    _, chunks = chunks_of(tokenizer, text, max_tokens=50, overlap=5, boundary_window=10)
+    chunk_size = nominal_size(301, 50)
+    assert all(len(chunk.input_ids) == chunk_size for chunk in chunks[:-1])
+
+
+def test_short_text_is_one_chunk(tokenizer):
+    text = "the convoy reached the bridge."
+    _, chunks = chunks_of(tokenizer, text, max_tokens=64, overlap=8)
+    assert len(chunks) == 1
+    assert (chunks[0].char_start, chunks[0].char_end) == (0, len(text))
+
+
+@pytest.mark.parametrize("mode", ["tokens", "sentences"])
+def test_char_spans_map_back_to_the_source(tokenizer, text, mode):
+    chunker, chunks = chunks_of(tokenizer, text, max_tokens=64, overlap=8, boundary_window=16, boundary_mode=mode)
+    for chunk in chunks:
+        span = text[chunk.char_start:chunk.char_end]
+        assert chunker.encode(span).input_ids == chunk.input_ids
+
+
+def test_modes_agree_on_punctuation_boundaries(tokenizer, text):
+    tokens_chunker = TokenChunker(tokenizer, boundary_mode="tokens")
+    sentences_chunker = TokenChunker(tokenizer, boundary_mode="sentences")
+    encoding = tokens_chunker.encode(text)
+    assert tokens_chunker.boundary_positions(text, encoding) == sentences_chunker.boundary_positions(text, encoding)
+
+
+@pytest.mark.parametrize("overlap", [64, 100])
+def test_overlap_must_fit_in_a_chunk(tokenizer, overlap):
+    with pytest.raises(ValueError):
+        TokenChunker(tokenizer, max_tokens=64, overlap=overlap)
+
+
+def test_unknown_boundary_mode(tokenizer):
+    with pytest.raises(ValueError):
+        TokenChunker(tokenizer, boundary_mode="paragraphs")
+
+
+def test_slow_tokenizer_is_rejected():
+    class SlowTokenizer:
+        is_fast = False
+
+    with pytest.raises(ValueError):
+        TokenChunker(SlowTokenizer())
@@ -0,0 +1,34 @@
+"""
+Trip rules of `circuit_breaker.CircuitBreaker`.
+"""
+
+import math
+
+from circuit_breaker import CLOSED, OPEN, CircuitBreaker, CircuitBreakers
+
+
+def test_slow_calls_open_the_breaker():
+    breaker = CircuitBreaker("remote", min_calls=3, slow_call_seconds=60, slow_rate=0.8)
+    for _ in range(3):
+        assert breaker.allow()
+        breaker.record(True, 90.0)
+    assert breaker.state == OPEN
+    assert not breaker.allow()
+
+
+def test_infinite_threshold_exempts_slow_calls():
+    breakers = CircuitBreakers()
+    breaker = breakers.configure("local", slow_call_seconds=math.inf)
+    assert breakers.get("local") is breaker
+    for _ in range(10):
+        assert breaker.allow()
+        breaker.record(True, 600.0)
+    assert breaker.state == CLOSED
+
+
+def test_errors_still_open_an_exempt_breaker():
+    breaker = CircuitBreaker("local", min_calls=3, error_rate=0.5, slow_call_seconds=math.inf)
+    for _ in range(3):
+        assert breaker.allow()
+        breaker.record(False, 1.0)
+    assert breaker.state == OPEN
@@ -0,0 +1,41 @@
+"""
+Summary storage in `db.Database`.
+"""
+
+import json
+
+import pytest
+
+import db as db_module
+
+
+@pytest.fixture
+def database(tmp_path, monkeypatch):
+    monkeypatch.setattr(db_module, "DATABASE_PATH", str(tmp_path / "summaries.db"))
+    database = db_module.Database()
+    yield database
+    database.conn.close()
+
+
+def test_saved_summary_is_listed_for_its_user(database):
+    first = database.save_summary("alice", "report one", "summary one", {"filename": "one.txt", "model": "Bart"})
+    second = database.save_summary("alice", "report two", "summary two", {"filename": "two.txt", "model": "Bart"})
+    database.save_summary("bob", "report", "summary", {"filename": "other.txt"})
+
+    summaries = database.get_summaries_for_user("alice")
+    assert [record["id"] for record in summaries] == [second, first]  # Most recent first
+    assert summaries[0]["filename"] == "two.txt"
+    assert summaries[0]["summary"] == "summary two"
+    assert json.loads(summaries[0]["metadata"])["model"] == "Bart"
+    assert database.get_summaries_for_user("nobody") == []
+
+
+def test_list_summary_ids_filters_by_user_and_scoring_status(database):
+    pending = database.save_summary("alice", "report", "summary", {"scoring": {"status": "pending"}})
+    done = database.save_summary("alice", "report", "summary", {"scoring": {"status": "done"}})
+    other = database.save_summary("bob", "report", "summary", {"scoring": {"status": "pending"}})
+
+    assert database.list_summary_ids() == [pending, done, other]
+    assert database.list_summary_ids("alice") == [pending, done]
+    assert database.list_summary_ids(scoring_status="pending") == [pending, other]
+    assert database.list_summary_ids("alice", "pending") == [pending]
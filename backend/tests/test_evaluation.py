@@ -0,0 +1,42 @@
+"""
+Shape of `evaluation_module.aevaluate_summary` results stored in summary metadata.
+"""
+
+import asyncio
+
+import evaluation_module
+
+SOURCE = "The convoy reached the bridge at dawn. Command reported light losses."
+SUMMARY = "The convoy reached the bridge at dawn."
+SCORES = {"Overall": {"score": 8, "justification": "Faithful and concise."}}
+
+
+def evaluate(monkeypatch, mode, judge_result=None):
+    async def judge(source_text, summary_text):
+        return judge_result
+
+    monkeypatch.setattr(evaluation_module, "JUDGE_MODE", mode)
+    monkeypatch.setattr(evaluation_module, "JUDGE_GATE_THRESHOLD", 0.0)
+    monkeypatch.setattr(evaluation_module, "JUDGE_SAMPLE_RATE", 0.0)
+    monkeypatch.setattr(evaluation_module, "aevaluate_with_mistral_small", judge)
+    return asyncio.run(evaluation_module.aevaluate_summary(SOURCE, SUMMARY))
+
+
+def test_scored(monkeypatch):
+    result = evaluate(monkeypatch, "always", SCORES)
+    assert result["quality_scores"] == SCORES
+    assert result["evaluation_status"] == {"status": "scored"}
+
+
+def test_unavailable_judge_leaves_quality_scores_empty(monkeypatch):
+    unavailable = {"status": "unavailable", "detail": "Evaluation unavailable: deadline exceeded", "attempts": 2}
+    result = evaluate(monkeypatch, "always", unavailable)
+    assert result["quality_scores"] == {}
+    assert result["evaluation_status"] == unavailable
+
+
+def test_skipped_judge_leaves_quality_scores_empty(monkeypatch):
+    result = evaluate(monkeypatch, "gated")
+    assert result["quality_scores"] == {}
+    assert result["evaluation_status"]["status"] == "skipped"
+    assert result["lexical_scores"]["judge"] == "skipped"
@@ -0,0 +1,102 @@
+"""
+Crash and hang recovery of `inference_workers.InferencePool`.
+
+The pool spawns this module's stub worker entry points instead of
+`worker_main`, so no model is loaded; a worker dies or hangs on every job
+it receives.
+"""
+
+import asyncio
+import os
+import time
+from multiprocessing import shared_memory
+
+import pytest
+
+import inference_workers
+from inference_workers import STOP, InferencePool, InferenceWorkerError
+
+
+def crashing_worker(conn):
+    while True:
+        _, kind, _, _ = conn.recv()
+        if kind == STOP:
+            return
+        os._exit(1)
+
+
+def hanging_worker(conn):
+    while True:
+        _, kind, _, _ = conn.recv()
+        if kind == STOP:
+            return
+        time.sleep(600)
+
+
+@pytest.fixture
+def packed_payloads(monkeypatch):
+    """Send every payload through shared memory and record the packed jobs."""
+    packed = []
+
+    def pack_texts(texts):
+        packed.append(original(texts))
+        return packed[-1]
+
+    original = inference_workers.pack_texts
+    monkeypatch.setattr(inference_workers, "INFERENCE_SHM_MIN_BYTES", 0)
+    monkeypatch.setattr(inference_workers, "pack_texts", pack_texts)
+    return packed
+
+
+def recording_spawn_of(pool, spawned):
+    spawn = pool._spawn
+
+    def recording_spawn(index):
+        process, conn = spawn(index)
+        spawned.append(process)
+        return process, conn
+
+    return recording_spawn
+
+
+def run_failing_job(worker, monkeypatch):
+    monkeypatch.setattr(inference_workers, "worker_main", worker)
+    pool = InferencePool(workers=1)
+    spawned = []
+    pool._spawn = recording_spawn_of(pool, spawned)
+    pool.start()
+    try:
+        with pytest.raises(InferenceWorkerError, match="twice"):
+            asyncio.run(asyncio.wait_for(pool.analyze_toxicity(["report text"]), 30))
+    finally:
+        pool.close()
+    return pool, spawned
+
+
+def assert_released(packed):
+    for payload in packed:
+        assert payload[0] == "shm"
+        with pytest.raises(FileNotFoundError):
+            shared_memory.SharedMemory(name=payload[1])
+
+
+def test_crashed_job_is_retried_once_then_fails(packed_payloads, monkeypatch):
+    pool, spawned = run_failing_job(crashing_worker, monkeypatch)
+
+    assert len(packed_payloads) == 2  # First try and one retry
+    assert pool.restarts == 2
+    assert pool.failures == 1
+    assert_released(packed_payloads)
+    assert all(process.exitcode == 1 for process in spawned[:2])
+
+
+def test_hung_worker_is_restarted_at_the_deadline(packed_payloads, monkeypatch):
+    monkeypatch.setattr(inference_workers, "INFERENCE_JOB_TIMEOUT_SECONDS", 0.5)
+    pool, spawned = run_failing_job(hanging_worker, monkeypatch)
+
+    assert len(packed_payloads) == 2
+    assert pool.restarts == 2
+    assert_released(packed_payloads)
+    # Both hung workers were terminated, not left running
+    assert all(not process.is_alive() for process in spawned[:2])
+    assert all(process.exitcode is not None and process.exitcode < 0 for process in spawned[:2])
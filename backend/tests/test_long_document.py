@@ -0,0 +1,41 @@
+"""
+Failure handling of the map-reduce summarizer (`long_document`).
+
+`asummarize_text` is replaced by a stub, so no model or API is called.
+"""
+
+import asyncio
+
+import long_document
+from long_document import EMPTY_SUMMARY_MESSAGE, _failed, asummarize_long_document
+
+SECTIONS = "\n\n".join(f"SECTION {index}\n" + "Troops held the line at the bridge. " * 40 for index in range(6))
+
+
+def test_failed_reports_missing_summaries():
+    assert _failed(["one", "two"]) == ""
+    assert _failed(["one", None, "Error: timeout"]) == EMPTY_SUMMARY_MESSAGE
+    assert _failed(["one", "", "two"]) == EMPTY_SUMMARY_MESSAGE
+    assert _failed(["one", "Error: timeout"]) == "Error: timeout"
+
+
+def test_missing_map_summary_fails_the_run(monkeypatch):
+    async def summarize(text, model_name, use_cache=True):
+        return None if "SECTION 2" in text else "partial summary"
+
+    monkeypatch.setattr(long_document, "asummarize_text", summarize)
+    result = asyncio.run(asummarize_long_document(SECTIONS, "GPT 4.1", chunk_tokens=200))
+
+    assert result.summary == EMPTY_SUMMARY_MESSAGE
+    assert result.report["failed_stage"] == "map"
+
+
+def test_missing_reduce_summary_fails_the_run(monkeypatch):
+    async def summarize(text, model_name, use_cache=True):
+        return None if text.startswith("partial summary") else "partial summary"
+
+    monkeypatch.setattr(long_document, "asummarize_text", summarize)
+    result = asyncio.run(asummarize_long_document(SECTIONS, "GPT 4.1", chunk_tokens=200))
+
+    assert result.summary == EMPTY_SUMMARY_MESSAGE
+    assert result.report["failed_stage"] == "reduce level 1"
@@ -0,0 +1,56 @@
+"""
+On-disk cache of the int8 BART model (`model_registry.load_quantized_bart`).
+
+A tiny randomly initialized BART is saved to a temporary directory, so no
+checkpoint is downloaded.
+"""
+
+import pytest
+import torch
+from transformers import BartConfig, BartForConditionalGeneration
+
+import model_registry
+
+
+@pytest.fixture
+def tiny_bart(tmp_path, monkeypatch):
+    config = BartConfig(vocab_size=64, d_model=16, encoder_layers=1, decoder_layers=1,
+                        encoder_attention_heads=2, decoder_attention_heads=2,
+                        encoder_ffn_dim=32, decoder_ffn_dim=32, max_position_embeddings=64)
+    torch.manual_seed(0)
+    path = tmp_path / "tiny-bart"
+    model = BartForConditionalGeneration(config)
+    model.generation_config.num_beams = 3
+    model.save_pretrained(path)
+    monkeypatch.setattr(model_registry, "QUANTIZED_MODEL_DIR", str(tmp_path / "quantized"))
+    return str(path)
+
+
+def test_cached_int8_model_is_not_requantized(tiny_bart, monkeypatch):
+    first = model_registry.load_quantized_bart(tiny_bart)
+    cache_path = model_registry.quantized_model_path(tiny_bart)
+
+    def unexpected(*args, **kwargs):
+        raise AssertionError("the fp32 checkpoint was loaded again")
+
+    monkeypatch.setattr(BartForConditionalGeneration, "from_pretrained", unexpected)
+    second = model_registry.load_quantized_bart(tiny_bart)
+
+    assert type(second.model.encoder.layers[0].fc1) is type(first.model.encoder.layers[0].fc1)
+    assert type(second.model.encoder.layers[0].fc1) is not torch.nn.Linear
+    input_ids = torch.tensor([[0, 5, 9, 13, 2]])
+    assert torch.equal(first.generate(input_ids, max_length=8), second.generate(input_ids, max_length=8))
+    assert second.generation_config.num_beams == 3
+    assert cache_path.endswith(".pt")
+
+
+def test_unreadable_cache_is_rebuilt(tiny_bart):
+    cache_path = model_registry.quantized_model_path(tiny_bart)
+    model_registry.load_quantized_bart(tiny_bart)
+    with open(cache_path, "wb") as f:
+        f.write(b"not a state dict")
+
+    model = model_registry.load_quantized_bart(tiny_bart)
+    assert type(model.model.encoder.layers[0].fc1) is not torch.nn.Linear
+    cached = model_registry._restore_int8_state(torch.load(cache_path, weights_only=True))
+    assert set(cached) == set(model.state_dict())
@@ -0,0 +1,290 @@
+"""
+toxicity.py
+
+Detoxify scoring service for reports and summaries.
+
+Detoxify reads at most 512 tokens, so one pass over a full report either
+truncates it or blurs an isolated violent or profane sentence into a single
+average. Texts are therefore split into sentence windows (sentences longer
+than TOXICITY_WINDOW_TOKENS are cut into fixed windows) and every window
+is scored. Per label, the max and the length-weighted mean over the windows
+are reported, together with the top offending spans and their character
+offsets; the TOXICITY_AGGREGATE ("max" by default) is the text's headline
+score, from which the report-to-summary reduction is derived.
+
+Callers hand over every text they need scored at once (e.g. all reports and
+summaries of a /summarize request). Duplicates are scored once and repeated
+documents are served from the toxicity cache; the windows of the remaining
+texts are sorted by length and run through Detoxify in padded batches of
+TOXICITY_BATCH_SIZE, so each forward pass pads to similar lengths, and the
+scores are scattered back to their texts.
+"""
+
+import asyncio
+import hashlib
+import logging
+import os
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from cache import TieredCache, make_key
+from extractive import SENTENCE_PATTERN
+from inference_workers import inference_pool
+from metrics import estimate_tokens
+from model_registry import get_detoxify, run_inference
+
+logger = logging.getLogger(__name__)
+
+DETOXIFY_VARIANT = "unbiased"
+
+# Texts (windows) per Detoxify forward pass (after sorting by length)
+TOXICITY_BATCH_SIZE = int(os.getenv("TOXICITY_BATCH_SIZE", "16"))
+
+# Score sentence windows instead of one (truncated) pass over the whole text
+TOXICITY_WINDOWED = os.getenv("TOXICITY_WINDOWED", "1") != "0"
+
+# Sentences above this many tokens are cut into fixed windows of this size
+TOXICITY_WINDOW_TOKENS = int(os.getenv("TOXICITY_WINDOW_TOKENS", "256"))
+
+# Per-label aggregate used as a text's scores: "max" (worst window) or "mean" (length-weighted)
+TOXICITY_AGGREGATE = os.getenv("TOXICITY_AGGREGATE", "max")
+
+# Offending spans returned per text, and the lowest label score that counts as offending
+TOXICITY_TOP_SPANS = int(os.getenv("TOXICITY_TOP_SPANS", "5"))
+TOXICITY_SPAN_MIN_SCORE = float(os.getenv("TOXICITY_SPAN_MIN_SCORE", "0.1"))
+
+# Detoxify scores keyed by document hash (in-memory LRU + SQLite table in summaries.db)
+TOXICITY_CACHE_ENABLED = os.getenv("TOXICITY_CACHE_ENABLED", "1") != "0"
+toxicity_cache = TieredCache(
+    "toxicity_cache",
+    max_memory_entries=int(os.getenv("TOXICITY_CACHE_MEMORY_ENTRIES", "1024")),
+    ttl_seconds=float(os.getenv("TOXICITY_CACHE_TTL_SECONDS", str(30 * 24 * 3600))),
+    max_disk_bytes=int(float(os.getenv("TOXICITY_CACHE_MAX_MB", "32")) * 1024 * 1024),
+)
+
+
+def _with_overall(scores: Dict[str, float]) -> Dict[str, float]:
+    scores["overall"] = sum(scores.values()) / len(scores)
+    return scores
+
+
+def score_batch(texts: Sequence[str], batch_size: int = None, sort_by_length: bool = True) -> List[Dict[str, float]]:
+    """
+    Score *texts* with Detoxify in padded batches.
+
+    Blocking (transformer forward passes); call through `run_inference`.
+
+    Args:
+        texts (Sequence[str]): Texts to score.
+        batch_size (int): Texts per forward pass (default TOXICITY_BATCH_SIZE).
+        sort_by_length (bool): Group texts of similar length into the same
+            batch to minimize padding (disable only to measure its effect).
+
+    Returns:
+        list[dict]: Per text (in input order), each label's score plus "overall".
+    """
+    batch_size = batch_size or TOXICITY_BATCH_SIZE
+    detox_model = get_detoxify(DETOXIFY_VARIANT)
+    order = list(range(len(texts)))
+    if sort_by_length:
+        order.sort(key=lambda index: len(texts[index]))
+    results: List[Optional[Dict[str, float]]] = [None] * len(texts)
+    for start in range(0, len(order), batch_size):
+        batch = order[start:start + batch_size]
+        predictions = detox_model.predict([texts[index] for index in batch])
+        for position, index in enumerate(batch):
+            results[index] = _with_overall({label: float(values[position]) for label, values in predictions.items()})
+    return results
+
+
+def split_windows(text: str, window_tokens: int = None) -> List[Tuple[int, int]]:
+    """
+    Split *text* into sentence windows.
+
+    Returns:
+        list[tuple]: (start, end) character offsets of each window, in order;
+            sentences above *window_tokens* are cut at whitespace into
+            windows of about that size.
+    """
+    max_chars = 4 * (window_tokens or TOXICITY_WINDOW_TOKENS)  # `estimate_tokens` ratio
+    boundaries = [0] + [offset for match in SENTENCE_PATTERN.finditer(text) for offset in match.span()] + [len(text)]
+    windows = []
+    for start, end in zip(boundaries[::2], boundaries[1::2]):
+        while start < end and text[start].isspace():
+            start += 1
+        while end > start and text[end - 1].isspace():
+            end -= 1
+        while end - start > max_chars:
+            cut = text.rfind(" ", start + max_chars // 2, start + max_chars)
+            cut = cut if cut > start else start + max_chars
+            windows.append((start, cut))
+            start = cut
+            while start < end and text[start].isspace():
+                start += 1
+        if start < end:
+            windows.append((start, end))
+    return windows
+
+
+def _aggregate(text: str, windows: List[Tuple[int, int]], scores: List[Dict[str, float]]) -> Dict[str, Any]:
+    """Per-label max and length-weighted mean over *windows*, plus the top offending spans."""
+    labels = [label for label in scores[0] if label != "overall"]
+    weights = [max(1, end - start) for start, end in windows]
+    total = sum(weights) or 1
+    maximum = _with_overall({label: max(window[label] for window in scores) for label in labels})
+    mean = _with_overall({label: sum(window[label] * weight for window, weight in zip(scores, weights)) / total
+                          for label in labels})
+
+    spans = []
+    for (start, end), window in zip(windows, scores):
+        label = max(labels, key=window.get)
+        if window[label] >= TOXICITY_SPAN_MIN_SCORE:
+            spans.append({"start": start, "end": end, "text": text[start:end], "label": label,
+                          "score": window[label]})
+    spans.sort(key=lambda span: span["score"], reverse=True)
+    return {
+        "scores": maximum if TOXICITY_AGGREGATE == "max" else mean,
+        "max": maximum,
+        "mean": mean,
+        "windows": len(windows),
+        "top_spans": spans[:TOXICITY_TOP_SPANS],
+    }
+
+
+def analyze_batch(texts: Sequence[str], windowed: bool = None) -> List[Dict[str, Any]]:
+    """
+    Score *texts* window by window, batching the windows of all texts together.
+
+    Blocking (transformer forward passes); call through `run_inference`.
+
+    Args:
+        texts (Sequence[str]): Texts to score.
+        windowed (bool): Split into sentence windows (default TOXICITY_WINDOWED);
+            otherwise each text is one (truncated) window.
+
+    Returns:
+        list[dict]: Per text, "scores" (the TOXICITY_AGGREGATE per label plus
+            "overall"), "max", "mean", "windows" (count) and "top_spans"
+            ({"start", "end", "text", "label", "score"}, worst first).
+    """
+    windowed = TOXICITY_WINDOWED if windowed is None else windowed
+    text_windows = [(split_windows(text) if windowed else []) or [(0, len(text))] for text in texts]
+    flat = [text[start:end] for text, windows in zip(texts, text_windows) for start, end in windows]
+    flat_scores = score_batch(flat)
+
+    analyses, offset = [], 0
+    for text, windows in zip(texts, text_windows):
+        analyses.append(_aggregate(text, windows, flat_scores[offset:offset + len(windows)]))
+        offset += len(windows)
+    return analyses
+
+
+def score_toxicity(text: str) -> Dict[str, float]:
+    """Score one text (blocking; see `analyze_batch`)."""
+    return analyze_batch([text])[0]["scores"]
+
+
+def _cache_key(text: str) -> str:
+    # Exact-text hash: span offsets are only valid for the same characters
+    return make_key(model=f"detoxify-{DETOXIFY_VARIANT}", text=hashlib.sha256(text.encode("utf-8")).hexdigest(),
+                    windowed=TOXICITY_WINDOWED, window_tokens=TOXICITY_WINDOW_TOKENS,
+                    aggregate=TOXICITY_AGGREGATE, top_spans=TOXICITY_TOP_SPANS,
+                    span_min_score=TOXICITY_SPAN_MIN_SCORE)
+
+
+async def ascore_texts(texts: Sequence[str]) -> List[Dict[str, Any]]:
+    """
+    Analyze all *texts* with one batched pass over the ones not cached.
+
+    Hits skip the inference executor entirely; the Detoxify time each hit
+    avoided is added to the cache's "saved" totals. Misses are scored in an
+    inference worker process when the pool is running.
+
+    Returns:
+        list[dict]: Per text (in input order), the `analyze_batch` result.
+    """
+    unique = list(dict.fromkeys(texts))
+    analyses: Dict[str, Dict[str, Any]] = {}
+    if TOXICITY_CACHE_ENABLED:
+        keys = {text: _cache_key(text) for text in unique}
+        entries = await asyncio.to_thread(lambda: {text: toxicity_cache.get(key) for text, key in keys.items()})
+        for text, entry in entries.items():
+            if entry is not None:
+                toxicity_cache.record_saving(compute_seconds=entry["seconds"])
+                analyses[text] = entry["analysis"]
+
+    missing = [text for text in unique if text not in analyses]
+    if missing:
+        started = time.perf_counter()
+        if inference_pool.enabled:
+            batch_analyses = await inference_pool.analyze_toxicity(missing)
+        else:
+            batch_analyses = await run_inference(analyze_batch, missing)
+        elapsed = time.perf_counter() - started
+        logger.info(f"Scored toxicity of {len(missing)} texts in {elapsed:.2f}s "
+                    f"({len(unique) - len(missing)} cached, {len(texts) - len(unique)} duplicates)")
+        analyses.update(zip(missing, batch_analyses))
+        if TOXICITY_CACHE_ENABLED:
+            # Attribute the batch time to its texts by length for the savings report
+            total_chars = sum(len(text) for text in missing) or 1
+            await asyncio.to_thread(lambda: [
+                toxicity_cache.put(keys[text], {"analysis": analysis, "seconds": elapsed * len(text) / total_chars})
+                for text, analysis in zip(missing, batch_analyses)
+            ])
+    return [analyses[text] for text in texts]
+
+
+async def ascore_text(text: str) -> Dict[str, Any]:
+    """Analyze one text (see `ascore_texts`)."""
+    return (await ascore_texts([text]))[0]
+
+
+def toxicity_reduction(report_scores: dict, summary_scores: dict) -> dict:
+    """Percentage by which each toxicity label dropped from the report to its summary."""
+    return {
+        label: ((report_scores[label] - summary_scores[label]) / report_scores[label] * 100)
+                   if report_scores[label] > 0 else 0.0
+        for label in report_scores
+    }
+
+
+def _details(analysis: Dict[str, Any]) -> Dict[str, Any]:
+    return {key: value for key, value in analysis.items() if key != "scores"}
+
+
+def toxicity_entries(report: Dict[str, Any], summary: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    The toxicity metadata entries of a report and its summary (`analyze_batch` results).
+
+    Returns:
+        dict: "detox_summary" and "detox_report" (per-label scores),
+            "percentage_reduction", and "toxicity_windows" with the max/mean
+            aggregates and top spans of both.
+    """
+    return {
+        "detox_summary": summary["scores"],
+        "detox_report": report["scores"],
+        "percentage_reduction": toxicity_reduction(report["scores"], summary["scores"]),
+        "toxicity_windows": {"aggregate": TOXICITY_AGGREGATE, "report": _details(report),
+                             "summary": _details(summary)},
+    }
+
+
+async def toxicity_metadata(plain_text: str, summary: str, report: Dict[str, Any] = None) -> dict:
+    """
+    Score report and summary toxicity (one batch) off the event loop.
+
+    Args:
+        plain_text (str): The original report.
+        summary (str): Its summary.
+        report (dict): Already computed analysis of the report, reused instead
+            of scoring the report again (e.g. when comparing several models).
+
+    Returns:
+        dict: The `toxicity_entries` stored in the summary metadata.
+    """
+    if report is None:
+        report, summary_analysis = await ascore_texts([plain_text, summary])
+    else:
+        summary_analysis = await ascore_text(summary)
+    return toxicity_entries(report, summary_analysis)